@@ -13,6 +13,13 @@ from customtkinter import *
 from utils import logger
 from helpers.api import *
 from helpers.positioners import *
+from helpers.cart import Cart
+from helpers.disk_cache import DiskCache
+from helpers.live import CatalogFeed
+from helpers.prices import format_price, parse_price_input
+from helpers.table import VirtualTable
+from helpers.tasks import TaskRunner
+from helpers.views import ViewCache
 from secrets import token_urlsafe
 
 def app(host, port):
@@ -26,29 +33,53 @@ def app(host, port):
         Args:
             frame_fn (function): Funkcja zwracająca nowy frame do wyświetlania
         """
-        logger.info(f"Przełączam na {frame_fn.__name__}")
+        logger.debug("Przełączam na %s", frame_fn.__name__)
         nonlocal current_frame
         if current_frame:
-            current_frame.destroy()
-        current_frame = frame_fn()
-
-        header = CTkFrame(current_frame)  # header
-        header.pack(pady=10, padx=10, fill=X, expand=True, anchor=N)
-        h1(CTkLabel(header, text="Frog Store", font=("Arial", 24)))
-        h1(CTkLabel(header, 
-                    text=
-                    f"Witaj, {current_session['name']} {current_session['surname']}" 
-                    if current_session else "Witaj, gościu!",
-                    font=("Arial", 16))
-                )
+            # Zapamiętane widoki tylko chowamy, pozostałe (formularze) niszczymy jak dotąd
+            if current_frame in views:
+                current_frame.pack_forget()
+            else:
+                current_frame.destroy()
+
+        name = frame_fn.__name__
+        frame = views.get(name) if name in CACHED_VIEWS else None
+        if frame is not None:
+            logger.debug("Widok %s z pamięci", name)
+            if hasattr(frame, "on_show"):
+                frame.on_show()
+        else:
+            frame = frame_fn()
+
+            header = CTkFrame(frame)  # header
+            header.pack(pady=10, padx=10, fill=X, expand=True, anchor=N)
+            h1(CTkLabel(header, text="Frog Store", font=("Arial", 24)))
+            h1(CTkLabel(header, 
+                        text=
+                        f"Witaj, {current_session['name']} {current_session['surname']}" 
+                        if current_session else "Witaj, gościu!",
+                        font=("Arial", 16))
+                    )
+
+        current_frame = views.current = frame
+        if name in CACHED_VIEWS:
+            views.put(name, frame)
         current_frame.pack(expand=True, fill=BOTH)
 
     def render_main():
         def handle_logout():
-            nonlocal current_session
+            nonlocal current_session, cart_save_job
             logger.info("Wyogowywanie")
-            logout(client_token, current_session["login"], hostname)
+            # Niezapisane zmiany koszyka wysyłamy przed wylogowaniem, w tym samym zadaniu (po kolei)
+            payload = None
+            if cart_save_job:
+                root.after_cancel(cart_save_job)
+                cart_save_job = None
+                payload = cart.payload()
+            tasks.submit(save_and_logout, payload, current_session["login"])
             current_session = None
+            cart.clear()
+            views.clear()  # nagłówki i przyciski zależą od sesji
             switch_to(render_main)
 
         frame = CTkFrame(root)
@@ -70,42 +101,96 @@ def app(host, port):
 
         h1(CTkLabel(inner, text="Lista użytkowników", font=("Arial", 20)))
 
-        users = list_users(client_token, hostname)
-        if users.get("error"):
-            CTkLabel(inner, text=f"Błąd podczas pobierania użytkowników: {users.get('error')}", text_color="red").pack(pady=5)
-        else:
-            if len(users.get("users")) == 0:
-                h2(CTkLabel(inner, text="Brak użytkowników w BD", text_color="red"))
+        body = CTkFrame(inner, fg_color="transparent")
+        body.pack()
+        loading(body, "Ładowanie użytkowników...")
+
+        def show(users: dict):
+            if not body.winfo_exists():  # widok został już zamknięty
+                return
+            clear(body)
+            if users.get("error"):
+                CTkLabel(body, text=f"Błąd podczas pobierania użytkowników: {users.get('error')}", text_color="red").pack(pady=5)
+            elif len(users.get("users")) == 0:
+                h2(CTkLabel(body, text="Brak użytkowników w BD", text_color="red"))
                 logger.log("Wyświetlam brak użytkowników")
             else:
                 for item in users.get("users"):
-                    h2(CTkLabel(inner, text=f"{"[ADMIN]" if item["admin"] else ""} {item["name"]} {item["surname"]} ({item["login"]}), {item["age"]} lat"))
-                    btn(CTkButton(inner, text="Usuń", command=lambda login=item["login"]: remove_user(login, client_token, hostname))) if current_session and current_session.get("is_admin") else None
-        
+                    h2(CTkLabel(body, text=f"{"[ADMIN]" if item["admin"] else ""} {item["name"]} {item["surname"]} ({item["login"]}), {item["age"]} lat"))
+                    btn(CTkButton(body, text="Usuń", command=lambda login=item["login"]: on_remove_user_click(login))) if current_session and current_session.get("is_admin") else None
+
+        tasks.submit(list_users, client_token, hostname, on_done=show)
+
         btn(CTkButton(inner, text="Wróć do głownej", command=lambda: switch_to(render_main)))
         
         nest(inner)
         
         return frame
+
+    def on_remove_user_click(login: str):
+        def done(response: dict):
+            logger.info("Usuwanie użytkownika %s: %s", login, response)
+            if current_frame and current_frame.winfo_exists():
+                switch_to(render_users)
+
+        tasks.submit(remove_user, login, client_token, hostname, on_done=done)
                     
     def render_catalog():
+        nonlocal catalog_listener
         frame = CTkFrame(root)
         inner = CTkFrame(frame)
 
         h1(CTkLabel(inner, text="Katalog produktów", font=("Arial", 20)))
 
-        products = list_products(client_token, hostname)
-        logger.info(f"Pobrano produkty: {products} - {type(products)}")
+        body = CTkFrame(inner, fg_color="transparent")
+        body.pack()
+        shown = None
+        table = None
 
-        if products.get("error"):
-            CTkLabel(inner, text=f"Błąd podczas pobierania produktów: {products.get('error')}", text_color="red").pack(pady=5)
-        else:
-            if len(products.get("products")) == 0:
-                label = CTkLabel(inner, text="Brak produktów w katalogu", text_color="red")
+        def show(products: dict):
+            nonlocal shown, table
+            if not body.winfo_exists() or products is shown:  # widok zamknięty lub dane bez zmian
+                return
+            shown = products
+            table = None
+            clear(body)
+            if products.get("error"):
+                CTkLabel(body, text=f"Błąd podczas pobierania produktów: {products.get('error')}", text_color="red").pack(pady=5)
+            elif len(products.get("products")) == 0:
+                label = CTkLabel(body, text="Brak produktów w katalogu", text_color="red")
                 h2(label)
                 logger.log("Wyświetlam brak produktow")
             else:
-                render_table(inner, products.get("products")).pack(padx=20, pady=20)
+                table = render_table(body, products.get("products"))
+                table.pack(padx=20, pady=20)
+
+        def update(products: dict, delta: dict | None):
+            # Zmiany z /ws/catalog nanosimy na wyświetlaną tabelę, jeśli pokazuje stan sprzed zmian
+            nonlocal shown
+            if not body.winfo_exists():
+                return
+            if delta is not None and table is not None and shown is delta["base"]:
+                shown = products
+                table.apply(delta["upserts"], delta["deletes"])
+            else:
+                show(catalog_cache.get("products") or products)
+
+        def on_show():
+            # Widok wraca z pamięci: odświeżamy liczby sztuk w koszyku i sprawdzamy wersję katalogu
+            if table is not None:
+                table.refresh()
+            prefetch_catalog(on_done=show)
+
+        frame.on_show = on_show
+        catalog_listener = update
+
+        # Katalog pobrany z wyprzedzeniem wyświetla się od razu, a w tle sprawdzamy, czy jest aktualny
+        # (bez zmian kopia zwraca ten sam obiekt, więc widok nie jest wtedy przebudowywany)
+        if catalog_cache.get("products"):
+            show(catalog_cache["products"])
+        else:
+            loading(body, "Ładowanie katalogu...")
+        prefetch_catalog(on_done=show)
 
         if current_session and current_session.get("is_admin"):
             btn(CTkButton(inner, text="Dodaj produkt", command=lambda: switch_to(render_add_product)))
@@ -116,40 +201,10 @@ def app(host, port):
         nest(inner)
         return frame
     
-    def render_table(frame: CTkFrame, rows: list[dict]):
-        # https://customtkinter.tomschimansky.com/tutorial/grid-system/
-        tframe = CTkFrame(frame, bg_color="#A0A79D")
-
-        columns = list(rows[0].keys())
-        columns.append("Akcje")
-        columns.append("W koszyku")
-
-        for i, col in enumerate(columns):
-            if i == 0: continue
-            header_cell = CTkLabel(tframe, text=col, font=("Arial", 15, "bold"))
-            header_cell.grid(row=0, column=i, padx=10, pady=5, sticky=NSEW)
-            tframe.grid_columnconfigure(i, weight=1) 
-
-        for i, row in enumerate(rows, 1):
-            for j, col in enumerate(columns):
-                if col == "Akcje":
-                    btn_frame = CTkFrame(tframe)
-                    CTkButton(btn_frame, text="+", width=40, command=lambda r=row: add_to_cart(r, False)).pack(side=LEFT, padx=2)
-                    CTkButton(btn_frame, text="-", width=40, command=lambda r=row: add_to_cart(r, True)).pack(side=LEFT, padx=2)
-                    btn_frame.grid(row=i, column=j, padx=10, pady=5, sticky=NSEW)
-                elif col == "W koszyku":
-                    count = 0
-                    for target in cart:
-                        if target[0]["id"] == row["id"]:
-                            count = target[1]
-                    var = StringVar(value=str(count)) # robmy analog UseState z Reactu
-                    cart_vars[row["id"]] = var
-                    CTkEntry(tframe, textvariable=var, font=("Arial", 12), state="readonly").grid(row=i, column=j, padx=10, pady=5, sticky=NSEW)
-                else:
-                    data_cell = CTkLabel(tframe, text=str(row.get(col)), font=("Arial", 12))
-                    data_cell.grid(row=i, column=j, padx=10, pady=5, sticky=NSEW)
-
-        return tframe
+    def render_table(frame: CTkFrame, rows: list[dict], on_change=None):
+        # Tylko widoczne wiersze mają widgety, więc koszt nie zależy od liczby produktów
+        return VirtualTable(frame, rows, count=cart.count, on_change=on_change or add_to_cart,
+                            formatters={"price": format_price}, bg_color="#A0A79D")
     
     def render_cart():
         frame = CTkFrame(root)
@@ -161,37 +216,98 @@ def app(host, port):
             h2(CTkLabel(inner, text="Koszyk jest pusty", text_color="red"))
             logger.log("Wyświetlam pusty koszyk")
         else:
-            render_table(inner, [item[0] for item in cart]).pack(padx=20, pady=20)
+            total = CTkLabel(inner, text=f"Razem: {format_price(cart.total())}", font=("Arial", 16))
+
+            def on_change(item: dict, remove: bool):
+                add_to_cart(item, remove)
+                total.configure(text=f"Razem: {format_price(cart.total())}")
+
+            render_table(inner, cart.products(), on_change).pack(padx=20, pady=20)
+            total.pack(pady=5)
 
         btn(CTkButton(inner, text="Wróć do katalogu", command=lambda: switch_to(render_catalog)))
-        btn(CTkButton(inner, text="Zamów"))
+        btn(CTkButton(inner, text="Zamów", command=lambda: on_order_click(inner)))
         
         nest(inner)
 
         return frame
 
     def add_to_cart(item: dict, remove: bool):
-        found = False
-        for target in cart:
-            if target[0]["id"] == item["id"]:
-                found = True
-                if remove:
-                    if target[1] > 1:
-                        target[1] -= 1
-                    else:
-                        cart.remove(target)
-                else:
-                    target[1] += 1
-                break
-        if not found and not remove:
-            cart.append([item, 1])
-
-        if item["id"] in cart_vars:
-            new_count = 0
-            for target in cart:
-                if target[0]["id"] == item["id"]:
-                    new_count = target[1]
-            cart_vars[item["id"]].set(str(new_count))
+        if remove:
+            cart.remove(item)
+        else:
+            cart.add(item)
+        views.invalidate("render_cart")
+        schedule_cart_save()
+
+    def schedule_cart_save():
+        """
+        Zapisuje koszyk pół sekundy po ostatniej zmianie (seria kliknięć to jeden zapis):
+        zalogowanego użytkownika na serwerze, a gościa w pamięci podręcznej na dysku
+        """
+        nonlocal cart_save_job
+        if cart_save_job:
+            root.after_cancel(cart_save_job)
+        cart_save_job = root.after(500, save_cart_now)
+
+    def save_cart_now():
+        nonlocal cart_save_job
+        cart_save_job = None
+        if current_session:
+            tasks.submit(save_cart, cart.payload(), client_token, hostname)
+        else:
+            tasks.submit(disk_cache.put, guest_cart_key, cart.entries())
+
+    def save_and_logout(payload: dict | None, login: str):
+        if payload is not None:
+            save_cart(payload, client_token, hostname)
+        return logout(client_token, login, hostname)
+
+    def on_cart_loaded(response: dict):
+        if response.get("error"):
+            logger.error("Nie udało się pobrać koszyka: %s", response.get('error'))
+            return
+        had_local = bool(cart)
+        cart.merge(response.get("items", []))
+        views.invalidate("render_cart")
+        if had_local:  # koszyk zebrany przed zalogowaniem dołączamy do zapisanego
+            schedule_cart_save()
+            tasks.submit(disk_cache.delete, guest_cart_key)
+
+    def on_order_click(inner: CTkFrame):
+        nonlocal err, cart_save_job
+        err.pack_forget() if err else None
+        if not current_session:
+            err = CTkLabel(inner, text="Zaloguj się, aby złożyć zamówienie!", text_color="red")
+            err.pack(pady=5)
+            return
+        if not cart:
+            return
+        if cart_save_job:  # zamówienie i tak opróżni koszyk na serwerze
+            root.after_cancel(cart_save_job)
+            cart_save_job = None
+
+        logger.info("Składanie zamówienia", items=len(cart))
+        pending = loading(inner, "Składanie zamówienia...")
+        tasks.submit(place_order, cart.payload(), client_token, hostname,
+                     on_done=lambda response: on_order_done(response, inner, pending))
+
+    def on_order_done(response: dict, inner: CTkFrame, pending: CTkLabel):
+        nonlocal err
+        logger.debug("Zamówienie: %s", response)
+        if not response.get("error"):
+            cart.clear()
+            views.invalidate("render_cart")
+            prefetch_catalog()  # stany magazynowe się zmieniły
+        if not inner.winfo_exists():
+            return
+        pending.destroy()
+        if not response.get("error"):
+            CTkLabel(inner, text=f"Zamówienie zostało złożone! Razem: {format_price(response.get('total'))}", text_color="green").pack(pady=5)
+        else:
+            shortages = ", ".join(f"ID {s['id']}: dostępne {s['available']}" for s in response.get("shortages", []))
+            err = CTkLabel(inner, text=f"Nie udało się złożyć zamówienia: {response.get('error')} {shortages}", text_color="red")
+            err.pack(pady=5)
 
     def render_add_product():
         frame = CTkFrame(root)
@@ -228,7 +344,7 @@ def app(host, port):
         d = str(description.get())
         c = str(category.get())
 
-        logger.info(f"Dodawanie produktu: {n}, {p}, {q}, {d}, {c}")
+        logger.info("Dodawanie produktu: %s, %s, %s, %s, %s", n, p, q, d, c)
         nonlocal err
         if not n or not p or not q or not d or not c:
             err.pack_forget() if err else None
@@ -236,16 +352,29 @@ def app(host, port):
             logger.error("Proba dodania produktu z pustymi polami")
             err.pack(pady=5)
             return
+        try:
+            grosze = parse_price_input(p)
+            count = int(q)
+        except ValueError:
+            err.pack_forget() if err else None
+            err = CTkLabel(inner, text="Cena i ilość muszą być liczbami!", text_color="red")
+            logger.error("Proba dodania produktu z nieprawidłową ceną lub ilością")
+            err.pack(pady=5)
+            return
         
-        response = add_product({
+        tasks.submit(add_product, {
             "name": n,
-            "price": f"{p} zł",
-            "quantity": int(q),
+            "price": grosze,
+            "quantity": count,
             "description": d,
             "category": c
-        }, client_token, hostname)
+        }, client_token, hostname, on_done=lambda response: on_product_added(response, inner))
 
-        logger.info(f"Reakcja serwera: {response}")
+    def on_product_added(response: dict, inner: CTkFrame):
+        nonlocal err
+        if not inner.winfo_exists():
+            return
+        logger.debug("Reakcja serwera: %s", response)
         if not response.get("error"):
             logger.info("Produkt dodany pomyślnie")
             err.pack_forget() if err else None
@@ -274,7 +403,7 @@ def app(host, port):
 
     def on_remove_product_click(product_id: CTkEntry, inner: CTkFrame):
         pid = product_id.get()
-        logger.info(f"Usuwanie produktu o ID: {pid}")
+        logger.info("Usuwanie produktu o ID: %s", pid)
         nonlocal err
         if not pid:
             err.pack_forget() if err else None
@@ -283,9 +412,14 @@ def app(host, port):
             err.pack(pady=5)
             return
         
-        response = remove_product(int(pid) if isinstance(pid, "int") else str(pid), client_token, hostname)
+        tasks.submit(remove_product, int(pid) if pid.isdigit() else str(pid), client_token, hostname,
+                     on_done=lambda response: on_product_removed(response, inner))
 
-        logger.info(f"Odpoeiedz serwera: {response}")
+    def on_product_removed(response: dict, inner: CTkFrame):
+        nonlocal err
+        if not inner.winfo_exists():
+            return
+        logger.debug("Odpowiedź serwera: %s", response)
         if not response.get("error"):
             logger.info("Produkt usunięty pomyślnie")
             err.pack_forget() if err else None
@@ -304,6 +438,8 @@ def app(host, port):
 
         login = CTkEntry(inner, justify=CENTER)
         login.pack(pady=5)
+        if last_profile.get("login"):
+            login.insert(0, last_profile["login"])  # ostatnio zalogowany użytkownik
     
         passwd = CTkEntry(inner, show="*", justify=CENTER)
         passwd.pack(pady=5)
@@ -354,8 +490,8 @@ def app(host, port):
             s = str(surname.get())  if surname else None
             a = str(age.get()) if age else None
             
-            logger.info(f"Login: {l}, Hasło: {p}")
-            nonlocal err, registered, current_session
+            logger.info("Login: %s", l)
+            nonlocal err
             if not l or not p:
                 err.pack_forget() if err else None
                 err = CTkLabel(inner, text="Login i hasło nie mogą być puste!", text_color="red")
@@ -376,33 +512,105 @@ def app(host, port):
                     err.pack(pady=5)
                     return
                 
-                response = handle_register(l, p, client_token, hostname, n, s, a)
-                logger.info(f"Rejestracja: {response}")
-                if not response.get("error"):
-                    logger.info("Rejestracja zakończona pomyślnie")
-                    err.pack_forget() if err else None
-                    if not registered:
-                        CTkLabel(inner, text="Rejestracja zakończona pomyślnie! Możesz się teraz zalogować.", text_color="green").pack(pady=5)
-                    registered = True
-                else:
-                    logger.error("Rejestracja nie powiodła się")
-                    err.pack_forget() if err else None
-                    err = CTkLabel(inner, text=f"Rejestracja nie powiodła się! {response.get("error")}", text_color="red")
-                    err.pack(pady=5)
+                pending = loading(inner, "Rejestracja...")
+                tasks.submit(handle_register, l, p, client_token, hostname, n, s, a,
+                             on_done=lambda response: on_register_done(response, inner, pending))
             else:
-                response = handle_login(l, p, client_token, hostname)
-                logger.info(f"Logowanie: {response}")
-                if not response.get("error"):
-                    logger.info("Logowanie zakończone pomyślnie")
-                    err.pack_forget() if err else None
-                    current_session = response;
-                    CTkLabel(inner, text="Zalogowano pomyślnie!", text_color="green").pack(pady=5)
-                    switch_to(render_main)
-                else:
-                    logger.error("Logowanie nie powiodło się")
-                    err.pack_forget() if err else None
-                    err = CTkLabel(inner, text=f"Logowanie nie powiodło się! {response.get("error")}", text_color="red")
-                    err.pack(pady=5)
+                pending = loading(inner, "Logowanie...")
+                tasks.submit(handle_login, l, p, client_token, hostname,
+                             on_done=lambda response: on_login_done(response, inner, pending))
+
+    def on_register_done(response: dict, inner: CTkFrame, pending: CTkLabel):
+            nonlocal err, registered
+            if not inner.winfo_exists():
+                return
+            pending.destroy()
+            logger.debug("Rejestracja: %s", response)
+            if not response.get("error"):
+                logger.info("Rejestracja zakończona pomyślnie")
+                err.pack_forget() if err else None
+                if not registered:
+                    CTkLabel(inner, text="Rejestracja zakończona pomyślnie! Możesz się teraz zalogować.", text_color="green").pack(pady=5)
+                registered = True
+            else:
+                logger.error("Rejestracja nie powiodła się")
+                err.pack_forget() if err else None
+                err = CTkLabel(inner, text=f"Rejestracja nie powiodła się! {response.get("error")}", text_color="red")
+                err.pack(pady=5)
+
+    def on_login_done(response: dict, inner: CTkFrame, pending: CTkLabel):
+            nonlocal err, current_session
+            if not inner.winfo_exists():
+                return
+            pending.destroy()
+            logger.debug("Logowanie: %s", response)
+            if not response.get("error"):
+                logger.info("Logowanie zakończone pomyślnie")
+                err.pack_forget() if err else None
+                current_session = response;
+                last_profile.clear()
+                last_profile.update({k: response.get(k) for k in ("login", "name", "surname", "age")})
+                tasks.submit(disk_cache.put, profile_key, dict(last_profile))
+                views.clear()  # nagłówki i przyciski zależą od sesji
+                tasks.submit(get_cart, client_token, hostname, on_done=on_cart_loaded)
+                prefetch_catalog()  # uprawnienia mogły się zmienić, więc odświeżamy katalog od razu
+                switch_to(render_main)
+            else:
+                logger.error("Logowanie nie powiodło się")
+                err.pack_forget() if err else None
+                err = CTkLabel(inner, text=f"Logowanie nie powiodło się! {response.get("error")}", text_color="red")
+                err.pack(pady=5)
+
+    def loading(parent, text: str) -> CTkLabel:
+        """
+        Wyświetla etykietę zastępczą na czas pobierania danych
+
+        Args:
+            parent: Kontener, w którym ma się pojawić etykieta
+            text (str): Treść etykiety
+
+        Returns:
+            CTkLabel: Etykieta, którą należy usunąć po otrzymaniu danych
+        """
+        label = CTkLabel(parent, text=text, text_color="gray")
+        label.pack(pady=5)
+        return label
+
+    def clear(parent):
+        """Usuwa wszystkie widgety z kontenera"""
+        for child in parent.winfo_children():
+            child.destroy()
+
+    def prefetch_catalog(on_done=None):
+        """
+        Synchronizuje w tle lokalną kopię katalogu (pobierając tylko zmiany) i zapamiętuje ją,
+        żeby widok katalogu otwierał się od razu
+
+        Args:
+            on_done (function | None): Wywoływana w wątku Tk z odpowiedzią serwera
+        """
+        def store(products: dict):
+            if not products.get("error"):
+                # Zdarzenia z /ws/catalog mogły w międzyczasie zaktualizować kopię
+                products = catalog_cache["products"] = cached_catalog(hostname) or products
+            if on_done:
+                on_done(products)
+
+        tasks.submit(sync_catalog, client_token, hostname, on_done=store)
+
+    def on_catalog_update(products: dict, delta: dict | None):
+        """
+        Odbiera w wątku Tk zmiany katalogu z /ws/catalog (już naniesione na lokalną kopię)
+
+        Args:
+            products (dict): Bieżąca odpowiedź kopii katalogu
+            delta (dict | None): Zmienione i usunięte produkty albo None po pełnej synchronizacji
+        """
+        catalog_cache["products"] = cached_catalog(hostname) or products
+        if delta is not None:
+            logger.debug("Zmiany katalogu: %d zmienionych, %d usuniętych", len(delta["upserts"]), len(delta["deletes"]))
+        if catalog_listener is not None:
+            catalog_listener(products, delta)
 
     logger.info("Uruchamiam aplikację")
 
@@ -412,11 +620,20 @@ def app(host, port):
     registered = False
     current_session = None
     current_frame = None
-    cart = []
-    cart_vars = {}
+    cart = Cart()
+    cart_save_job = None
+    catalog_cache = {}  # ostatni stan lokalnej kopii katalogu
+    catalog_listener = None  # aktualizuje widok katalogu zmianami z /ws/catalog
+    views = ViewCache(max_views=4)
+    CACHED_VIEWS = {"render_main", "render_catalog", "render_cart"}  # formularze zawsze budujemy od nowa
 
 
-    logger.info(f"Generuję token klienta: {client_token}")
+    logger.debug("Generuję token klienta: %s", client_token)
+
+    if logger.enabled("debug"):
+        # Czas każdego żądania do serwera (ZABKA_LOG_LEVEL=debug)
+        set_timing_hook(lambda method, path, status, seconds:
+                        logger.debug("%s %s -> %s w %.1f ms", method, path, status, seconds * 1000))
 
     root = CTk()
     root.title("Frog Store")
@@ -428,6 +645,32 @@ def app(host, port):
     set_default_color_theme("green")
     set_widget_scaling(1.0)
 
+    # Stan z poprzedniego uruchomienia: katalog i koszyk gościa pokazujemy od razu,
+    # a katalog jest w tle sprawdzany na serwerze (pobierane są tylko zmiany)
+    disk_cache = DiskCache()
+    set_disk_cache(disk_cache)
+    guest_cart_key = f"cart:{hostname}"
+    profile_key = f"profile:{hostname}"
+    saved_cart = disk_cache.get(guest_cart_key)
+    if saved_cart:
+        cart.merge(saved_cart[0])
+    saved_profile = disk_cache.get(profile_key)
+    last_profile = saved_profile[0] if saved_profile else {}
+    if cached_catalog(hostname):
+        catalog_cache["products"] = cached_catalog(hostname)
+
+    tasks = TaskRunner(root)
+    prefetch_catalog()
+
+    # Zmiany katalogu na żywo: wątek feedu nanosi je na kopię, a widok aktualizujemy w wątku Tk
+    feed = CatalogFeed(get_replica(hostname), client_token,
+                       lambda products, delta: tasks.call(on_catalog_update, products, delta))
+    feed.start()
+
     switch_to(render_main)
 
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    feed.stop()
+    tasks.shutdown()
+    save_catalog(hostname)
+    disk_cache.close()
\ No newline at end of file
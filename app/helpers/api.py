@@ -1,67 +1,613 @@
+"""
+Klient HTTP serwera Frog Store
+
+ApiClient trzyma jedną sesję requests (pulę połączeń keep-alive) przypisaną do hosta,
+stosuje limity czasu dla każdego wywołania i ponawia idempotentne żądania z wykładniczym
+odstępem. AsyncApiClient to odpowiednik oparty na httpx z tym samym API.
+Funkcje modułu (list_products, add_product, ...) są cienkimi nakładkami na ApiClient
+
+CatalogReplica trzyma lokalną kopię katalogu i aktualizuje ją zmianami z GET /products/changes,
+więc po zmianie jednego produktu nie trzeba pobierać całego katalogu. Z pamięcią podręczną
+na dysku (set_disk_cache) kopia przetrwa restart aplikacji i jest od razu dostępna.
+Zdarzenia z /ws/catalog (helpers.live) są nanoszone na kopię przez `apply`
+
+Opcjonalny hook `on_timing(method, path, status, seconds)` dostaje czas każdej próby
+żądania (status None przy błędzie sieci); RequestTimings to gotowy hook zbierający statystyki
+"""
+
+
+import asyncio
+import json
+import statistics
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import AsyncIterator, Callable, Iterator
+
+import httpx
 import requests as req
+from requests.adapters import HTTPAdapter
 
-def handle_login(login, password, client_token: str, host):
+from helpers.disk_cache import DiskCache
 
-    res = req.post(
-        f"http://{host}/login?performer_token={client_token}",
-        json={"login": login, "password": password, "token": client_token}
-    )
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_CACHED_RESPONSES = 128  # odpowiedzi (ETag) pamiętanych przez klienta, najdawniej używane są usuwane
 
-    return res.json() if res.status_code == 200 else {"error": res.text}
+TimingHook = Callable[[str, str, int | None, float], None]
 
 
-def handle_register(login, password, client_token, host, name, surname, age):
-    res = req.post(
-        f"http://{host}/register?performer_token={client_token}",
-        json={
-            "login": login,
-            "password": password,
-            "name": name,
-            "surname": surname,
-            "age": age,
-            "token": client_token
+class RequestTimings:
+    """Hook on_timing zapamiętujący czasy żądań według metody i ścieżki"""
+
+    def __init__(self):
+        self.samples: dict[tuple[str, str], list[float]] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+
+    def __call__(self, method: str, path: str, status: int | None, seconds: float) -> None:
+        key = (method, path)
+        self.samples.setdefault(key, []).append(seconds)
+        if status is None or status >= 500:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Zwraca statystyki czasów
+
+        Returns:
+            dict[str, dict]: "METODA ścieżka" -> liczba żądań, błędy, mediana i maksimum w ms
+        """
+        return {
+            f"{method} {path}": {
+                "count": len(samples),
+                "errors": self.errors.get((method, path), 0),
+                "p50_ms": statistics.median(samples) * 1000,
+                "max_ms": max(samples) * 1000,
+            }
+            for (method, path), samples in self.samples.items()
         }
-    )
 
-    return res.json() if res.status_code == 200 else {"error": res.text}
 
+class _ApiBase:
+    """
+    Wspólna część klientów: adres, ustawienia ponowień i pamięć odpowiedzi (ETag)
+
+    Args:
+        host (str): Adres serwera w postaci host:port
+        timeout (float): Limit czasu pojedynczego żądania w sekundach
+        retries (int): Ile razy ponowić idempotentne żądanie po błędzie sieci lub 502/503/504
+        backoff (float): Odstęp przed pierwszym ponowieniem, podwajany przy kolejnych
+        on_timing (TimingHook | None): Wywoływany po każdej próbie żądania z jej czasem
+    """
+
+    def __init__(self, host: str, timeout: float = 5.0, retries: int = 3, backoff: float = 0.25,
+                 on_timing: TimingHook | None = None):
+        self.host = host
+        self.base_url = f"http://{host}"
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.on_timing = on_timing
+        # Pamięć odpowiedzi (LRU): klucz zapytania -> (ETag, Last-Modified, treść)
+        self._response_cache: OrderedDict[tuple, tuple[str | None, str | None, dict]] = OrderedDict()
+        self._cache_lock = Lock()
+
+    def _attempts(self, method: str) -> int:
+        return self.retries + 1 if method in IDEMPOTENT_METHODS else 1
+
+    def _delay(self, attempt: int) -> float:
+        return self.backoff * 2 ** attempt
+
+    def _record(self, method: str, path: str, status: int | None, start: float) -> None:
+        if self.on_timing is None:
+            return
+        try:
+            self.on_timing(method, path, status, time.perf_counter() - start)
+        except Exception:
+            pass  # błąd w pomiarze nie może zepsuć żądania
+
+    def _cache_key(self, path: str, params: dict) -> tuple:
+        return path, tuple(sorted((k, str(v)) for k, v in params.items() if k != "performer_token"))
+
+    def _cached(self, key: tuple) -> tuple[str | None, str | None, dict] | None:
+        with self._cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+            return cached
+
+    def _remember(self, key: tuple, entry: tuple[str | None, str | None, dict]) -> None:
+        with self._cache_lock:
+            self._response_cache[key] = entry
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > MAX_CACHED_RESPONSES:
+                self._response_cache.popitem(last=False)
+
+    def _conditional_headers(self, key: tuple) -> dict:
+        cached = self._cached(key)
+        if not cached:
+            return {}
+        etag, last_modified, _ = cached
+        if etag:
+            return {"If-None-Match": etag}
+        if last_modified:
+            return {"If-Modified-Since": last_modified}
+        return {}
+
+    def _cached_result(self, key: tuple, status_code: int, headers, text: str, json):
+        # Odpowiedź 304 oznacza, że zapamiętana treść jest aktualna
+        cached = self._cached(key)
+        if status_code == 304 and cached:
+            return cached[2]
+        if status_code != 200:
+            return {"error": text}
+        body = json()
+        if headers.get("ETag") or headers.get("Last-Modified"):
+            self._remember(key, (headers.get("ETag"), headers.get("Last-Modified"), body))
+        return body
+
+    @staticmethod
+    def _result(status_code: int, text: str, json):
+        return json() if status_code == 200 else {"error": text}
+
+    @staticmethod
+    def _params(client_token: str, **params) -> dict:
+        return {"performer_token": client_token, **{k: v for k, v in params.items() if v is not None}}
+
+    @staticmethod
+    def _register_body(login, password, client_token, name, surname, age) -> dict:
+        return {"login": login, "password": password, "name": name, "surname": surname,
+                "age": age, "token": client_token}
+
+
+class ApiClient(_ApiBase):
+    """
+    Synchroniczny klient z pulą połączeń keep-alive (requests.Session)
+
+    Args:
+        host (str): Adres serwera w postaci host:port
+        timeout (float): Limit czasu pojedynczego żądania w sekundach
+        retries (int): Liczba ponowień idempotentnych żądań
+        backoff (float): Odstęp przed pierwszym ponowieniem w sekundach
+        pool_size (int): Maksymalna liczba utrzymywanych połączeń
+        on_timing (TimingHook | None): Wywoływany po każdej próbie żądania z jej czasem
+    """
+
+    def __init__(self, host: str, timeout: float = 5.0, retries: int = 3, backoff: float = 0.25,
+                 pool_size: int = 10, on_timing: TimingHook | None = None):
+        super().__init__(host, timeout, retries, backoff, on_timing)
+        self.session = req.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _send(self, method: str, path: str, **kwargs) -> req.Response:
+        attempts = self._attempts(method)
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                res = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            except (req.ConnectionError, req.Timeout):
+                self._record(method, path, None, start)
+                if attempt == attempts - 1:
+                    raise
+            else:
+                self._record(method, path, res.status_code, start)
+                if res.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return res
+                res.close()  # odpowiedź strumieniowa trzyma połączenie do zamknięcia
+            time.sleep(self._delay(attempt))
+
+    def _call(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            res = self._send(method, path, **kwargs)
+        except req.RequestException as e:
+            return {"error": f"Błąd połączenia z serwerem: {e}"}
+        return self._result(res.status_code, res.text, res.json)
+
+    def _get_cached(self, path: str, params: dict) -> dict:
+        key = self._cache_key(path, params)
+        try:
+            res = self._send("GET", path, params=params, headers=self._conditional_headers(key))
+        except req.RequestException as e:
+            return {"error": f"Błąd połączenia z serwerem: {e}"}
+        return self._cached_result(key, res.status_code, res.headers, res.text, res.json)
+
+    def login(self, login, password, client_token: str) -> dict:
+        return self._call("POST", "/login", params={"performer_token": client_token},
+                          json={"login": login, "password": password, "token": client_token})
+
+    def register(self, login, password, client_token, name, surname, age) -> dict:
+        return self._call("POST", "/register", params={"performer_token": client_token},
+                          json=self._register_body(login, password, client_token, name, surname, age))
+
+    def list_products(self, client_token: str, **params) -> dict:
+        """
+        Pobiera produkty z katalogu
+
+        Args:
+            client_token (str): Token klienta
+            **params: Opcjonalne parametry zapytania: cursor, limit, category, min_price, max_price, sort
+        """
+        return self._get_cached("/products", self._params(client_token, **params))
+
+    def iter_products(self, client_token: str, **params) -> Iterator[dict]:
+        """
+        Pobiera produkty strumieniowo (NDJSON) i zwraca je po jednym w trakcie pobierania
+
+        Żądanie jest ponawiane i mierzone (on_timing) tak jak pozostałe odczyty - do nadejścia
+        nagłówków odpowiedzi; przerwany w trakcie strumień nie jest wznawiany
+
+        Args:
+            client_token (str): Token klienta
+            **params: Parametry zapytania jak w list_products
+
+        Raises:
+            requests.RequestException: Przy błędzie połączenia albo odpowiedzi innej niż 200
+        """
+        with self._send("GET", "/products", params=self._params(client_token, **params),
+                        headers={"Accept": "application/x-ndjson"}, stream=True) as res:
+            res.raise_for_status()
+            for line in res.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def get_product(self, product_id: int, client_token: str) -> dict:
+        return self._get_cached(f"/products/{product_id}", self._params(client_token))
+
+    def add_product(self, product: dict, client_token: str) -> dict:
+        return self._call("POST", "/add_product", params=self._params(client_token), json=product)
+
+    def remove_product(self, product_id: int | str, client_token: str) -> dict:
+        return self._call("POST", f"/remove_product/{product_id}", params=self._params(client_token))
+
+    def product_changes(self, client_token: str, since: int | None = None, epoch: str | None = None) -> dict:
+        return self._call("GET", "/products/changes", params=self._params(client_token, since=since, epoch=epoch))
+
+    def list_users(self, client_token: str) -> dict:
+        return self._call("GET", "/users", params=self._params(client_token))
+
+    def remove_user(self, login: str, client_token: str) -> dict:
+        return self._call("POST", f"/remuser/{login}", params=self._params(client_token))
+
+    def logout(self, client_token: str, login: str) -> dict:
+        return self._call("GET", f"/logout/{login}", params=self._params(client_token))
+
+    def get_cart(self, client_token: str) -> dict:
+        return self._call("GET", "/cart", params=self._params(client_token))
+
+    def save_cart(self, items: dict, client_token: str) -> dict:
+        return self._call("PUT", "/cart", params=self._params(client_token), json={"items": items})
+
+    def place_order(self, items: dict, client_token: str) -> dict:
+        """
+        Składa zamówienie na wszystkie pozycje jednym żądaniem
+
+        Args:
+            items (dict): ID produktu -> liczba sztuk
+            client_token (str): Token klienta
+        """
+        return self._call("POST", "/order", params=self._params(client_token), json={"items": items})
+
+
+class AsyncApiClient(_ApiBase):
+    """
+    Asynchroniczny odpowiednik ApiClient oparty na httpx.AsyncClient
+
+    Args:
+        host (str): Adres serwera w postaci host:port
+        timeout (float): Limit czasu pojedynczego żądania w sekundach
+        retries (int): Liczba ponowień idempotentnych żądań
+        backoff (float): Odstęp przed pierwszym ponowieniem w sekundach
+        pool_size (int): Maksymalna liczba utrzymywanych połączeń
+        on_timing (TimingHook | None): Wywoływany po każdej próbie żądania z jej czasem
+    """
+
+    def __init__(self, host: str, timeout: float = 5.0, retries: int = 3, backoff: float = 0.25,
+                 pool_size: int = 10, on_timing: TimingHook | None = None):
+        super().__init__(host, timeout, retries, backoff, on_timing)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
 
-def list_products(client_token: str, host):
-    res = req.get(f"http://{host}/products?performer_token={client_token}")
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    async def _send(self, method: str, path: str, stream: bool = False, **kwargs) -> httpx.Response:
+        attempts = self._attempts(method)
+        for attempt in range(attempts):
+            start = time.perf_counter()
+            try:
+                res = await self.client.send(self.client.build_request(method, path, **kwargs), stream=stream)
+            except (httpx.TransportError, httpx.TimeoutException):
+                self._record(method, path, None, start)
+                if attempt == attempts - 1:
+                    raise
+            else:
+                self._record(method, path, res.status_code, start)
+                if res.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return res
+                await res.aclose()  # odpowiedź strumieniowa trzyma połączenie do zamknięcia
+            await asyncio.sleep(self._delay(attempt))
+
+    async def _call(self, method: str, path: str, **kwargs) -> dict:
+        try:
+            res = await self._send(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            return {"error": f"Błąd połączenia z serwerem: {e}"}
+        return self._result(res.status_code, res.text, res.json)
+
+    async def _get_cached(self, path: str, params: dict) -> dict:
+        key = self._cache_key(path, params)
+        try:
+            res = await self._send("GET", path, params=params, headers=self._conditional_headers(key))
+        except httpx.HTTPError as e:
+            return {"error": f"Błąd połączenia z serwerem: {e}"}
+        return self._cached_result(key, res.status_code, res.headers, res.text, res.json)
+
+    async def login(self, login, password, client_token: str) -> dict:
+        return await self._call("POST", "/login", params={"performer_token": client_token},
+                                json={"login": login, "password": password, "token": client_token})
+
+    async def register(self, login, password, client_token, name, surname, age) -> dict:
+        return await self._call("POST", "/register", params={"performer_token": client_token},
+                                json=self._register_body(login, password, client_token, name, surname, age))
+
+    async def list_products(self, client_token: str, **params) -> dict:
+        return await self._get_cached("/products", self._params(client_token, **params))
+
+    async def get_product(self, product_id: int, client_token: str) -> dict:
+        return await self._get_cached(f"/products/{product_id}", self._params(client_token))
+
+    async def iter_products(self, client_token: str, **params) -> AsyncIterator[dict]:
+        """Asynchroniczna wersja `ApiClient.iter_products`"""
+        res = await self._send("GET", "/products", params=self._params(client_token, **params),
+                               headers={"Accept": "application/x-ndjson"}, stream=True)
+        try:
+            res.raise_for_status()
+            async for line in res.aiter_lines():
+                if line:
+                    yield json.loads(line)
+        finally:
+            await res.aclose()
+
+    async def add_product(self, product: dict, client_token: str) -> dict:
+        return await self._call("POST", "/add_product", params=self._params(client_token), json=product)
+
+    async def remove_product(self, product_id: int | str, client_token: str) -> dict:
+        return await self._call("POST", f"/remove_product/{product_id}", params=self._params(client_token))
+
+    async def product_changes(self, client_token: str, since: int | None = None, epoch: str | None = None) -> dict:
+        return await self._call("GET", "/products/changes",
+                                params=self._params(client_token, since=since, epoch=epoch))
+
+    async def list_users(self, client_token: str) -> dict:
+        return await self._call("GET", "/users", params=self._params(client_token))
+
+    async def remove_user(self, login: str, client_token: str) -> dict:
+        return await self._call("POST", f"/remuser/{login}", params=self._params(client_token))
+
+    async def logout(self, client_token: str, login: str) -> dict:
+        return await self._call("GET", f"/logout/{login}", params=self._params(client_token))
+
+    async def get_cart(self, client_token: str) -> dict:
+        return await self._call("GET", "/cart", params=self._params(client_token))
+
+    async def save_cart(self, items: dict, client_token: str) -> dict:
+        return await self._call("PUT", "/cart", params=self._params(client_token), json={"items": items})
+
+    async def place_order(self, items: dict, client_token: str) -> dict:
+        return await self._call("POST", "/order", params=self._params(client_token), json={"items": items})
+
+
+class CatalogReplica:
+    """
+    Lokalna kopia katalogu aktualizowana przyrostowo
+
+    Args:
+        client (ApiClient): Klient serwera
+        disk (DiskCache | None): Pamięć podręczna, z której kopia jest wczytywana i do której
+            jest zapisywana po każdej zmianie
+    """
+
+    def __init__(self, client: ApiClient, disk: DiskCache | None = None):
+        self.client = client
+        self.disk = disk
+        self.key = f"catalog:{client.host}"
+        self.products: dict[int, dict] = {}
+        self.version: int | None = None
+        self.epoch: str | None = None
+        self._lock = Lock()
+        self._response: dict | None = None
+        self._unsaved = False
+        if disk is not None:
+            self._restore()
+
+    def _restore(self) -> None:
+        cached = self.disk.get(self.key)
+        if cached is None:
+            return
+        products, stamp = cached
+        epoch, _, version = (stamp or "").rpartition(":")
+        if not version.isdigit():
+            return
+        self.products = {p["id"]: p for p in products}
+        self.version, self.epoch = int(version), epoch
+        self._response = {"products": list(self.products.values())}
+
+    def cached(self) -> dict | None:
+        """Zwraca ostatni znany stan katalogu ({"products": [...]}) bez pytania serwera"""
+        return self._response
+
+    def sync(self, client_token: str) -> dict:
+        """
+        Pobiera zmiany od ostatniej synchronizacji i nanosi je na kopię
+
+        Args:
+            client_token (str): Token klienta
+
+        Returns:
+            dict: {"products": [...]} - ten sam obiekt, jeśli katalog się nie zmienił -
+                albo {"error": ...}, jeśli serwer nie odpowiedział
+        """
+        with self._lock:
+            changes = self.client.product_changes(client_token, self.version, self.epoch)
+            if changes.get("error"):
+                return changes
+            if changes["snapshot"]:
+                self.products = {p["id"]: p for p in changes["products"]}
+                changed = True
+            else:
+                for product in changes["upserts"]:
+                    self.products[product["id"]] = product
+                for product_id in changes["deletes"]:
+                    self.products.pop(product_id, None)
+                changed = bool(changes["upserts"] or changes["deletes"])
+            self.version, self.epoch = changes["version"], changes["epoch"]
+            if changed or self._response is None:
+                self._response = {"products": list(self.products.values())}
+            if changed or changes["snapshot"]:
+                self._unsaved = True
+            self._save()
+            return self._response
+
+    def apply(self, event: dict) -> dict | None:
+        """
+        Nanosi na kopię zdarzenie "changes" z /ws/catalog
+
+        Args:
+            event (dict): Zdarzenie z "epoch", "from", "version", "upserts" i "deletes"
+
+        Returns:
+            dict | None: {"upserts", "deletes", "base", "products"} - zmiany naniesione na kopię,
+                odpowiedź sprzed zmiany i bieżąca odpowiedź - albo None, jeśli zdarzenie nie
+                pasuje do kopii (brakuje wcześniejszych zmian) i trzeba wywołać `sync`
+        """
+        with self._lock:
+            if self.version is None or event["epoch"] != self.epoch or event["from"] > self.version:
+                return None
+            base = self._response
+            if event["version"] <= self.version:  # zmiany są już w kopii (np. po sync)
+                return {"upserts": [], "deletes": [], "base": base, "products": base}
+            for product in event["upserts"]:
+                self.products[product["id"]] = product
+            for product_id in event["deletes"]:
+                self.products.pop(product_id, None)
+            self.version = event["version"]
+            self._response = {"products": list(self.products.values())}
+            self._unsaved = True  # na dysk trafia przy następnej synchronizacji albo w `save`
+            return {"upserts": event["upserts"], "deletes": event["deletes"], "base": base,
+                    "products": self._response}
+
+    def save(self) -> None:
+        """Zapisuje kopię na dysku, jeśli zmieniła się od ostatniego zapisu"""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if self.disk is not None and self._unsaved and self._response is not None:
+            self.disk.put(self.key, self._response["products"], stamp=f"{self.epoch}:{self.version}")
+            self._unsaved = False
+
+
+_clients: dict[str, ApiClient] = {}
+_replicas: dict[str, CatalogReplica] = {}
+_timing_hook: TimingHook | None = None
+_disk_cache: DiskCache | None = None
+
+
+def get_client(host: str) -> ApiClient:
+    """Zwraca współdzielonego klienta dla hosta (tworzy go przy pierwszym użyciu)"""
+    client = _clients.get(host)
+    if client is None:
+        client = _clients[host] = ApiClient(host, on_timing=_timing_hook)
+    return client
+
+
+def set_disk_cache(cache: DiskCache | None) -> None:
+    """Ustawia pamięć podręczną na dysku dla kopii katalogu tworzonych od tej chwili"""
+    global _disk_cache
+    _disk_cache = cache
+
+
+def get_replica(host: str) -> CatalogReplica:
+    """Zwraca lokalną kopię katalogu dla hosta (przy pierwszym użyciu wczytaną z dysku)"""
+    replica = _replicas.get(host)
+    if replica is None:
+        replica = _replicas[host] = CatalogReplica(get_client(host), _disk_cache)
+    return replica
+
+
+def set_timing_hook(hook: TimingHook | None) -> None:
+    """Ustawia hook pomiaru czasu żądań dla współdzielonych klientów (None wyłącza pomiar)"""
+    global _timing_hook
+    _timing_hook = hook
+    for client in _clients.values():
+        client.on_timing = hook
+
+
+# Nakładki zgodne z dotychczasowymi wywołaniami w app.py
+
+def handle_login(login, password, client_token: str, host):
+    return get_client(host).login(login, password, client_token)
+
+
+def handle_register(login, password, client_token, host, name, surname, age):
+    return get_client(host).register(login, password, client_token, name, surname, age)
+
+
+def list_products(client_token: str, host, **params):
+    return get_client(host).list_products(client_token, **params)
+
+
+def sync_catalog(client_token: str, host):
+    """Synchronizuje lokalną kopię katalogu dla hosta i zwraca ją jak list_products"""
+    return get_replica(host).sync(client_token)
+
+
+def save_catalog(host):
+    """Zapisuje na dysku zmiany kopii katalogu naniesione ze zdarzeń /ws/catalog"""
+    get_replica(host).save()
+
+
+def cached_catalog(host):
+    """Zwraca katalog z lokalnej kopii (z dysku po restarcie) albo None, bez pytania serwera"""
+    return get_replica(host).cached()
 
 
 def add_product(product: dict, client_token: str, host):
-    res = req.post(
-        f"http://{host}/add_product?performer_token={client_token}",
-        json=product
-    )
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    return get_client(host).add_product(product, client_token)
 
 def list_users(client_token: str, host):
-    res = req.get(f"http://{host}/users?performer_token={client_token}")
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    return get_client(host).list_users(client_token)
 
 def remove_user(login: int, client_token: str, host):
-    res = req.post(
-        f"http://{host}/remuser/{login}?performer_token={client_token}"
-    )
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    return get_client(host).remove_user(login, client_token)
 
 def remove_product(product_id: int, client_token: str, host):
-    res = req.post(
-        f"http://{host}/remove_product/{product_id}?performer_token={client_token}"
-    )
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    return get_client(host).remove_product(product_id, client_token)
 
 def get_product(product_id: int, client_token: str, host):
-    res = req.get(
-        f"http://{host}/products/{product_id}?performer_token={client_token}"
-    )
-    return res.json() if res.status_code == 200 else {"error": res.text}
+    return get_client(host).get_product(product_id, client_token)
 
 def logout(client_token: str, login:str, host):
-    res = req.post(
-        f"http://{host}/logout/{login}?performer_token={client_token}"
-    )
-    return res.json() if res.status_code == 200 else {"error": res.text}
\ No newline at end of file
+    return get_client(host).logout(client_token, login)
+
+def get_cart(client_token: str, host):
+    return get_client(host).get_cart(client_token)
+
+def save_cart(items: dict, client_token: str, host):
+    return get_client(host).save_cart(items, client_token)
+
+def place_order(items: dict, client_token: str, host):
+    return get_client(host).place_order(items, client_token)
@@ -0,0 +1,87 @@
+"""
+Koszyk klienta
+
+Pozycje są trzymane w słowniku ID produktu -> [produkt, liczba sztuk], więc dodanie,
+usunięcie i odczyt liczby sztuk nie wymagają przeglądania całego koszyka
+"""
+
+
+class Cart:
+    """Koszyk indeksowany po ID produktu (kolejność pozycji odpowiada kolejności dodania)"""
+
+    def __init__(self):
+        self._items: dict[int, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def count(self, product: dict) -> int:
+        """Zwraca liczbę sztuk produktu w koszyku"""
+        entry = self._items.get(product["id"])
+        return entry[1] if entry else 0
+
+    def add(self, product: dict, count: int = 1) -> int:
+        """
+        Dodaje sztuki produktu do koszyka
+
+        Args:
+            product (dict): Produkt z katalogu
+            count (int): Liczba dodawanych sztuk
+
+        Returns:
+            int: Liczba sztuk po zmianie
+        """
+        entry = self._items.get(product["id"])
+        if entry is None:
+            entry = self._items[product["id"]] = [product, 0]
+        entry[1] += count
+        return entry[1]
+
+    def remove(self, product: dict) -> int:
+        """
+        Usuwa jedną sztukę produktu (pozycja znika, gdy liczba spadnie do zera)
+
+        Returns:
+            int: Liczba sztuk po zmianie
+        """
+        entry = self._items.get(product["id"])
+        if entry is None:
+            return 0
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._items[product["id"]]
+            return 0
+        return entry[1]
+
+    def products(self) -> list[dict]:
+        """Zwraca produkty w koszyku"""
+        return [entry[0] for entry in self._items.values()]
+
+    def total(self) -> int:
+        """Zwraca wartość koszyka w groszach"""
+        return sum((entry[0].get("price") or 0) * entry[1] for entry in self._items.values())
+
+    def payload(self) -> dict[str, int]:
+        """Zwraca koszyk w postaci wysyłanej do serwera {ID produktu: liczba sztuk}"""
+        return {str(product_id): entry[1] for product_id, entry in self._items.items()}
+
+    def entries(self) -> list[dict]:
+        """Zwraca pozycje w postaci przyjmowanej przez merge ({"product": ..., "quantity": ...})"""
+        return [{"product": product, "quantity": count} for product, count in self._items.values()]
+
+    def merge(self, items: list[dict]) -> None:
+        """
+        Dodaje pozycje koszyka zapisanego na serwerze (odpowiedź GET /cart)
+
+        Args:
+            items (list[dict]): Pozycje {"product": ..., "quantity": ...}
+        """
+        for item in items:
+            self.add(item["product"], item["quantity"])
+
+    def clear(self) -> None:
+        """Opróżnia koszyk"""
+        self._items.clear()
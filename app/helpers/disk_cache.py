@@ -0,0 +1,175 @@
+"""
+Trwała pamięć podręczna klienta na dysku
+
+Katalog, profil ostatnio zalogowanego użytkownika i koszyk są zapisywane w bazie SQLite
+w katalogu pamięci podręcznej użytkownika, więc po uruchomieniu aplikacja może je pokazać
+od razu, a serwer odpytać w tle
+
+Każdy wpis ma znacznik wersji danych (np. wersję katalogu z serwera), a cała baza numer
+wersji formatu - po jego zmianie zawartość jest usuwana. Rozmiar bazy jest ograniczony:
+po przekroczeniu limitu usuwane są najdawniej używane wpisy. Błędy dysku nie przerywają pracy
+aplikacji - pamięć podręczna zachowuje się wtedy jak pusta
+"""
+
+
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from threading import Lock
+
+from utils import logger
+
+APP_NAME = "FrogStore"
+FORMAT_VERSION = 1
+MAX_BYTES = 64 * 1024 * 1024        # łączny rozmiar wpisów
+MAX_ENTRY_BYTES = 32 * 1024 * 1024  # większych wpisów nie zapisujemy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    stamp TEXT,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+)
+"""
+
+
+def default_cache_dir() -> str:
+    """Zwraca katalog pamięci podręcznej użytkownika dla aplikacji (zależny od systemu)"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, APP_NAME, "Cache")
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Caches"), APP_NAME)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, APP_NAME.lower())
+
+
+class DiskCache:
+    """
+    Słownik klucz -> wartość JSON (ze znacznikiem wersji) zapisywany w SQLite
+
+    Args:
+        path (str | None): Plik bazy; domyślnie cache.sqlite3 w default_cache_dir()
+        max_bytes (int): Limit łącznego rozmiaru wpisów (po kompresji)
+        max_entry_bytes (int): Limit rozmiaru pojedynczego wpisu
+    """
+
+    def __init__(self, path: str | None = None, max_bytes: int = MAX_BYTES, max_entry_bytes: int = MAX_ENTRY_BYTES):
+        self.path = path or os.path.join(default_cache_dir(), "cache.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._lock = Lock()
+        self._conn: sqlite3.Connection | None = None
+        try:
+            self._conn = self._open()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Pamięć podręczna na dysku jest niedostępna: %s", e)
+
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Zapisy idą z wątków w tle, odczyty z wątku interfejsu - dostęp chroni self._lock
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != FORMAT_VERSION:
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute(f"PRAGMA user_version={FORMAT_VERSION}")
+        conn.execute(SCHEMA)
+        return conn
+
+    def get(self, key: str) -> tuple[object, str | None] | None:
+        """
+        Zwraca wartość i jej znacznik wersji
+
+        Args:
+            key (str): Klucz wpisu
+
+        Returns:
+            tuple[object, str | None] | None: (wartość, znacznik) albo None, jeśli wpisu nie ma
+        """
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value, stamp FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+            return json.loads(zlib.decompress(row[0])), row[1]
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning("Nie udało się odczytać %s z pamięci podręcznej: %s", key, e)
+            return None
+
+    def put(self, key: str, value, stamp: str | None = None) -> bool:
+        """
+        Zapisuje wartość (serializowalną do JSON) pod kluczem
+
+        Args:
+            key (str): Klucz wpisu
+            value: Wartość
+            stamp (str | None): Znacznik wersji danych
+
+        Returns:
+            bool: False, jeśli wpis nie został zapisany (za duży albo błąd dysku)
+        """
+        if self._conn is None:
+            return False
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        if len(blob) > self.max_entry_bytes:
+            logger.warning("Wpis %s (%d B) przekracza limit pamięci podręcznej", key, len(blob))
+            return False
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute("INSERT OR REPLACE INTO entries (key, stamp, value, size, used_at) "
+                                       "VALUES (?, ?, ?, ?, ?)", (key, stamp, blob, len(blob), time.time()))
+                    self._evict()
+                    self._conn.execute("COMMIT")
+                except sqlite3.Error:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Nie udało się zapisać %s w pamięci podręcznej: %s", key, e)
+            return False
+
+    def _evict(self) -> None:
+        # Usuwa najdawniej używane wpisy, dopóki łączny rozmiar przekracza limit
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY used_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+    def delete(self, key: str) -> None:
+        """Usuwa wpis"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning("Nie udało się usunąć %s z pamięci podręcznej: %s", key, e)
+
+    def clear(self) -> None:
+        """Usuwa wszystkie wpisy"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        """Zamyka bazę"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,117 @@
+"""
+Zmiany katalogu na żywo (/ws/catalog)
+
+CatalogFeed utrzymuje w wątku w tle połączenie WebSocket z serwerem i nanosi otrzymane
+zmiany na lokalną kopię katalogu (CatalogReplica), bez pobierania całego katalogu.
+Kopia jest synchronizowana przez GET /products/changes tylko wtedy, gdy zdarzenia nie
+wystarczą: po "hello" z inną wersją niż kopia, po "resync" (serwer odrzucił zaległe
+zdarzenia) i po zdarzeniu, przed którym brakuje zmian. Po zerwaniu połączenia feed łączy
+się ponownie z rosnącym odstępem
+
+Funkcja on_update(odpowiedź, zmiany) jest wywoływana w wątku feedu - interfejs powinien
+przekazać wynik do wątku Tk (TaskRunner.call)
+"""
+
+
+import json
+from threading import Event, Thread
+from typing import Callable
+
+from websockets.exceptions import WebSocketException
+from websockets.sync.client import ClientConnection, connect
+
+from helpers.api import CatalogReplica
+from utils import logger
+
+RECONNECT_MIN = 1.0   # sekundy do pierwszej próby ponownego połączenia
+RECONNECT_MAX = 30.0  # największy odstęp między próbami
+OPEN_TIMEOUT = 5.0
+
+UpdateHook = Callable[[dict, dict | None], None]
+
+
+class CatalogFeed:
+    """
+    Subskrypcja zmian katalogu w wątku w tle
+
+    Args:
+        replica (CatalogReplica): Lokalna kopia katalogu, na którą nanoszone są zmiany
+        client_token (str): Token klienta (do synchronizacji przez HTTP)
+        on_update (UpdateHook): Wywoływana z bieżącą odpowiedzią ({"products": [...]}) i zmianami
+            ({"upserts", "deletes", "base", ...} z CatalogReplica.apply) albo None, jeśli kopię
+            zsynchronizowano przez HTTP
+        reconnect_min (float): Odstęp przed pierwszą próbą ponownego połączenia
+        reconnect_max (float): Największy odstęp między próbami
+    """
+
+    def __init__(self, replica: CatalogReplica, client_token: str, on_update: UpdateHook,
+                 reconnect_min: float = RECONNECT_MIN, reconnect_max: float = RECONNECT_MAX):
+        self.replica = replica
+        self.client_token = client_token
+        self.on_update = on_update
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.url = f"ws://{replica.client.host}/ws/catalog"
+        self._stop = Event()
+        self._ws: ClientConnection | None = None
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """Uruchamia wątek subskrypcji"""
+        if self._thread is None:
+            self._thread = Thread(target=self._run, name="catalog-feed", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Zamyka połączenie i zatrzymuje wątek"""
+        self._stop.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        delay = self.reconnect_min
+        while not self._stop.is_set():
+            try:
+                with connect(self.url, open_timeout=OPEN_TIMEOUT, close_timeout=1) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_min
+                    logger.debug("Połączono z %s", self.url)
+                    for message in ws:
+                        self.handle(json.loads(message))
+            except (OSError, TimeoutError, WebSocketException) as e:
+                logger.debug("Brak połączenia z %s: %s", self.url, e, rate=60)
+            except Exception as e:  # błąd obsługi zdarzenia - po ponownym połączeniu kopia się zsynchronizuje
+                logger.error("Błąd podczas obsługi zmian katalogu: %s", e, exc_info=True)
+            finally:
+                self._ws = None
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.reconnect_max)
+
+    def handle(self, event: dict) -> None:
+        """
+        Nanosi zdarzenie z /ws/catalog na kopię katalogu i powiadamia on_update o zmianach
+
+        Args:
+            event (dict): Zdarzenie ("hello", "changes" albo "resync")
+        """
+        kind = event.get("type")
+        if kind == "changes":
+            delta = self.replica.apply(event)
+            if delta is not None:
+                if delta["upserts"] or delta["deletes"]:
+                    self.on_update(delta["products"], delta)
+                return
+        elif kind == "hello":
+            if event.get("epoch") == self.replica.epoch and event.get("version") == self.replica.version:
+                return
+        elif kind != "resync":
+            return  # zdarzenie nieznane tej wersji klienta
+
+        response = self.replica.sync(self.client_token)
+        if not response.get("error"):
+            self.on_update(response, None)
@@ -0,0 +1,44 @@
+"""
+Ceny po stronie klienta
+
+Serwer przesyła ceny jako liczby całkowite w groszach. Na złote i "zł" zamieniamy je
+dopiero przy wyświetlaniu, a wpisaną przez użytkownika kwotę od razu na grosze
+"""
+
+
+PRICE_SCALE = 100
+
+
+def format_price(grosze) -> str:
+    """
+    Formatuje cenę w groszach do wyświetlenia, np. 599 -> "5,99 zł"
+
+    Args:
+        grosze: Cena w groszach (None, jeśli produkt nie ma ceny)
+
+    Returns:
+        str: Cena do wyświetlenia
+    """
+    if grosze is None:
+        return "-"
+    zloty, rest = divmod(int(grosze), PRICE_SCALE)
+    return f"{zloty},{rest:02d} zł"
+
+
+def parse_price_input(text: str) -> int:
+    """
+    Zamienia kwotę wpisaną w złotych ("5,99", "5.99", "12 zł") na grosze
+
+    Args:
+        text (str): Kwota w złotych
+
+    Returns:
+        int: Cena w groszach
+
+    Raises:
+        ValueError: Jeśli kwoty nie da się odczytać albo jest ujemna
+    """
+    value = float(text.lower().replace("zł", "").replace(",", ".").strip())
+    if value < 0:
+        raise ValueError("Cena nie może być ujemna")
+    return round(value * PRICE_SCALE)
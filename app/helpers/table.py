@@ -0,0 +1,214 @@
+"""
+Tabela z wirtualnym przewijaniem
+
+Zamiast tworzyć widgety dla każdego wiersza, tabela trzyma stałą pulę wierszy o wysokości
+widocznego obszaru i przy przewijaniu tylko podmienia ich treść. Sortowanie odbywa się na
+danych w pamięci, więc koszt rysowania nie zależy od wielkości katalogu
+"""
+
+
+import tkinter
+from typing import Callable
+
+from customtkinter import *
+
+CHAR_WIDTH = 8  # przybliżona szerokość znaku czcionki Arial 12 w pikselach
+
+
+def sort_value(value) -> tuple:
+    """
+    Zwraca klucz sortowania komórki: liczby (także zapisane tekstem, np. "12.50") przed tekstem
+
+    Args:
+        value: Wartość komórki
+
+    Returns:
+        tuple: Klucz porównywalny między wierszami
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return 0, value, ""
+    text = "" if value is None else str(value)
+    try:
+        return 0, float(text.split(" ")[0].replace(",", ".")), ""
+    except ValueError:
+        return 1, 0, text.lower()
+
+
+class VirtualTable(CTkFrame):
+    """
+    Tabela wyświetlająca tylko widoczne wiersze
+
+    Args:
+        master: Kontener nadrzędny
+        rows (list[dict]): Wiersze tabeli
+        columns (list[str] | None): Wyświetlane kolumny, domyślnie klucze pierwszego wiersza bez "id"
+        height (int): Liczba jednocześnie widocznych wierszy (wielkość puli)
+        count (Callable | None): Zwraca liczbę sztuk wiersza w koszyku (kolumna "W koszyku")
+        on_change (Callable | None): Wywoływana z (wiersz, usuń) po kliknięciu "+" lub "-"
+        formatters (dict[str, Callable] | None): Funkcje formatujące wartości kolumn do wyświetlenia
+            (sortowanie odbywa się na wartościach surowych)
+    """
+
+    def __init__(self, master, rows: list[dict], columns: list[str] | None = None, height: int = 15,
+                 count: Callable[[dict], int] | None = None,
+                 on_change: Callable[[dict, bool], None] | None = None,
+                 formatters: dict[str, Callable] | None = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.rows = list(rows)
+        self.columns = columns or [col for col in (rows[0] if rows else {}) if col != "id"]
+        self.height = min(height, len(self.rows)) or 1
+        self.count = count
+        self.on_change = on_change
+        self.formatters = formatters or {}
+        self.offset = 0
+        self.sort_column: str | None = None
+        self.descending = False
+
+        self._headers: dict[str, CTkButton] = {}
+        self._slots: list[dict] = []
+
+        self._build()
+        self._bind_wheel(self)
+        self.refresh()
+
+    def _build(self) -> None:
+        widths = {
+            col: min(300, max(60, CHAR_WIDTH * max([len(col)] + [len(self._text(row, col)) for row in self.rows])))
+            for col in self.columns
+        }
+
+        for j, col in enumerate(self.columns):
+            header = CTkButton(self, text=col, font=("Arial", 15, "bold"), fg_color="transparent",
+                               width=widths[col], command=lambda c=col: self.sort_by(c))
+            header.grid(row=0, column=j, padx=10, pady=5, sticky=NSEW)
+            self._headers[col] = header
+            self.grid_columnconfigure(j, weight=1)
+
+        extra = len(self.columns)
+        if self.count:
+            CTkLabel(self, text="W koszyku", font=("Arial", 15, "bold")).grid(row=0, column=extra, padx=10, pady=5)
+        if self.on_change:
+            CTkLabel(self, text="Akcje", font=("Arial", 15, "bold")).grid(row=0, column=extra + 1, padx=10, pady=5)
+
+        for i in range(1, self.height + 1):
+            slot = {"row": None, "cells": []}
+            for j, col in enumerate(self.columns):
+                cell = CTkLabel(self, text="", font=("Arial", 12), width=widths[col])
+                cell.grid(row=i, column=j, padx=10, pady=5, sticky=NSEW)
+                slot["cells"].append(cell)
+            if self.count:
+                slot["count"] = CTkLabel(self, text="", font=("Arial", 12))
+                slot["count"].grid(row=i, column=extra, padx=10, pady=5, sticky=NSEW)
+            if self.on_change:
+                actions = CTkFrame(self)
+                CTkButton(actions, text="+", width=40, command=lambda s=slot: self._change(s, False)).pack(side=LEFT, padx=2)
+                CTkButton(actions, text="-", width=40, command=lambda s=slot: self._change(s, True)).pack(side=LEFT, padx=2)
+                actions.grid(row=i, column=extra + 1, padx=10, pady=5, sticky=NSEW)
+                slot["actions"] = actions
+            self._slots.append(slot)
+
+        self.scrollbar = CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=extra + 2, rowspan=self.height, sticky=NS)
+
+    def _text(self, row: dict, column: str) -> str:
+        formatter = self.formatters.get(column)
+        return formatter(row.get(column)) if formatter else str(row.get(column))
+
+    def _bind_wheel(self, widget) -> None:
+        # Wiązania na poziomie tkinter, bo widgety CTk składają się z kilku widgetów Tk
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event) -> None:
+        if getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+
+    def _on_scrollbar(self, action: str, value, unit: str | None = None) -> None:
+        if action == "moveto":
+            self.scroll_to(round(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self.scroll_to(self.offset + int(value) * step)
+
+    def _change(self, slot: dict, remove: bool) -> None:
+        if slot["row"] is not None:
+            self.on_change(slot["row"], remove)
+            self.refresh()
+
+    def scroll_to(self, offset: int) -> None:
+        """
+        Przewija tabelę tak, by wiersz offset był pierwszym widocznym
+
+        Args:
+            offset (int): Indeks pierwszego widocznego wiersza
+        """
+        offset = max(0, min(offset, len(self.rows) - self.height))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def sort_by(self, column: str) -> None:
+        """
+        Sortuje wiersze po kolumnie; ponowne kliknięcie odwraca kolejność
+
+        Args:
+            column (str): Nazwa kolumny
+        """
+        self.descending = not self.descending if column == self.sort_column else False
+        self.sort_column = column
+        self.rows.sort(key=lambda row: sort_value(row.get(column)), reverse=self.descending)
+        for col, header in self._headers.items():
+            arrow = (" ▼" if self.descending else " ▲") if col == column else ""
+            header.configure(text=col + arrow)
+        self.offset = 0
+        self.refresh()
+
+    def apply(self, upserts: list[dict], deletes: list, key: str = "id") -> None:
+        """
+        Nanosi zmiany na wiersze w miejscu (bez przebudowy widgetów), zachowując sortowanie i przewinięcie
+
+        Args:
+            upserts (list[dict]): Nowe lub zmienione wiersze (zmienione zastępują wiersze o tym samym kluczu)
+            deletes (list): Klucze usuniętych wierszy
+            key (str): Kolumna identyfikująca wiersz
+        """
+        changed = {row[key]: row for row in upserts}
+        removed = set(deletes)
+        rows = []
+        for row in self.rows:
+            row_key = row.get(key)
+            if row_key in removed:
+                continue
+            rows.append(changed.pop(row_key, row))
+        rows.extend(changed.values())  # nowe wiersze
+        if self.sort_column is not None:
+            rows.sort(key=lambda row: sort_value(row.get(self.sort_column)), reverse=self.descending)
+        self.rows = rows
+        self.offset = max(0, min(self.offset, len(self.rows) - self.height))
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Wpisuje widoczne wiersze do puli widgetów"""
+        for i, slot in enumerate(self._slots):
+            index = self.offset + i
+            row = self.rows[index] if index < len(self.rows) else None
+            slot["row"] = row
+            for col, cell in zip(self.columns, slot["cells"]):
+                cell.configure(text="" if row is None else self._text(row, col))
+            if self.count:
+                slot["count"].configure(text="" if row is None else str(self.count(row)))
+            if self.on_change:
+                if row is None:
+                    slot["actions"].grid_remove()
+                else:
+                    slot["actions"].grid()
+
+        total = len(self.rows)
+        if total > self.height:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)
+        else:
+            self.scrollbar.set(0, 1)
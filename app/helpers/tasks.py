@@ -0,0 +1,88 @@
+"""
+Zadania w tle dla interfejsu
+
+Blokujące operacje (zapytania HTTP) wykonują się na puli wątków, a ich wyniki są
+przekazywane do wątku Tk przez kolejkę odczytywaną cyklicznie przez root.after,
+więc okno nie zamarza na czas zapytania
+"""
+
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from typing import Callable
+
+from utils import logger
+
+
+class TaskRunner:
+    """
+    Wykonawca zadań w tle z odbiorem wyników w wątku Tk
+
+    Args:
+        root: Główne okno aplikacji (CTk)
+        workers (int): Liczba wątków roboczych
+        interval (int): Co ile milisekund odbierać gotowe wyniki
+    """
+
+    def __init__(self, root, workers: int = 4, interval: int = 30):
+        self.root = root
+        self.interval = interval
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gui-task")
+        self._done: SimpleQueue = SimpleQueue()
+        self.root.after(self.interval, self._poll)
+
+    def submit(self, fn: Callable, *args, on_done: Callable | None = None,
+               on_error: Callable[[BaseException], None] | None = None, **kwargs) -> Future:
+        """
+        Zleca wykonanie funkcji w tle
+
+        Args:
+            fn (Callable): Funkcja do wykonania w wątku roboczym
+            *args: Argumenty funkcji
+            on_done (Callable | None): Wywoływana w wątku Tk z wynikiem funkcji
+            on_error (Callable | None): Wywoływana w wątku Tk z wyjątkiem, jeśli funkcja się nie powiodła
+            **kwargs: Argumenty nazwane funkcji
+
+        Returns:
+            Future: Przyszły wynik zadania
+        """
+        future = self._pool.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda f: self._done.put((f, on_done, on_error)))
+        return future
+
+    def call(self, fn: Callable, *args) -> None:
+        """
+        Zleca wywołanie funkcji w wątku Tk (można wywołać z dowolnego wątku)
+
+        Args:
+            fn (Callable): Funkcja do wywołania
+            *args: Argumenty funkcji
+        """
+        future = Future()
+        future.set_result(args)
+        self._done.put((future, lambda result: fn(*result), None))
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                future, on_done, on_error = self._done.get_nowait()
+            except Empty:
+                break
+            try:
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    logger.error("Zadanie w tle nie powiodło się: %s", error)
+            except Exception as e:  # błąd w obsłudze wyniku nie może zatrzymać odbioru kolejnych
+                logger.error("Błąd podczas obsługi wyniku zadania: %s", e, exc_info=True)
+        self.root.after(self.interval, self._poll)
+
+    def shutdown(self) -> None:
+        """Anuluje oczekujące zadania i zamyka pulę"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
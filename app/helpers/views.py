@@ -0,0 +1,84 @@
+"""
+Pamięć zbudowanych widoków
+
+Zamiast niszczyć widok przy każdym przejściu i budować go od nowa, zbudowane ramki są
+ukrywane i trzymane w pamięci. Widok jest usuwany, gdy jego dane się zmienią
+(invalidate / clear) albo gdy przekroczony zostanie limit widoków - wtedy niszczony jest
+najdawniej oglądany widok, który nie jest akurat na ekranie
+"""
+
+
+from collections import OrderedDict
+
+
+class ViewCache:
+    """
+    Ukryte widoki indeksowane nazwą funkcji renderującej, z limitem rozmiaru (LRU)
+
+    Args:
+        max_views (int): Maksymalna liczba trzymanych widoków (razem z wyświetlanym)
+    """
+
+    def __init__(self, max_views: int = 4):
+        self.max_views = max_views
+        # Kolejność odpowiada ostatniemu wyświetleniu - na początku najdawniej oglądane
+        self._views: OrderedDict = OrderedDict()
+        self.current = None
+
+    def __contains__(self, frame) -> bool:
+        return any(cached is frame for cached in self._views.values())
+
+    def get(self, name: str):
+        """
+        Zwraca zapamiętany widok i oznacza go jako ostatnio oglądany
+
+        Args:
+            name (str): Nazwa widoku
+
+        Returns:
+            Ramka widoku albo None, jeśli trzeba go zbudować
+        """
+        frame = self._views.get(name)
+        if frame is None:
+            return None
+        if not frame.winfo_exists():
+            del self._views[name]
+            return None
+        self._views.move_to_end(name)
+        return frame
+
+    def put(self, name: str, frame) -> None:
+        """
+        Zapamiętuje widok i usuwa najdawniej oglądane widoki ponad limit
+
+        Args:
+            name (str): Nazwa widoku
+            frame: Ramka widoku
+        """
+        old = self._views.pop(name, None)
+        if old is not None and old is not frame:
+            self._destroy(old)
+        self._views[name] = frame
+        while len(self._views) > self.max_views:
+            evicted = next(name for name, cached in self._views.items() if cached is not self.current)
+            self._destroy(self._views.pop(evicted))
+
+    def invalidate(self, *names: str) -> None:
+        """
+        Usuwa widoki, których dane się zmieniły (wyświetlany widok zostanie zniszczony po opuszczeniu)
+
+        Args:
+            *names (str): Nazwy widoków
+        """
+        for name in names:
+            frame = self._views.pop(name, None)
+            if frame is not None:
+                self._destroy(frame)
+
+    def clear(self) -> None:
+        """Usuwa wszystkie widoki (np. po zmianie sesji)"""
+        self.invalidate(*list(self._views))
+
+    def _destroy(self, frame) -> None:
+        if frame is not self.current:
+            frame.destroy()
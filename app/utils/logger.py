@@ -1,35 +1,222 @@
-from typing import Literal
+"""
+Logowanie komunikatów aplikacji
 
+Komunikaty mają poziomy (debug, info, warning, error) i opcjonalne pola strukturalne.
+Wywołanie tylko sprawdza poziom i wkłada rekord do kolejki - formatowanie i zapis
+(konsola oraz opcjonalnie plik JSON lines z rotacją) odbywają się w wątku w tle
 
-def log(message: str = "", type: Literal["info", "error"] = "info") -> None:
+Treść jest formatowana leniwie: argumenty w stylu `info("Odpowiedź: %s", response)` albo
+funkcja zwracająca treść są wyliczane dopiero przy zapisie i tylko, gdy poziom jest włączony.
+Parametr `rate` ogranicza częstość powtarzających się komunikatów
+
+Poziom i plik można ustawić przez `configure` albo zmienne środowiskowe ZABKA_LOG_LEVEL
+i ZABKA_LOG_FILE
+"""
+
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from threading import Lock
+from typing import Callable, Literal
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+
+_logger = logging.getLogger("zabka")
+_logger.propagate = False
+_logger.setLevel(LEVELS.get(os.environ.get("ZABKA_LOG_LEVEL", "info"), logging.INFO))
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_listener: logging.handlers.QueueListener | None = None
+
+_setup_lock = Lock()
+_rate_lock = Lock()
+_rate: dict[str, list] = {}  # szablon komunikatu -> [czas ostatniego zapisu, liczba pominiętych]
+
+
+class _Record(logging.LogRecord):
+    # Treść podana jako funkcja jest wywoływana dopiero w wątku zapisującym
+    def getMessage(self) -> str:
+        msg = self.msg() if callable(self.msg) else str(self.msg)
+        return msg % self.args if self.args else msg
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Kolejka nie opuszcza procesu, więc nie formatujemy rekordu w wątku wywołującym
+        return record
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Format konsoli: "[INFO] treść klucz=wartość" """
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = f"[{record.levelname}] {record.getMessage()}"
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """Format pliku: jeden obiekt JSON na linię"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure(level: str = "info", json_path: str | None = None,
+              max_bytes: int = MAX_BYTES, backups: int = BACKUPS, console: bool = True) -> None:
+    """
+    Ustawia poziom i miejsca zapisu komunikatów (można wywołać ponownie)
+
+    Args:
+        level (str): Najniższy zapisywany poziom ("debug", "info", "warning", "error")
+        json_path (str | None): Plik JSON lines; None - bez zapisu do pliku
+        max_bytes (int): Rozmiar pliku, po którym następuje rotacja
+        backups (int): Liczba trzymanych starszych plików
+        console (bool): Czy wypisywać komunikaty na konsolę
     """
-    Wyświetla komunikat na konsoli
+    global _listener
+    if level not in LEVELS:
+        raise ValueError(f"Nieprawidłowy poziom logowania: {level}. Użyj jednego z: {', '.join(LEVELS)}")
+    shutdown()
+
+    handlers: list[logging.Handler] = []
+    if console:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(ConsoleFormatter())
+        handlers.append(stream)
+    if json_path:
+        rotating = logging.handlers.RotatingFileHandler(json_path, maxBytes=max_bytes, backupCount=backups,
+                                                        encoding="utf-8")
+        rotating.setFormatter(JsonFormatter())
+        handlers.append(rotating)
+
+    _logger.setLevel(LEVELS[level])
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+    _logger.addHandler(_QueueHandler(_queue))
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=False)
+    _listener.start()
+
+
+def shutdown() -> None:
+    """Zapisuje komunikaty czekające w kolejce i zatrzymuje wątek zapisujący"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def enabled(type: str) -> bool:
+    """Sprawdza, czy komunikaty danego poziomu są zapisywane"""
+    return _logger.isEnabledFor(LEVELS[type])
+
+
+def _allowed(key: str, rate: float) -> tuple[bool, int]:
+    # Co najwyżej jeden komunikat o danym szablonie na `rate` sekund; zwraca też liczbę pominiętych
+    now = time.monotonic()
+    with _rate_lock:
+        state = _rate.get(key)
+        if state is None or now - state[0] >= rate:
+            suppressed = state[1] if state else 0
+            _rate[key] = [now, 0]
+            return True, suppressed
+        state[1] += 1
+        return False, 0
+
+
+def log(message: str | Callable[[], str] = "", type: Literal["debug", "info", "warning", "error"] = "info",
+        *args, rate: float | None = None, exc_info: bool = False, **fields) -> None:
+    """
+    Zapisuje komunikat
 
     Args:
-        message (str): Treść komunikatu
-        type (Literal["info", "error"]): Typ komunikatu, domyślnie "info"
+        message (str | Callable[[], str]): Treść (może zawierać %s dla `args`) albo funkcja ją zwracająca
+        type (Literal["debug", "info", "warning", "error"]): Poziom komunikatu, domyślnie "info"
+        *args: Argumenty wstawiane do treści przy zapisie
+        rate (float | None): Co najwyżej jeden taki komunikat na tyle sekund (pozostałe są liczone i pomijane)
+        exc_info (bool): Czy dołączyć bieżący wyjątek
+        **fields: Pola strukturalne (np. status=200)
+
+    Raises:
+        ValueError: Jeśli poziom komunikatu jest nieprawidłowy
     """
-    if type == "info":
-        print(f"[INFO] {message}")
-    elif type == "error":
-        print(f"[ERROR] {message}")
-    else:
-        raise ValueError("Nieprawidłowy typ komunikatu. Użyj 'info' lub 'error'")
-    
-def info(message: str) -> None:
+    level = LEVELS.get(type)
+    if level is None:
+        raise ValueError(f"Nieprawidłowy typ komunikatu. Użyj jednego z: {', '.join(LEVELS)}")
+    if not _logger.isEnabledFor(level):
+        return
+    if rate is not None:
+        allowed, suppressed = _allowed(message if isinstance(message, str) else message.__qualname__, rate)
+        if not allowed:
+            return
+        if suppressed:
+            fields["suppressed"] = suppressed
+    if _listener is None:
+        with _setup_lock:
+            if _listener is None:
+                configure(logging.getLevelName(_logger.level).lower(), os.environ.get("ZABKA_LOG_FILE"))
+
+    record = _Record(_logger.name, level, "", 0, message, args or None, sys.exc_info() if exc_info else None)
+    record.fields = fields
+    _logger.handle(record)
+
+
+def debug(message: str | Callable[[], str], *args, **kwargs) -> None:
+    """Zapisuje komunikat typu [DEBUG] (argumenty jak w `log`)"""
+    log(message, "debug", *args, **kwargs)
+
+
+def info(message: str | Callable[[], str], *args, **kwargs) -> None:
     """
-    Wyświetla komunikat typu [INFO]
+    Zapisuje komunikat typu [INFO]
 
     Args:
-        message (str): Treść komunikatu
+        message (str | Callable[[], str]): Treść komunikatu (argumenty jak w `log`)
     """
-    log(message, "info")
+    log(message, "info", *args, **kwargs)
 
-def error(message: str) -> None:
+
+def warning(message: str | Callable[[], str], *args, **kwargs) -> None:
+    """Zapisuje komunikat typu [WARNING] (argumenty jak w `log`)"""
+    log(message, "warning", *args, **kwargs)
+
+
+def error(message: str | Callable[[], str], *args, **kwargs) -> None:
     """
-    Wyświetla komunikat typu [ERROR]
+    Zapisuje komunikat typu [ERROR]
 
     Args:
-        message (str): Treść komunikatu
+        message (str | Callable[[], str]): Treść komunikatu (argumenty jak w `log`)
     """
-    log(message, "error")
\ No newline at end of file
+    log(message, "error", *args, **kwargs)
+
+
+atexit.register(shutdown)
@@ -0,0 +1,87 @@
+"""
+Benchmark masowego importu produktów
+
+Porównuje dodawanie N produktów pojedynczo przez POST /add_product
+z jednym żądaniem POST /products/bulk (NDJSON)
+
+Użycie (w katalogu głównym repozytorium):
+    python benchmarks/bench_bulk_import.py --items 2000 --base 1000
+    python benchmarks/bench_bulk_import.py --sqlite
+"""
+
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import Timer, load_server, login_admin, make_database, product_row
+
+
+def run(items: int, base: int, sqlite: bool) -> dict:
+    """
+    Uruchamia oba warianty importu na osobnych, identycznych bazach
+
+    Args:
+        items (int): Liczba importowanych produktów
+        base (int): Liczba produktów w bazie przed importem
+        sqlite (bool): Czy zmigrować bazę do sqlite przed pomiarem
+
+    Returns:
+        dict: Czasy i przepustowość obu wariantów
+    """
+    from fastapi.testclient import TestClient
+
+    rows = [product_row(base + i) for i in range(items)]
+    results = {"items": items, "base": base, "backend": "sqlite" if sqlite else "files"}
+
+    for mode in ("single", "bulk"):
+        workdir = make_database(products=base, users=2)
+        if sqlite:
+            load_server(workdir)
+            from migrate import migrate
+            migrate(os.path.join(workdir, "DATABASE"))
+        server = load_server(workdir)
+
+        with TestClient(server.app) as client:
+            token = login_admin(client)
+            with Timer() as timer:
+                if mode == "single":
+                    for row in rows:
+                        client.post(f"/add_product?performer_token={token}", json=row).raise_for_status()
+                else:
+                    body = "\n".join(json.dumps(row, ensure_ascii=False) for row in rows).encode("utf-8")
+                    res = client.post(f"/products/bulk?performer_token={token}", content=body,
+                                      headers={"content-type": "application/x-ndjson"})
+                    res.raise_for_status()
+                    assert res.json()["added"] == items, res.json()
+            assert len(client.get("/products").json()["products"]) == base + items
+
+        results[mode] = {"seconds": timer.elapsed, "rows_per_second": items / timer.elapsed}
+
+    results["speedup"] = results["single"]["seconds"] / results["bulk"]["seconds"]
+    return results
+
+
+def __main__():
+    parser = ArgumentParser(description="Import pojedynczy vs masowy")
+    parser.add_argument("--items", type=int, default=2000, help="Liczba importowanych produktów")
+    parser.add_argument("--base", type=int, default=1000, help="Liczba produktów w bazie przed importem")
+    parser.add_argument("--sqlite", action="store_true", help="Użyj backendu sqlite")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+
+    results = run(args.items, args.base, args.sqlite)
+    for mode in ("single", "bulk"):
+        print(f"{mode:>6}: {results[mode]['seconds']:.3f} s, {results[mode]['rows_per_second']:.0f} wierszy/s")
+    print(f"przyspieszenie: {results['speedup']:.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,222 @@
+"""
+Test obciążeniowy rezerwacji stanów magazynowych
+
+Wielu równoczesnych kupujących (wątków) rezerwuje losowe pozycje z puli `hot` produktów,
+po czym zatwierdza rezerwację, zwalnia ją albo porzuca (wygasa). W tle działa zapis zbiorczy
+sprzedaży jak na serwerze. Po zakończeniu sprawdzane jest, że żaden produkt nie został
+sprzedany ponad stan, że stan w katalogu (także po ponownym wczytaniu z backendu) jest równy
+stanowi początkowemu minus sprzedaż i że nie zostały wiszące rezerwacje
+
+Na koniec równoczesne zamówienia przechodzą przez POST /order, aż do wyprzedania stanu.
+Jeśli którekolwiek sprawdzenie wykryje niezgodność, skrypt kończy się kodem 1
+
+Użycie (w katalogu głównym repozytorium):
+    python benchmarks/bench_inventory.py --buyers 32 --attempts 500
+"""
+
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import Timer, load_server, make_database
+
+COMMIT, RELEASE, ABANDON = "commit", "release", "abandon"
+
+
+def set_stock(catalog, product_ids: list[int], stock: int) -> None:
+    """Ustawia stan wybranych produktów na `stock` sztuk"""
+    catalog.adjust_quantities({pid: stock - int(catalog.get(pid)["quantity"]) for pid in product_ids})
+
+
+def verify(catalog, ledger, product_ids: list[int], stock: int, sold: Counter) -> dict:
+    """
+    Sprawdza stany po teście
+
+    Returns:
+        dict: Liczba produktów sprzedanych ponad stan i niezgodności stanów (oczekiwane zera)
+    """
+    oversold = sum(1 for pid in product_ids if sold[pid] > stock)
+    mismatched = [pid for pid in product_ids if int(catalog.peek(pid)["quantity"]) != stock - sold[pid]]
+    leaked = [pid for pid in product_ids if ledger is not None and ledger.available(pid) != stock - sold[pid]]
+    catalog.load()  # stan zapisany w backendzie
+    persisted = [pid for pid in product_ids if int(catalog.peek(pid)["quantity"]) != stock - sold[pid]]
+    return {"oversold": oversold, "mismatched": len(mismatched), "leaked": len(leaked), "not_persisted": len(persisted)}
+
+
+def failures(result: dict) -> list[str]:
+    """Zwraca nazwy sprawdzeń z niezerowym wynikiem"""
+    return [name for name in ("oversold", "mismatched", "leaked", "not_persisted") if result[name]]
+
+
+def plan(rng: random.Random, product_ids: list[int]) -> tuple[dict[int, int], str]:
+    # Losowe zamówienie (1-3 pozycje po 1-2 sztuki) i to, co kupujący z nim zrobi
+    items = {pid: rng.randint(1, 2) for pid in rng.sample(product_ids, min(len(product_ids), rng.randint(1, 3)))}
+    r = rng.random()
+    return items, COMMIT if r < 0.8 else RELEASE if r < 0.95 else ABANDON
+
+
+def stress_ledger(server, hot: int, buyers: int, attempts: int, stock: int, seed: int) -> dict:
+    """
+    Równoczesne rezerwacje przez InventoryLedger z zapisem zbiorczym w tle
+
+    Returns:
+        dict: Przepustowość i wyniki sprawdzenia stanów
+    """
+    from helpers.inventory import InventoryLedger
+
+    catalog = server.catalog
+    product_ids = list(range(1, hot + 1))
+    set_stock(catalog, product_ids, stock)
+    ledger = InventoryLedger(catalog)
+    sold = Counter()
+    counts = Counter()
+    sold_lock = threading.Lock()
+    stop = threading.Event()
+
+    def flusher():
+        while not stop.wait(ledger.flush_interval):
+            ledger.expire()
+            counts["flushes"] += bool(ledger.flush())
+
+    def buyer(n: int):
+        rng = random.Random(seed + n)
+        for _ in range(attempts):
+            items, action = plan(rng, product_ids)
+            reservation, shortages = ledger.reserve(items, owner=n, ttl=0.05 if action == ABANDON else None)
+            if reservation is None:
+                with sold_lock:
+                    counts["rejected"] += 1
+            elif action == COMMIT:
+                if ledger.commit(reservation.id, owner=n) is not None:
+                    with sold_lock:
+                        sold.update(reservation.items)
+                        counts["orders"] += 1
+            elif action == RELEASE:
+                ledger.release(reservation.id, owner=n)
+
+    background = threading.Thread(target=flusher, daemon=True)
+    background.start()
+    with Timer() as t, ThreadPoolExecutor(max_workers=buyers) as pool:
+        list(pool.map(buyer, range(buyers)))
+    stop.set()
+    background.join()
+    time.sleep(0.05)  # porzucone rezerwacje wygasają
+    ledger.expire()
+    ledger.flush()
+
+    return {
+        "hot_products": hot,
+        "attempts": buyers * attempts,
+        "orders": counts["orders"],
+        "rejected": counts["rejected"],
+        "sold_units": sum(sold.values()),
+        "flushes": counts["flushes"],
+        "attempts_per_s": buyers * attempts / t.elapsed,
+        **verify(catalog, ledger, product_ids, stock, sold),
+    }
+
+
+def stress_http(workdir: str, hot: int, buyers: int, stock: int) -> dict:
+    """
+    Równoczesne POST /order (po jednej sztuce) aż do wyprzedania `hot` produktów
+
+    Returns:
+        dict: Liczba zamówień, odrzuceń i wyniki sprawdzenia stanów po zatrzymaniu serwera
+    """
+    from fastapi.testclient import TestClient
+
+    server = load_server(workdir)
+    product_ids = list(range(1, hot + 1))
+    sold = Counter()
+    counts = Counter()
+    lock = threading.Lock()
+
+    with TestClient(server.app) as client:
+        set_stock(server.catalog, product_ids, stock)
+        tokens = []
+        for i in range(1, buyers + 1):
+            token = f"bench-buyer-{i}"
+            client.post("/login", json={"login": f"user{i}", "password": f"haslo{i:04d}", "token": token}).raise_for_status()
+            tokens.append(token)
+
+        def buyer(n: int):
+            rng = random.Random(n)
+            remaining = set(product_ids)
+            while remaining:
+                pid = rng.choice(sorted(remaining))
+                res = client.post("/order", params={"performer_token": tokens[n]}, json={"items": {str(pid): 1}})
+                with lock:
+                    if res.status_code == 200:
+                        sold[pid] += 1
+                        counts["orders"] += 1
+                    elif res.status_code == 409:
+                        counts["rejected"] += 1
+                        remaining.discard(pid)
+                    else:
+                        raise RuntimeError(res.text)
+
+        with Timer() as t, ThreadPoolExecutor(max_workers=buyers) as pool:
+            list(pool.map(buyer, range(buyers)))
+    # Po zamknięciu klienta (lifespan) sprzedaż jest zapisana w katalogu
+
+    return {
+        "hot_products": hot,
+        "orders": counts["orders"],
+        "rejected": counts["rejected"],
+        "orders_per_s": counts["orders"] / t.elapsed,
+        "sold_out": all(sold[pid] == stock for pid in product_ids),
+        **verify(server.catalog, server.inventory, product_ids, stock, sold),
+    }
+
+
+def __main__():
+    parser = ArgumentParser(description="Test obciążeniowy rezerwacji stanów magazynowych")
+    parser.add_argument("--products", type=int, default=2000, help="Liczba produktów w katalogu")
+    parser.add_argument("--hot", type=int, nargs="+", default=[1, 16, 1024], help="Liczba kupowanych produktów")
+    parser.add_argument("--buyers", type=int, default=32, help="Liczba równoczesnych kupujących")
+    parser.add_argument("--attempts", type=int, default=500, help="Zamówień na kupującego")
+    parser.add_argument("--stock", type=int, default=1000, help="Stan każdego kupowanego produktu")
+    parser.add_argument("--seed", type=int, default=1, help="Ziarno losowania zamówień")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+    if max(args.hot) > args.products:
+        parser.error(f"--hot ({max(args.hot)}) nie może przekraczać liczby produktów (--products {args.products})")
+
+    results = {"buyers": args.buyers, "ledger": []}
+    failed = []
+    server = load_server(make_database(products=args.products, users=2))
+    server.catalog.load()
+    for hot in args.hot:
+        r = stress_ledger(server, hot, args.buyers, args.attempts, args.stock, args.seed)
+        results["ledger"].append(r)
+        failed += [f"ledger hot={hot}: {name}" for name in failures(r)]
+        print(f"ledger hot={hot:<5}: {r['attempts_per_s']:>9.0f} prób/s, zamówień {r['orders']}, "
+              f"odrzuconych {r['rejected']}, sprzedanych sztuk {r['sold_units']}, ponad stan {r['oversold']}, "
+              f"niezgodnych {r['mismatched'] + r['leaked'] + r['not_persisted']}")
+
+    http_stock = 50
+    r = results["http"] = stress_http(make_database(products=args.products, users=args.buyers + 1),
+                                      hot=4, buyers=args.buyers, stock=http_stock)
+    failed += [f"http: {name}" for name in failures(r)] + ([] if r["sold_out"] else ["http: sold_out"])
+    print(f"  http hot=4   : {r['orders_per_s']:>9.0f} zamówień/s, zamówień {r['orders']} (stan {4 * http_stock}), "
+          f"odrzuconych {r['rejected']}, wyprzedane {r['sold_out']}, ponad stan {r['oversold']}, "
+          f"niezgodnych {r['mismatched'] + r['leaked'] + r['not_persisted']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if failed:
+        sys.exit("Niezgodne stany: " + ", ".join(failed))
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,97 @@
+"""
+Opóźnienie odczytów w trakcie dużego zapisu
+
+Mierzy czasy GET /products/{id} bez obciążenia i w czasie, gdy trwają zapisy przepisujące
+cały plik products.csv (backend plikowy bez dziennika - najgorszy przypadek). Zapisy idą
+przez asynchroniczne API katalogu (wątek zapisujący), a dla porównania także bezpośrednio
+w pętli zdarzeń, jak przed przeniesieniem I/O do puli wątków
+
+Użycie (w katalogu głównym repozytorium):
+    python benchmarks/bench_read_during_write.py --products 100000
+"""
+
+
+import asyncio
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import load_server, make_database, summarize
+
+
+async def measure_reads(client, duration: float, products: int) -> list[float]:
+    latencies = []
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        i += 1
+        start = time.perf_counter()
+        res = await client.get(f"/products/{i % products + 1}")
+        latencies.append(time.perf_counter() - start)
+        assert res.status_code in (200, 404), res.text
+    return latencies
+
+
+async def run(products: int, duration: float) -> dict:
+    import httpx
+
+    workdir = make_database(products=products, users=2)
+    server = load_server(workdir)
+
+    from helpers.storage import FileBackend
+    server.catalog.backend = FileBackend(os.path.join(workdir, "DATABASE"))
+    server.catalog.load()
+
+    transport = httpx.ASGITransport(app=server.app)
+    results = {"products": products, "duration": duration}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results["idle"] = summarize(await measure_reads(client, duration, products))
+
+        async def writer(offload: bool):
+            writes = 0
+            next_id = products + 1
+            stop = time.perf_counter() + duration
+            while time.perf_counter() < stop:
+                row = {"name": f"W{next_id}", "price": 100, "quantity": 1, "description": "", "category": "Bench"}
+                if offload:
+                    await server.catalog.aadd(row)
+                else:
+                    server.catalog.add(row)  # blokuje pętlę zdarzeń na cały zapis pliku
+                    await asyncio.sleep(0)
+                next_id += 1
+                writes += 1
+            return writes
+
+        for name, offload in (("during_write_offloaded", True), ("during_write_in_loop", False)):
+            reads, writes = await asyncio.gather(measure_reads(client, duration, products), writer(offload))
+            results[name] = {**summarize(reads), "writes": writes}
+
+    return results
+
+
+def __main__():
+    parser = ArgumentParser(description="Opóźnienie odczytów w trakcie zapisu")
+    parser.add_argument("--products", type=int, default=100000, help="Liczba produktów w katalogu")
+    parser.add_argument("--duration", type=float, default=3.0, help="Czas każdego pomiaru w sekundach")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.products, args.duration))
+    for name in ("idle", "during_write_offloaded", "during_write_in_loop"):
+        r = results[name]
+        writes = f", zapisów: {r['writes']}" if "writes" in r else ""
+        print(f"{name:>24}: p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, max {r['max_ms']:.2f} ms"
+              f" ({r['count']} odczytów{writes})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,111 @@
+"""
+Benchmark wyszukiwania w katalogu
+
+Buduje indeks odwrócony (server/helpers/search.py) dla N syntetycznych produktów i mierzy
+czas zapytań top-k (pierwszego i kolejnych) oraz przyrostowego dodania i usunięcia produktu.
+Na końcu wypisuje zapytania, które nie spełniają celu TARGET_MS: zapytania jednowyrazowe
+muszą go spełnić także przy pierwszym wykonaniu, wielowyrazowe - w p99. Pierwsze wykonanie
+zapytania wielowyrazowego z krótkim prefiksem (np. "słodycze 42" - prefiks "42" ma ponad
+tysiąc terminów do rozwinięcia) może przekroczyć cel; jest wypisywane osobno i nie jest błędem
+
+Użycie (w katalogu głównym repozytorium):
+    python benchmarks/bench_search.py --products 100000
+"""
+
+
+import json
+import os
+import sys
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import SERVER_DIR, Timer, product_row, summarize
+
+TARGET_MS = 1.0  # cel: top-k poniżej milisekundy (jednowyrazowe także przy pierwszym zapytaniu)
+
+QUERIES = ["produkt 123", "owoce", "nabial", "prze", "opis produktu 4711", "słodycze 42", "napoje", "produkt"]
+
+
+def run(products: int, limit: int, repeat: int) -> dict:
+    """
+    Mierzy budowę indeksu, zapytania i zmiany przyrostowe
+
+    Args:
+        products (int): Liczba produktów w indeksie
+        limit (int): Liczba zwracanych wyników (k)
+        repeat (int): Ile razy powtórzyć każde zapytanie
+
+    Returns:
+        dict: Wyniki pomiarów
+    """
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    from helpers.search import SearchIndex
+
+    index = SearchIndex()
+    with Timer() as build:
+        for i in range(products):
+            index.add({"id": i + 1, **product_row(i)})
+    results = {"products": products, "limit": limit, "build_s": build.elapsed, "queries": {}}
+
+    for query in QUERIES:
+        with Timer() as cold:
+            found = index.search(query, limit)
+        warm = []
+        for _ in range(repeat):
+            with Timer() as t:
+                index.search(query, limit)
+            warm.append(t.elapsed)
+        results["queries"][query] = {"results": len(found), "cold_ms": cold.elapsed * 1000, **summarize(warm)}
+
+    adds, removes = [], []
+    for i in range(products, products + repeat):
+        record = {"id": i + 1, **product_row(i)}
+        with Timer() as t:
+            index.add(record)
+        adds.append(t.elapsed)
+        with Timer() as t:
+            index.remove(i + 1)
+        removes.append(t.elapsed)
+    results["add"] = summarize(adds)
+    results["remove"] = summarize(removes)
+    return results
+
+
+def __main__():
+    parser = ArgumentParser(description="Wyszukiwanie w katalogu")
+    parser.add_argument("--products", type=int, default=100000, help="Liczba produktów w indeksie")
+    parser.add_argument("--limit", type=int, default=20, help="Liczba zwracanych wyników")
+    parser.add_argument("--repeat", type=int, default=200, help="Powtórzenia każdego pomiaru")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args()
+
+    results = run(args.products, args.limit, args.repeat)
+    print(f"budowa indeksu: {results['build_s']:.2f} s dla {results['products']} produktów")
+    for query, r in results["queries"].items():
+        print(f"{query!r:>22}: p50 {r['p50_ms']:.3f} ms, p99 {r['p99_ms']:.3f} ms, "
+              f"pierwsze {r['cold_ms']:.2f} ms ({r['results']} wyników)")
+    for name in ("add", "remove"):
+        r = results[name]
+        print(f"{name:>22}: p50 {r['p50_ms']:.3f} ms, p99 {r['p99_ms']:.3f} ms")
+
+    slow, cold = [], []
+    for query, r in results["queries"].items():
+        if r["p99_ms"] >= TARGET_MS or r["cold_ms"] >= TARGET_MS and len(query.split()) == 1:
+            slow.append(query)
+        elif r["cold_ms"] >= TARGET_MS:
+            cold.append(query)  # wyjątek: pierwsze wykonanie zapytania wielowyrazowego
+    results["over_target"] = slow
+    results["cold_over_target"] = cold
+    print(f"cel < {TARGET_MS:g} ms: " + (f"przekroczony dla {', '.join(map(repr, slow))}" if slow else "spełniony"))
+    if cold:
+        print(f"  pierwsze wykonanie powyżej celu (zapytania wielowyrazowe, dopuszczalne): {', '.join(map(repr, cold))}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    __main__()
@@ -0,0 +1,329 @@
+"""
+Zestaw benchmarków ścieżek danych serwera i klienta
+
+Generuje syntetyczną bazę (--products, --users), uruchamia server/main.py w tym samym procesie
+(httpx.ASGITransport) albo jako osobny proces uvicorna (--uvicorn) i mierzy przepustowość oraz
+p50/p99 dla scenariuszy:
+
+    catalog_page    GET /products?limit=100 (losowa strona, sortowanie po cenie)
+    catalog_full    GET /products (cały katalog; pomijany powyżej --full-limit produktów)
+    product_lookup  GET /products/{id}
+    search          GET /products/search?q=
+    login           POST /login
+    admin_mutation  POST /add_product + POST /remove_product/{id}
+    mixed           równoległa mieszanka powyższych (--concurrency klientów)
+    cart_ops        operacje na koszyku klienta (app/helpers/cart.py) bez sieci
+
+Wyniki razem z opisem środowiska (commit, Python, parametry) trafiają do pliku JSON (--output),
+a --compare porównuje je z wcześniejszym plikiem
+
+Użycie (w katalogu głównym repozytorium):
+    python benchmarks/bench_suite.py --products 100000 --users 1000 --output wyniki.json
+    python benchmarks/bench_suite.py --products 100000 --users 1000 --compare wyniki.json
+"""
+
+
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import (ADMIN_LOGIN, ADMIN_PASSWORD, ADMIN_TOKEN, CATEGORIES, ROOT, SERVER_DIR, Timer, load_server,
+                    make_database, summarize)
+
+SEARCH_QUERIES = ["produkt 12", "owoce", "nabial", "prze", "opis 42", "napoje"]
+MIXED_WEIGHTS = {"catalog_page": 30, "product_lookup": 40, "search": 15, "login": 10, "admin_mutation": 5}
+
+
+class Workload:
+    """
+    Pojedyncze żądania scenariuszy (ta sama logika dla pomiarów sekwencyjnych i mieszanki)
+
+    Args:
+        client (httpx.AsyncClient): Klient podłączony do serwera
+        products (int): Liczba produktów w bazie
+        users (int): Liczba użytkowników w bazie
+        seed (int): Ziarno generatora losowego
+    """
+
+    def __init__(self, client, products: int, users: int, seed: int):
+        self.client = client
+        self.products = products
+        self.users = users
+        self.random = random.Random(seed)
+        self.sessions = 0
+
+    async def _get(self, url: str, **params):
+        res = await self.client.get(url, params=params)
+        assert res.status_code in (200, 404), res.text[:200]
+
+    async def catalog_page(self):
+        await self._get("/products", limit=100, cursor=self.random.randrange(max(1, self.products - 100)),
+                        sort="price")
+
+    async def catalog_full(self):
+        await self._get("/products")
+
+    async def product_lookup(self):
+        await self._get(f"/products/{self.random.randint(1, self.products)}")
+
+    async def search(self):
+        await self._get("/products/search", q=self.random.choice(SEARCH_QUERIES))
+
+    async def login(self):
+        # Użytkownicy z make_database: user<i> / haslo<i:04d> (i >= 1)
+        i = self.random.randint(1, max(1, self.users - 1))
+        self.sessions += 1
+        res = await self.client.post("/login", json={"login": f"user{i}", "password": f"haslo{i:04d}",
+                                                     "token": f"bench-{self.sessions}"})
+        assert res.status_code == 200, res.text[:200]
+
+    async def admin_mutation(self):
+        product = {"name": "Bench", "price": 999, "quantity": 1, "description": "benchmark",
+                   "category": self.random.choice(CATEGORIES)}
+        res = await self.client.post("/add_product", params={"performer_token": ADMIN_TOKEN}, json=product)
+        assert res.status_code == 200, res.text[:200]
+        product_id = res.json()["product"]["id"]
+        res = await self.client.post(f"/remove_product/{product_id}", params={"performer_token": ADMIN_TOKEN})
+        assert res.status_code == 200, res.text[:200]
+
+
+async def measure(operation, requests: int) -> dict:
+    """
+    Wykonuje operację `requests` razy po kolei
+
+    Returns:
+        dict: p50/p99/max w ms i przepustowość (operacji na sekundę)
+    """
+    latencies = []
+    with Timer() as total:
+        for _ in range(requests):
+            start = time.perf_counter()
+            await operation()
+            latencies.append(time.perf_counter() - start)
+    return {**summarize(latencies), "ops_per_s": requests / total.elapsed}
+
+
+async def measure_mixed(workload: Workload, concurrency: int, duration: float) -> dict:
+    """
+    Równoległa mieszanka operacji (MIXED_WEIGHTS) przez `duration` sekund
+
+    Returns:
+        dict: Łączna przepustowość oraz p50/p99 każdej operacji
+    """
+    names = list(MIXED_WEIGHTS)
+    weights = list(MIXED_WEIGHTS.values())
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            name = workload.random.choices(names, weights)[0]
+            start = time.perf_counter()
+            await getattr(workload, name)()
+            latencies[name].append(time.perf_counter() - start)
+
+    with Timer() as total:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    count = sum(len(values) for values in latencies.values())
+    return {
+        "concurrency": concurrency,
+        "ops": count,
+        "ops_per_s": count / total.elapsed,
+        "operations": {name: summarize(values) for name, values in latencies.items() if values},
+    }
+
+
+def bench_cart(items: int, repeat: int) -> dict:
+    """
+    Mikrobenchmark koszyka klienta: dodawanie, odczyt liczby sztuk, suma, payload i usuwanie
+
+    Args:
+        items (int): Liczba różnych produktów w koszyku
+        repeat (int): Liczba powtórzeń całej sekwencji
+
+    Returns:
+        dict: Czasy każdej operacji (p50/p99 na całą sekwencję `items` wywołań)
+    """
+    # Klient ma własny pakiet helpers - ładujemy sam plik, żeby nie mieszać go z helpers serwera
+    spec = importlib.util.spec_from_file_location("client_cart", os.path.join(ROOT, "app", "helpers", "cart.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    products = [{"id": i + 1, "name": f"Produkt {i}", "price": 100 + i % 5000} for i in range(items)]
+    timings: dict[str, list[float]] = {name: [] for name in ("add", "count", "total", "payload", "remove")}
+    for _ in range(repeat):
+        cart = module.Cart()
+        steps = {
+            "add": lambda: [cart.add(p) for p in products],
+            "count": lambda: [cart.count(p) for p in products],
+            "total": cart.total,
+            "payload": cart.payload,
+            "remove": lambda: [cart.remove(p) for p in products],
+        }
+        for name, step in steps.items():
+            with Timer() as t:
+                step()
+            timings[name].append(t.elapsed)
+    return {"items": items, **{name: summarize(values) for name, values in timings.items()}}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_uvicorn(workdir: str) -> tuple[subprocess.Popen, str]:
+    """
+    Uruchamia serwer w osobnym procesie uvicorna na wolnym porcie
+
+    Returns:
+        tuple[subprocess.Popen, str]: Proces i adres bazowy serwera
+    """
+    import httpx
+
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": SERVER_DIR}
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                                "--log-level", "warning"], cwd=workdir, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url + "/products/1", timeout=1)
+            return process, base_url
+        except httpx.TransportError:
+            if process.poll() is not None:
+                raise RuntimeError("Serwer uvicorn zakończył działanie przy starcie")
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Serwer uvicorn nie wystartował w ciągu 120 s")
+
+
+async def run_http(client, args) -> dict:
+    """Wykonuje scenariusze HTTP na podłączonym kliencie"""
+    res = await client.post("/login", json={"login": ADMIN_LOGIN, "password": ADMIN_PASSWORD, "token": ADMIN_TOKEN})
+    assert res.status_code == 200, res.text[:200]
+
+    workload = Workload(client, args.products, args.users, args.seed)
+    scenarios = ["catalog_page", "product_lookup", "search", "login", "admin_mutation"]
+    if args.products <= args.full_limit:
+        scenarios.insert(1, "catalog_full")
+
+    results = {}
+    for name in scenarios:
+        operation = getattr(workload, name)
+        requests = max(1, args.requests // 20) if name == "catalog_full" else args.requests
+        await operation()  # rozgrzewka (np. pierwsze posortowanie widoku)
+        results[name] = await measure(operation, requests)
+        print(f"{name:>16}: {results[name]['ops_per_s']:9.1f} op/s, p50 {results[name]['p50_ms']:.2f} ms, "
+              f"p99 {results[name]['p99_ms']:.2f} ms")
+    results["mixed"] = await measure_mixed(workload, args.concurrency, args.duration)
+    print(f"{'mixed':>16}: {results['mixed']['ops_per_s']:9.1f} op/s przy {args.concurrency} klientach")
+    return results
+
+
+async def run(args) -> dict:
+    import httpx
+
+    with Timer() as setup:
+        workdir = make_database(products=args.products, users=args.users)
+    print(f"baza: {args.products} produktów, {args.users} użytkowników ({setup.elapsed:.1f} s)")
+
+    if args.uvicorn:
+        process, base_url = start_uvicorn(workdir)
+        try:
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                results = await run_http(client, args)
+        finally:
+            process.terminate()
+            process.wait()
+    else:
+        server = load_server(workdir)
+        with Timer() as startup:
+            await server.catalog.aload()
+            await server.users_directory.aload()
+        print(f"wczytanie danych: {startup.elapsed:.2f} s")
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            results = await run_http(client, args)
+        results["startup_s"] = startup.elapsed
+
+    results["cart_ops"] = bench_cart(args.cart_items, args.cart_repeat)
+    print(f"{'cart_ops':>16}: add {results['cart_ops']['add']['p50_ms']:.2f} ms / {args.cart_items} pozycji")
+    return results
+
+
+def environment(args) -> dict:
+    """Opis środowiska zapisywany razem z wynikami"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def compare(results: dict, baseline: dict) -> None:
+    """Wypisuje zmianę p50 i przepustowości względem wcześniejszych wyników"""
+    print(f"porównanie z {baseline['environment'].get('commit')} ({baseline['environment'].get('date')}):")
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if not isinstance(current, dict) or not isinstance(previous, dict) or "ops_per_s" not in current:
+            continue
+        line = f"{name:>16}: op/s {previous['ops_per_s']:.1f} -> {current['ops_per_s']:.1f}"
+        if "p50_ms" in current and "p50_ms" in previous:
+            line += f", p50 {previous['p50_ms']:.2f} -> {current['p50_ms']:.2f} ms"
+        print(line)
+
+
+def __main__():
+    parser = ArgumentParser(description="Zestaw benchmarków serwera i klienta")
+    parser.add_argument("--products", type=int, default=10000, help="Liczba produktów (1k-1M)")
+    parser.add_argument("--users", type=int, default=1000, help="Liczba użytkowników (100-100k)")
+    parser.add_argument("--requests", type=int, default=500, help="Liczba żądań w każdym scenariuszu")
+    parser.add_argument("--concurrency", type=int, default=16, help="Liczba równoległych klientów w mieszance")
+    parser.add_argument("--duration", type=float, default=5.0, help="Czas mieszanki w sekundach")
+    parser.add_argument("--full-limit", type=int, default=100000, help="Największy katalog pobierany w całości")
+    parser.add_argument("--cart-items", type=int, default=1000, help="Liczba pozycji w koszyku")
+    parser.add_argument("--cart-repeat", type=int, default=100, help="Powtórzenia mikrobenchmarku koszyka")
+    parser.add_argument("--seed", type=int, default=1, help="Ziarno generatora losowego")
+    parser.add_argument("--uvicorn", action="store_true", help="Serwer jako osobny proces uvicorna zamiast ASGI")
+    parser.add_argument("--output", default=None, help="Zapisz wyniki do pliku JSON")
+    parser.add_argument("--compare", default=None, help="Porównaj z wynikami z pliku JSON")
+    args = parser.parse_args()
+    # load_server zmienia katalog roboczy - ścieżki plików ustalamy wcześniej
+    args.output = os.path.abspath(args.output) if args.output else None
+    args.compare = os.path.abspath(args.compare) if args.compare else None
+
+    results = asyncio.run(run(args))
+    report = {"environment": environment(args), "results": results}
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    __main__()
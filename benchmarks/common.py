@@ -0,0 +1,116 @@
+"""
+Wspólne narzędzia benchmarków
+
+Generuje syntetyczne katalogi DATABASE i uruchamia serwer (server/main.py) w tym samym procesie
+przez klienta ASGI (fastapi.testclient.TestClient), bez sieci i bez uvicorna
+"""
+
+
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT, "server")
+
+ADMIN_LOGIN = "admin"
+ADMIN_PASSWORD = "adminadmin"
+ADMIN_TOKEN = "bench-admin-token"
+
+CATEGORIES = ["Owoce", "Warzywa", "Napoje", "Nabiał", "Słodycze", "Przekąski", "Mrożonki", "Pieczywo"]
+
+
+def product_row(i: int) -> dict:
+    """Zwraca syntetyczny produkt numer i (bez ID)"""
+    return {
+        "name": f"Produkt {i}",
+        "price": 100 + i % 5000,  # grosze
+        "quantity": 100 + i % 1000,
+        "description": f"Opis produktu {i}",
+        "category": CATEGORIES[i % len(CATEGORIES)],
+    }
+
+
+def make_database(products: int = 1000, users: int = 100, path: str | None = None) -> str:
+    """
+    Tworzy katalog z syntetyczną bazą (DATABASE/products.csv i DATABASE/customers.xlsx)
+
+    Args:
+        products (int): Liczba produktów
+        users (int): Liczba użytkowników (w tym jeden administrator)
+        path (str | None): Katalog roboczy, domyślnie nowy katalog tymczasowy
+
+    Returns:
+        str: Katalog roboczy, w którym znajduje się DATABASE/
+    """
+    workdir = path or tempfile.mkdtemp(prefix="zabka-bench-")
+    database = os.path.join(workdir, "DATABASE")
+    os.makedirs(database, exist_ok=True)
+
+    pd.DataFrame([{"id": i + 1, **product_row(i)} for i in range(products)]).to_csv(
+        os.path.join(database, "products.csv"), index=False
+    )
+    rows = [{"id": 1, "name": "Admin", "surname": "Bench", "age": 30,
+             "login": ADMIN_LOGIN, "password": ADMIN_PASSWORD, "admin": True}]
+    rows += [{"id": i + 1, "name": f"Imię {i}", "surname": f"Nazwisko {i}", "age": 20 + i % 50,
+              "login": f"user{i}", "password": f"haslo{i:04d}", "admin": False} for i in range(1, users)]
+    pd.DataFrame(rows).to_excel(os.path.join(database, "customers.xlsx"), index=False)
+    return workdir
+
+
+def load_server(workdir: str):
+    """
+    Importuje świeżą instancję server/main.py pracującą na katalogu workdir/DATABASE
+
+    Args:
+        workdir (str): Katalog roboczy z make_database()
+
+    Returns:
+        module: Moduł main serwera (atrybut `app` to aplikacja FastAPI)
+    """
+    if SERVER_DIR not in sys.path:
+        sys.path.insert(0, SERVER_DIR)
+    os.chdir(workdir)  # server/main.py szuka DATABASE/ w bieżącym katalogu
+    for name in [n for n in sys.modules if n == "main" or n.startswith("helpers.") or n == "helpers"]:
+        del sys.modules[name]
+    return importlib.import_module("main")
+
+
+def login_admin(client) -> str:
+    """Loguje administratora i zwraca jego token"""
+    res = client.post("/login", json={"login": ADMIN_LOGIN, "password": ADMIN_PASSWORD, "token": ADMIN_TOKEN})
+    res.raise_for_status()
+    return ADMIN_TOKEN
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Zwraca percentyl p (0-100) z listy pomiarów (metoda najbliższej pozycji)"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def summarize(latencies: list[float]) -> dict:
+    """Podsumowuje czasy odpowiedzi (w sekundach) jako p50/p99/max w milisekundach"""
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else float("nan"),
+    }
+
+
+class Timer:
+    """Mierzy czas bloku with w sekundach (atrybut `elapsed`)"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,201 @@
+"""
+Rozgłaszanie zmian katalogu przez WebSocket (/ws/catalog)
+
+Katalog powiadamia rozgłaszacz o każdej nowej wersji. Rozgłaszacz czeka chwilę (COALESCE),
+żeby seria zmian (np. import albo kilka zamówień naraz) trafiła do jednego zdarzenia, pobiera
+zmiany z dziennika katalogu i koduje zdarzenie do JSON raz dla wszystkich subskrybentów
+
+Zdarzenia:
+    {"type": "hello", "epoch", "version"} - pierwsza wiadomość po połączeniu
+    {"type": "changes", "epoch", "from", "version", "upserts", "deletes"} - zmiany od wersji "from"
+    {"type": "resync", "epoch", "version"} - klient musi pobrać zmiany przez GET /products/changes
+
+Każdy subskrybent ma ograniczoną kolejkę. Jeśli klient nie nadąża z odbiorem i kolejka się
+zapełni, czekające zdarzenia są odrzucane i zastępowane jednym "resync", więc wolny klient
+nie zatrzymuje pozostałych ani nie zajmuje coraz więcej pamięci serwera
+"""
+
+
+import asyncio
+
+from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
+
+from helpers.catalog import ProductCatalog
+from helpers.metrics import metrics
+from helpers.responses import encode_json
+from helpers.workers import run_read
+
+COALESCE = 0.05      # sekundy zbierania zmian w jedno zdarzenie
+QUEUE_SIZE = 32      # zdarzeń czekających na wysłanie do jednego klienta
+SEND_TIMEOUT = 10.0  # po tylu sekundach blokującego wysyłania klient jest rozłączany
+
+RESYNCS = metrics.counter("ws_catalog_resyncs_total",
+                          "Liczba klientów przełączonych na resync z powodu zaległości")
+
+
+class Subscriber:
+    """
+    Kolejka zdarzeń jednego klienta WebSocket
+
+    Args:
+        size (int): Maksymalna liczba czekających zdarzeń
+    """
+
+    def __init__(self, size: int = QUEUE_SIZE):
+        # Co najmniej 2 miejsca: po odrzuceniu zaległości mieści się "resync" i koniec obsługi
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=max(size, 2))
+
+    def push(self, message: str | None, resync: str) -> bool:
+        """
+        Dodaje zdarzenie do kolejki (wywoływać w pętli zdarzeń)
+
+        Args:
+            message (str | None): Zakodowane zdarzenie (None kończy obsługę klienta)
+            resync (str): Zdarzenie "resync" wysyłane zamiast zaległych zdarzeń
+
+        Returns:
+            bool: False, jeśli kolejka była pełna i zaległości zastąpiono zdarzeniem "resync"
+        """
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(resync)
+            if message is None:
+                self.queue.put_nowait(None)
+            return False
+
+
+class CatalogBroadcaster:
+    """
+    Rozsyła zmiany katalogu do klientów WebSocket
+
+    Args:
+        catalog (ProductCatalog): Obserwowany katalog
+        coalesce (float): Czas (w sekundach) zbierania zmian w jedno zdarzenie
+        queue_size (int): Maksymalna liczba zdarzeń czekających na wysłanie do jednego klienta
+    """
+
+    def __init__(self, catalog: ProductCatalog, coalesce: float = COALESCE, queue_size: int = QUEUE_SIZE):
+        self.catalog = catalog
+        self.coalesce = coalesce
+        self.queue_size = queue_size
+        self.version = 0  # wersja katalogu, od której liczone jest następne zdarzenie
+        self._subscribers: set[Subscriber] = set()
+        self._dirty: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def _message(self, type: str, **content) -> str:
+        return encode_json({"type": type, "epoch": self.catalog.epoch, **content}).decode("utf-8")
+
+    def _notify(self, version: int) -> None:
+        # Wywoływane przez katalog pod jego blokadą (z dowolnego wątku) - tylko budzi pętlę
+        if not self._dirty.is_set():
+            self._loop.call_soon_threadsafe(self._dirty.set)
+
+    def start(self) -> None:
+        """Zaczyna obserwować katalog (wywoływać w pętli zdarzeń, po wczytaniu katalogu)"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._dirty = asyncio.Event()
+        self.version = self.catalog.version
+        self.catalog.add_listener(self._notify)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Przestaje obserwować katalog i kończy obsługę wszystkich klientów"""
+        if self._task is None:
+            return
+        self.catalog.remove_listener(self._notify)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        resync = self._message("resync", version=self.version)
+        for subscriber in list(self._subscribers):
+            subscriber.push(None, resync)
+
+    async def _run(self) -> None:
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.coalesce)
+            self._dirty.clear()
+            await self.flush()
+
+    def _event(self, since: int) -> tuple[str | None, int]:
+        # Na puli odczytu: zmiany od `since` zakodowane jako jedno zdarzenie
+        changes = self.catalog.changes(since, self.catalog.epoch)
+        version = changes["version"]
+        if changes["snapshot"]:  # katalog wczytany ponownie albo dziennik nie sięga tak daleko
+            return self._message("resync", version=version), version
+        if not changes["upserts"] and not changes["deletes"]:
+            return None, version
+        return self._message("changes", version=version, upserts=changes["upserts"],
+                             deletes=changes["deletes"], **{"from": since}), version
+
+    async def flush(self) -> None:
+        """Wysyła subskrybentom zmiany od ostatniego zdarzenia"""
+        if not self._subscribers:
+            self.version = self.catalog.version  # nikt nie słucha - nowi klienci zaczną od bieżącej wersji
+            return
+        message, version = await run_read(self._event, self.version)
+        self.version = version
+        if message is None:
+            return
+        resync = self._message("resync", version=version)
+        for subscriber in list(self._subscribers):
+            if not subscriber.push(message, resync):
+                RESYNCS.inc()
+
+    async def serve(self, websocket: WebSocket) -> None:
+        """
+        Obsługuje połączenie klienta do końca (aż klient się rozłączy albo serwer zostanie zatrzymany)
+
+        Args:
+            websocket (WebSocket): Połączenie klienta (jeszcze niezaakceptowane)
+        """
+        await websocket.accept()
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        sender = asyncio.ensure_future(self._send(websocket, subscriber))
+        receiver = asyncio.ensure_future(self._receive(websocket))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self._subscribers.discard(subscriber)
+            for task in (sender, receiver):
+                task.cancel()
+            await asyncio.wait({sender, receiver})
+            if websocket.application_state == WebSocketState.CONNECTED:
+                try:
+                    await websocket.close(code=1001)
+                except (RuntimeError, WebSocketDisconnect):
+                    pass
+
+    async def _send(self, websocket: WebSocket, subscriber: Subscriber) -> None:
+        try:
+            await websocket.send_text(self._message("hello", version=self.version))
+            while True:
+                message = await subscriber.queue.get()
+                if message is None:
+                    return
+                await asyncio.wait_for(websocket.send_text(message), SEND_TIMEOUT)
+        except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError):
+            return  # klient nie odbiera albo już się rozłączył
+
+    @staticmethod
+    async def _receive(websocket: WebSocket) -> None:
+        # Klient niczego nie wysyła - czekamy tylko na rozłączenie
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
@@ -0,0 +1,106 @@
+"""
+Parsowanie strumieniowych danych do masowego importu produktów
+
+Obsługiwane formaty treści żądania:
+- text/csv - pierwszy wiersz to nagłówek z nazwami kolumn
+- application/x-ndjson - jeden obiekt JSON w każdej linii
+
+Wiersze są przetwarzane porcjami po BULK_CHUNK (`iter_chunks`), więc import nie trzyma
+w pamięci całej treści żądania ani wszystkich wierszy naraz
+"""
+
+
+import csv
+import json
+from typing import AsyncIterator, TypeVar
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+BULK_CHUNK = 1000  # wierszy sprawdzanych i zapisywanych jedną operacją
+
+T = TypeVar("T")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Dzieli strumień bajtów na linie bez wczytywania całej treści do pamięci
+
+    Args:
+        chunks (AsyncIterator[bytes]): Kolejne fragmenty treści żądania
+
+    Yields:
+        str: Kolejne linie (bez znaków końca linii)
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    """
+    Zwraca kolejne wiersze importu jako słowniki
+
+    Wiersze CSV nie mogą zawierać znaków nowej linii wewnątrz pól
+
+    Args:
+        chunks (AsyncIterator[bytes]): Kolejne fragmenty treści żądania
+        content_type (str): Nagłówek Content-Type żądania
+
+    Yields:
+        tuple[int, dict | None, str | None]: Numer wiersza (od 1), dane wiersza albo opis błędu
+    """
+    ndjson = content_type.split(";")[0].strip().lower() in NDJSON_TYPES
+    header = None
+    row = 0
+
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+
+        if ndjson:
+            row += 1
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row, None, f"Niepoprawny JSON: {e}"
+                continue
+            if not isinstance(data, dict):
+                yield row, None, "Wiersz musi być obiektem JSON"
+                continue
+            yield row, data, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [v.strip() for v in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Oczekiwano {len(header)} kolumn, otrzymano {len(values)}"
+            continue
+        yield row, dict(zip(header, values)), None
+
+
+async def iter_chunks(rows: AsyncIterator[T], size: int = BULK_CHUNK) -> AsyncIterator[list[T]]:
+    """
+    Grupuje wiersze w porcje o stałym rozmiarze
+
+    Args:
+        rows (AsyncIterator[T]): Kolejne wiersze (np. z iter_rows)
+        size (int): Rozmiar porcji (ostatnia może być mniejsza)
+
+    Yields:
+        list[T]: Kolejne porcje wierszy
+    """
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
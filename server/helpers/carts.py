@@ -0,0 +1,123 @@
+"""
+Koszyki klientów
+
+Koszyk klienta jest zapisywany w jego pliku DATABASE/<id>.txt (tworzonym przy rejestracji)
+jako obiekt JSON {ID produktu: liczba sztuk}. Pliki są czytane raz i trzymane w pamięci,
+a zapis podmienia plik w całości, więc przerwany zapis nie zostawia uszkodzonego koszyka
+"""
+
+
+import json
+import os
+from threading import Lock
+
+from helpers.workers import run_read, run_write
+
+
+class CartStore:
+    """
+    Koszyki klientów indeksowane po ID klienta
+
+    Args:
+        database (str): Katalog DATABASE z plikami <id>.txt
+    """
+
+    def __init__(self, database: str):
+        self.database = database
+        self._lock = Lock()
+        self._carts: dict[int, dict[int, int]] = {}
+
+    def path(self, user_id: int) -> str:
+        """Zwraca ścieżkę pliku koszyka klienta"""
+        return os.path.join(self.database, f"{user_id}.txt")
+
+    def _read(self, user_id: int) -> dict[int, int]:
+        try:
+            with open(self.path(user_id), encoding="utf-8") as f:
+                text = f.read().strip()
+        except FileNotFoundError:
+            return {}
+        if not text:
+            return {}  # pusty plik z rejestracji
+        return {int(pid): int(count) for pid, count in json.loads(text).items()}
+
+    def _write(self, user_id: int, items: dict[int, int]) -> None:
+        path = self.path(user_id)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({str(pid): count for pid, count in items.items()}, f)
+        os.replace(tmp, path)
+
+    def create(self, user_id: int) -> None:
+        """Tworzy pusty plik koszyka nowego klienta"""
+        with self._lock:
+            open(self.path(user_id), "w").close()
+            self._carts[user_id] = {}
+
+    def get(self, user_id: int) -> dict[int, int]:
+        """
+        Zwraca koszyk klienta
+
+        Args:
+            user_id (int): ID klienta
+
+        Returns:
+            dict[int, int]: ID produktu -> liczba sztuk
+        """
+        with self._lock:
+            cart = self._carts.get(user_id)
+            if cart is None:
+                cart = self._carts[user_id] = self._read(user_id)
+            return dict(cart)
+
+    def put(self, user_id: int, items: dict[int, int]) -> dict[int, int]:
+        """
+        Zastępuje koszyk klienta i zapisuje go na dysk
+
+        Args:
+            user_id (int): ID klienta
+            items (dict[int, int]): ID produktu -> liczba sztuk (pozycje z liczbą < 1 są pomijane)
+
+        Returns:
+            dict[int, int]: Zapisany koszyk
+        """
+        cart = {int(pid): int(count) for pid, count in items.items() if count >= 1}
+        with self._lock:
+            self._write(user_id, cart)
+            self._carts[user_id] = cart
+            return dict(cart)
+
+    def clear(self, user_id: int) -> None:
+        """Opróżnia koszyk klienta"""
+        self.put(user_id, {})
+
+    def delete(self, user_id: int) -> None:
+        """Usuwa plik koszyka (np. po usunięciu klienta)"""
+        with self._lock:
+            self._carts.pop(user_id, None)
+            try:
+                os.remove(self.path(user_id))
+            except FileNotFoundError:
+                pass
+
+    # Wersje asynchroniczne: odczyty na puli odczytu, zmiany na wątku zapisującym
+
+    async def aget(self, user_id: int) -> dict[int, int]:
+        """Asynchroniczna wersja `get`"""
+        return await run_read(self.get, user_id)
+
+    async def aput(self, user_id: int, items: dict[int, int]) -> dict[int, int]:
+        """Asynchroniczna wersja `put`"""
+        return await run_write(self.put, user_id, items)
+
+    async def acreate(self, user_id: int) -> None:
+        """Asynchroniczna wersja `create`"""
+        await run_write(self.create, user_id)
+
+    async def aclear(self, user_id: int) -> None:
+        """Asynchroniczna wersja `clear`"""
+        await run_write(self.clear, user_id)
+
+    async def adelete(self, user_id: int) -> None:
+        """Asynchroniczna wersja `delete`"""
+        await run_write(self.delete, user_id)
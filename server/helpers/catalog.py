@@ -0,0 +1,500 @@
+"""
+Rezydentny katalog produktów
+
+Katalog wczytuje produkty z backendu raz, trzyma wiersze w pamięci (słownik id -> rekord)
+i obsługuje z niego wszystkie odczyty. Zmiany są zapisywane od razu (write-through),
+a zmiany wprowadzone poza serwerem są wykrywane po wersji danych w backendzie
+
+Zapytania ze stronicowaniem korzystają z indeksu po kategorii i posortowanych widoków,
+które są budowane przy pierwszym użyciu i unieważniane przy każdej zmianie katalogu.
+Wyszukiwanie pełnotekstowe korzysta z indeksu odwróconego (helpers.search), aktualizowanego
+przy każdym dodaniu i usunięciu produktu
+
+Ograniczony dziennik zmian (wersja katalogu, ID produktu) pozwala klientom pobrać tylko
+produkty zmienione od znanej im wersji; klient, który został za daleko w tyle (albo pamięta
+wersję z poprzedniego uruchomienia serwera), dostaje cały katalog. Słuchacze zarejestrowani
+przez `add_listener` są powiadamiani o każdej nowej wersji (helpers.broadcast)
+"""
+
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import AbstractContextManager, nullcontext
+from typing import Callable, TypeVar
+
+import numpy as np
+
+from helpers.ids import IdAllocator
+from helpers.prices import price_mask
+from helpers.search import SearchIndex
+from helpers.store import ResidentTable
+from helpers.workers import run_read, run_write
+
+NO_PRICE = np.iinfo(np.int64).max  # produkty bez ceny trafiają na koniec i poza każdy zakres
+CHANGE_LOG_SIZE = 10000  # ile ostatnich zmian produktów pamiętamy dla /products/changes
+
+T = TypeVar("T")
+
+
+def price_of(record: dict) -> int:
+    """Zwraca cenę produktu w groszach (NO_PRICE, jeśli jej brak)"""
+    return record['price'] if record['price'] is not None else NO_PRICE
+
+
+SORT_KEYS = {
+    "id": lambda r: r['id'],
+    "name": lambda r: str(r['name']).lower(),
+    "price": price_of,
+    "quantity": lambda r: r['quantity'] if r['quantity'] is not None else 0,
+}
+
+
+class ProductCatalog(ResidentTable):
+    """
+    Katalog produktów trzymany w pamięci, indeksowany po ID i kategorii
+
+    Args:
+        backend (StorageBackend): Backend przechowywania danych
+        ids (IdAllocator | None): Trwałe liczniki ID (domyślnie licznik tylko w pamięci)
+    """
+
+    table = "products"
+
+    # Rozróżnia wersje katalogu z różnych uruchomień serwera (licznik startuje od zera)
+    epoch = format(time.time_ns(), "x")
+
+    def __init__(self, backend, ids: IdAllocator | None = None, **kwargs):
+        super().__init__(backend, **kwargs)
+        self.ids = ids if ids is not None else IdAllocator()
+        self._listeners: list[Callable[[int], None]] = []
+
+    def add_listener(self, listener: Callable[[int], None]) -> None:
+        """
+        Rejestruje funkcję wywoływaną z nową wersją po każdej zmianie katalogu
+
+        Funkcja jest wywoływana pod blokadą katalogu w wątku, który wprowadził zmianę,
+        więc nie może blokować (np. tylko budzi pętlę zdarzeń)
+
+        Args:
+            listener (Callable[[int], None]): Funkcja przyjmująca nową wersję katalogu
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int], None]) -> None:
+        """Wyrejestrowuje funkcję dodaną przez `add_listener`"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def etag(self) -> str:
+        """Zwraca ETag bieżącej wersji katalogu"""
+        return self.validators()[0]
+
+    def validators(self) -> tuple[str, float]:
+        """Zwraca ETag i czas ostatniej zmiany bieżącej wersji katalogu (odczytane razem)"""
+        with self._lock:
+            self._refresh()
+            return f'W/"{self.epoch}-{self.version}"', self.modified_at
+
+    def snapshot(self, read: Callable[[], T]) -> tuple[tuple[str, float], T]:
+        """
+        Wykonuje odczyt i zwraca go razem z wersją katalogu, z której pochodzi
+
+        ETag, czas zmiany i wynik są odczytywane pod jedną blokadą, więc zmiana wprowadzona
+        w międzyczasie nie połączy starego ETagu z nową treścią (ani odwrotnie)
+
+        Args:
+            read (Callable[[], T]): Odczyt katalogu (np. `query`)
+
+        Returns:
+            tuple[tuple[str, float], T]: (ETag, czas ostatniej zmiany) i wynik odczytu
+        """
+        with self._lock:
+            return self.validators(), read()
+
+    def _index(self, records: list[dict]) -> None:
+        self._rows: dict[int, dict] = {}
+        self._max_id = 0
+        self._by_category: dict[str, dict[int, dict]] = {}
+        self._by_name: dict[str, dict[int, None]] = {}
+        self._views: dict[tuple, tuple[list[dict], list, np.ndarray]] = {}
+        self._search = SearchIndex()
+        # Po (ponownym) wczytaniu dziennik zaczyna się od nowa - starsze wersje dostają cały katalog
+        self._changes: deque[tuple[int, int]] = deque()
+        self._pending: dict[int, None] = {}
+        self._log_floor = None
+        for r in records:
+            self._link(r)
+
+    def _link(self, record: dict) -> None:
+        product_id = int(record['id'])
+        old = self._rows.get(product_id)
+        if old is not None:
+            self._unindex(product_id, old)
+        self._rows[product_id] = record
+        self._max_id = max(self._max_id, product_id)
+        self._by_category.setdefault(record['category'], {})[product_id] = record
+        self._by_name.setdefault(record['name'], {})[product_id] = None
+        self._search.add(record)
+        self._views.clear()
+        self._pending[product_id] = None
+
+    def _unlink(self, product_id: int) -> dict:
+        record = self._rows.pop(product_id)
+        self._unindex(product_id, record)
+        self._search.remove(product_id)
+        self._views.clear()
+        self._pending[product_id] = None
+        return record
+
+    def _unindex(self, product_id: int, record: dict) -> None:
+        # Usuwa rekord z indeksów po kategorii i nazwie
+        for index, value in ((self._by_category, record['category']), (self._by_name, record['name'])):
+            entries = index.get(value, {})
+            entries.pop(product_id, None)
+            if not entries:
+                index.pop(value, None)
+
+    def _records(self) -> list[dict]:
+        return list(self._rows.values())
+
+    def _bump(self) -> None:
+        # Zmiany od poprzedniego _bump trafiają do dziennika z nową wersją
+        super()._bump()
+        if self._log_floor is None:
+            self._log_floor = self.version
+            self._pending.clear()
+        for product_id in self._pending:
+            if len(self._changes) >= CHANGE_LOG_SIZE:
+                self._log_floor = self._changes.popleft()[0]
+            self._changes.append((self.version, product_id))
+        self._pending.clear()
+        for listener in self._listeners:
+            listener(self.version)
+
+    def changes(self, since: int | None = None, epoch: str | None = None) -> dict:
+        """
+        Zwraca produkty zmienione od podanej wersji katalogu
+
+        Args:
+            since (int | None): Wersja katalogu znana klientowi (None - klient nie ma katalogu)
+            epoch (str | None): Epoka serwera, z której pochodzi `since`
+
+        Returns:
+            dict: {"epoch", "version", "snapshot": False, "upserts", "deletes"} albo, jeśli dziennik
+                nie sięga tak daleko, {"epoch", "version", "snapshot": True, "products"}
+        """
+        with self._lock:
+            self._refresh()
+            content = {"epoch": self.epoch, "version": self.version}
+            if since is None or epoch != self.epoch or since < self._log_floor or since > self.version:
+                return {**content, "snapshot": True, "products": list(self._rows.values())}
+
+            changed: dict[int, None] = {}
+            index = len(self._changes)
+            while index > 0 and self._changes[index - 1][0] > since:  # od końca - zwykle kilka wpisów
+                index -= 1
+            for i in range(index, len(self._changes)):
+                changed[self._changes[i][1]] = None
+            upserts = [self._rows[pid] for pid in changed if pid in self._rows]
+            deletes = [pid for pid in changed if pid not in self._rows]
+            return {**content, "snapshot": False, "upserts": upserts, "deletes": deletes}
+
+    def _view(self, category: str | None, sort: str) -> tuple[list[dict], list, np.ndarray]:
+        # Posortowany widok (całego katalogu albo jednej kategorii) razem z kluczami do bisect
+        # i tablicą cen do wektorowego filtrowania
+        view = self._views.get((category, sort))
+        if view is None:
+            rows = self._rows.values() if category is None else self._by_category.get(category, {}).values()
+            key = SORT_KEYS[sort]
+            rows = sorted(rows, key=key)
+            prices = np.fromiter((price_of(r) for r in rows), dtype=np.int64, count=len(rows))
+            view = (rows, [key(r) for r in rows], prices)
+            self._views[(category, sort)] = view
+        return view
+
+    def all(self) -> list[dict]:
+        """Zwraca wszystkie produkty"""
+        with self._lock:
+            self._refresh()
+            return list(self._rows.values())
+
+    def categories(self) -> list[str]:
+        """Zwraca listę kategorii"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_category)
+
+    def query(self, category: str | None = None, min_price: int | None = None,
+              max_price: int | None = None, sort: str = "id", cursor: int = 0,
+              limit: int | None = None) -> tuple[list[dict], int | None, int]:
+        """
+        Zwraca stronę produktów spełniających filtry
+
+        Args:
+            category (str | None): Tylko produkty z tej kategorii
+            min_price (int | None): Minimalna cena w groszach
+            max_price (int | None): Maksymalna cena w groszach
+            sort (str): Klucz sortowania z SORT_KEYS, z "-" na początku dla malejącego
+            cursor (int): Pozycja początku strony (zwrócona jako next_cursor poprzedniej)
+            limit (int | None): Rozmiar strony, None oznacza wszystkie wyniki
+
+        Returns:
+            tuple[list[dict], int | None, int]: Produkty, kursor następnej strony
+                (None, jeśli to ostatnia) i liczba wszystkich wyników
+
+        Raises:
+            ValueError: Jeśli klucz sortowania jest nieznany
+        """
+        descending = sort.startswith("-")
+        field = sort.lstrip("-")
+        if field not in SORT_KEYS:
+            raise ValueError(f"Nieznany klucz sortowania: {field}")
+
+        with self._lock:
+            self._refresh()
+            filter_price = min_price is not None or max_price is not None
+
+            if filter_price and field == "price":
+                # Widok jest posortowany po cenie, więc zakres wyznaczamy przez bisect
+                rows, keys, _ = self._view(category, "price")
+                lo = bisect_left(keys, min_price) if min_price is not None else 0
+                hi = bisect_right(keys, max_price) if max_price is not None else bisect_left(keys, NO_PRICE)
+            else:
+                rows, _, prices = self._view(category, field)
+                if filter_price:
+                    mask = price_mask(prices, min_price, max_price) & (prices != NO_PRICE)
+                    rows = [rows[i] for i in np.flatnonzero(mask)]
+                lo, hi = 0, len(rows)
+
+            total = max(hi - lo, 0)
+            cursor = max(cursor, 0)
+            end = total if limit is None else min(cursor + limit, total)
+
+            if descending:
+                page = [rows[hi - 1 - i] for i in range(cursor, end)]
+            else:
+                page = rows[lo + cursor:lo + end]
+
+            return page, (end if end < total else None), total
+
+    def get(self, product_id: int) -> dict | None:
+        """Zwraca produkt o podanym ID albo None"""
+        with self._lock:
+            self._refresh()
+            return self._rows.get(product_id)
+
+    def peek(self, product_id: int) -> dict | None:
+        """
+        Zwraca produkt bez blokady i bez sprawdzania wersji w backendzie
+
+        Rekordy są przy zmianie podmieniane, a nie modyfikowane, więc odczyt jest spójny.
+        Przeznaczone dla gorących ścieżek, które nie mogą czekać na blokadę katalogu
+        (rezerwacje w helpers.inventory)
+        """
+        return self._rows.get(product_id)
+
+    def find_by_name(self, name: str) -> list[dict]:
+        """Zwraca produkty o podanej nazwie"""
+        with self._lock:
+            self._refresh()
+            return [self._rows[pid] for pid in self._by_name.get(name, {})]
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        """
+        Wyszukuje produkty po nazwie, opisie i kategorii (także po początku słów, bez polskich znaków)
+
+        Args:
+            query (str): Zapytanie
+            limit (int): Maksymalna liczba wyników
+
+        Returns:
+            list[dict]: Produkty od najlepiej dopasowanych
+        """
+        with self._lock:
+            self._refresh()
+            return [self._rows[pid] for pid, _ in self._search.search(query, limit)]
+
+    def add(self, product: dict) -> dict:
+        """
+        Dodaje produkt do katalogu i zapisuje go na dysk
+
+        Args:
+            product (dict): Dane produktu bez ID
+
+        Returns:
+            dict: Dodany rekord z nadanym ID
+        """
+        return self.add_many([product])[0]
+
+    def add_many(self, products: list[dict]) -> list[dict]:
+        """
+        Dodaje wiele produktów naraz, rezerwując dla nich ID jednym wywołaniem licznika
+        i zapisując je jedną operacją
+
+        Args:
+            products (list[dict]): Dane produktów bez ID
+
+        Returns:
+            list[dict]: Dodane rekordy z nadanymi ID
+        """
+        with self._writing():
+            with self._lock:
+                self._refresh()
+                # floor: produkty dodane poza serwerem mogą mieć ID większe niż licznik
+                next_id = self.ids.take("products", len(products), floor=self._max_id + 1)
+                records = []
+                for offset, product in enumerate(products):
+                    record = {'id': next_id + offset, **{k: product.get(k) for k in self.columns if k != 'id'}}
+                    self._link(record)
+                    records.append(record)
+                if not records:
+                    return records
+                self._bump()
+
+            def rollback():
+                for record in records:
+                    self._unlink(record['id'])
+
+            self._commit(upserts=records, rollback=rollback)
+            return records
+
+    def remove(self, product_id: int) -> bool:
+        """
+        Usuwa produkt o podanym ID
+
+        Returns:
+            bool: False, jeśli produktu nie było w katalogu
+        """
+        removed, _ = self.remove_many(ids=[product_id])
+        return bool(removed)
+
+    def remove_by_name(self, name: str) -> bool:
+        """
+        Usuwa wszystkie produkty o podanej nazwie
+
+        Returns:
+            bool: False, jeśli nie znaleziono żadnego produktu
+        """
+        removed, _ = self.remove_many(names=[name])
+        return bool(removed)
+
+    def remove_many(self, ids: list[int] = (), names: list[str] = ()) -> tuple[list[int], list]:
+        """
+        Usuwa wiele produktów naraz (po ID i/lub nazwie) i zapisuje zmiany jedną operacją
+
+        Args:
+            ids (list[int]): ID produktów do usunięcia
+            names (list[str]): Nazwy produktów do usunięcia (usuwane są wszystkie produkty o tej nazwie)
+
+        Returns:
+            tuple[list[int], list]: ID usuniętych produktów oraz ID i nazwy, których nie znaleziono
+        """
+        with self._writing():
+            with self._lock:
+                self._refresh()
+                removed, not_found = self._match(ids, names)
+                if not removed:
+                    return removed, not_found
+                records = [self._unlink(pid) for pid in removed]
+                self._bump()
+
+            def rollback():
+                for record in records:
+                    self._link(record)
+
+            self._commit(deletes=removed, rollback=rollback)
+            return removed, not_found
+
+    def adjust_quantities(self, deltas: dict[int, int], guard: AbstractContextManager | None = None,
+                          on_error: Callable[[], None] | None = None) -> list[dict]:
+        """
+        Zmienia stany magazynowe wielu produktów jedną operacją (zapis zbiorczy)
+
+        Nie sprawdza dostępności - robi to wcześniej InventoryLedger.
+        Jeśli zapis do backendu się nie uda, zmiana w pamięci nie jest cofana (sprzedaż już
+        się odbyła), a wyjątek i `on_error` informują wywołującego, że rekordy trzeba zapisać ponownie
+
+        Args:
+            deltas (dict[int, int]): ID produktu -> zmiana liczby sztuk (ujemna przy sprzedaży);
+                produkty usunięte w międzyczasie są pomijane
+            guard (AbstractContextManager | None): Kontekst trzymany na czas zmiany w pamięci
+                (np. blokady produktów w ledgerze); zapis do backendu odbywa się już po jego opuszczeniu
+            on_error (Callable[[], None] | None): Wywoływana, jeśli zapis do backendu się nie uda
+                (także wtedy, gdy na utrwalenie czeka run_write)
+
+        Returns:
+            list[dict]: Zmienione rekordy
+        """
+        with self._writing():
+            with guard if guard is not None else nullcontext(), self._lock:
+                self._refresh()
+                updated = [{**record, 'quantity': int(record['quantity'] or 0) + delta}
+                           for record, delta in ((self._rows.get(pid), delta) for pid, delta in deltas.items())
+                           if record is not None]
+                for record in updated:
+                    self._link(record)
+                if updated:
+                    self._bump()
+            if updated:
+                self._commit(upserts=updated, rollback=on_error)
+            return updated
+
+    def _match(self, ids, names) -> tuple[list[int], list]:
+        # Wyszukuje ID produktów do usunięcia (bez powtórzeń) oraz nieznalezione ID i nazwy
+        removed: dict[int, None] = {}  # zachowuje kolejność i pomija powtórzenia
+        not_found = []
+        for product_id in ids:
+            if product_id in self._rows:
+                removed[product_id] = None
+            elif product_id not in removed:
+                not_found.append(product_id)
+
+        for name in dict.fromkeys(names):
+            matched = self._by_name.get(name)
+            if matched:
+                removed.update(matched)
+            else:
+                not_found.append(name)
+
+        return list(removed), not_found
+
+    # Wersje asynchroniczne: odczyty na puli odczytu, zmiany na wątku zapisującym
+
+    async def aquery(self, *args, **kwargs) -> tuple[list[dict], int | None, int]:
+        """Asynchroniczna wersja `query`"""
+        return await run_read(self.query, *args, **kwargs)
+
+    async def achanges(self, since: int | None = None, epoch: str | None = None) -> dict:
+        """Asynchroniczna wersja `changes`"""
+        return await run_read(self.changes, since, epoch)
+
+    async def asearch(self, query: str, limit: int = 20) -> list[dict]:
+        """Asynchroniczna wersja `search`"""
+        return await run_read(self.search, query, limit)
+
+    async def aget(self, product_id: int) -> dict | None:
+        """Asynchroniczna wersja `get`"""
+        return await run_read(self.get, product_id)
+
+    async def aadd(self, product: dict) -> dict:
+        """Asynchroniczna wersja `add`"""
+        return await run_write(self.add, product)
+
+    async def aadd_many(self, products: list[dict]) -> list[dict]:
+        """Asynchroniczna wersja `add_many`"""
+        return await run_write(self.add_many, products)
+
+    async def aremove(self, product_id: int) -> bool:
+        """Asynchroniczna wersja `remove`"""
+        return await run_write(self.remove, product_id)
+
+    async def aremove_by_name(self, name: str) -> bool:
+        """Asynchroniczna wersja `remove_by_name`"""
+        return await run_write(self.remove_by_name, name)
+
+    async def aremove_many(self, ids: list[int] = (), names: list[str] = ()) -> tuple[list[int], list]:
+        """Asynchroniczna wersja `remove_many`"""
+        return await run_write(self.remove_many, ids, names)
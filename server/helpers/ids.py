@@ -0,0 +1,151 @@
+"""
+Nadawanie ID produktów i klientów
+
+Liczniki są trwałe (DATABASE/ids.json), więc ID usuniętego produktu nie wraca przy następnym
+dodaniu, a nadanie ID nie wymaga przeglądania tabeli. Na dysk zapisywany jest tylko górny
+koniec zarezerwowanego bloku, więc zapis następuje raz na BLOCK nadanych ID (po restarcie
+niewykorzystana reszta bloku jest pomijana)
+
+Numery klientów mają być nieprzewidywalne, dlatego kolejne wartości licznika klientów
+przechodzą przez permutację z kluczem (sieć Feistela) zbioru 1..CUSTOMER_ID_SPACE. Permutacja
+jest różnowartościowa, więc nie trzeba losować i sprawdzać, czy ID jest wolne
+"""
+
+
+import hashlib
+import json
+import os
+import secrets
+from threading import Lock
+from typing import Callable
+
+BLOCK = 1000
+CUSTOMER_ID_SPACE = 10 ** 9  # numery klientów 1..10^9
+
+
+class KeyedPermutation:
+    """
+    Permutacja liczb 0..size-1 wyznaczona przez klucz (sieć Feistela z cycle-walking)
+
+    Args:
+        key (bytes): Tajny klucz (do 64 bajtów)
+        size (int): Rozmiar permutowanego zbioru
+        rounds (int): Liczba rund sieci Feistela
+    """
+
+    def __init__(self, key: bytes, size: int, rounds: int = 4):
+        self.key = key
+        self.size = size
+        self.rounds = rounds
+        bits = max((size - 1).bit_length(), 2)
+        self._half = (bits + 1) // 2  # sieć działa na 2 * _half bitach >= size
+        self._mask = (1 << self._half) - 1
+
+    def _round(self, value: int, round_no: int) -> int:
+        digest = hashlib.blake2b(value.to_bytes(8, "big") + bytes([round_no]), key=self.key, digest_size=8).digest()
+        return int.from_bytes(digest, "big") & self._mask
+
+    def __call__(self, value: int) -> int:
+        """
+        Zwraca obraz liczby w permutacji
+
+        Args:
+            value (int): Liczba z zakresu 0..size-1
+
+        Returns:
+            int: Liczba z zakresu 0..size-1 (różna dla różnych argumentów)
+        """
+        if not 0 <= value < self.size:
+            raise ValueError(f"Wartość spoza zakresu permutacji: {value}")
+        while True:
+            # Sieć działa na zbiorze potęgi dwójki - wyniki spoza zakresu permutujemy dalej
+            left, right = value >> self._half, value & self._mask
+            for round_no in range(self.rounds):
+                left, right = right, left ^ self._round(right, round_no)
+            value = (left << self._half) | right
+            if value < self.size:
+                return value
+
+
+class IdAllocator:
+    """
+    Trwałe liczniki ID (bezpieczne przy równoległych żądaniach)
+
+    Args:
+        path (str | None): Plik ze stanem liczników; None - liczniki tylko w pamięci
+        block (int): Ile ID rezerwować jednym zapisem na dysk
+    """
+
+    def __init__(self, path: str | None = None, block: int = BLOCK):
+        self.path = path
+        self.block = block
+        self._lock = Lock()
+        self._next: dict[str, int] = {}
+        self._reserved: dict[str, int] = {}
+        self._state = self._read()
+        if "key" not in self._state:
+            self._state["key"] = secrets.token_hex(16)
+            self._write()
+        self._customers = KeyedPermutation(bytes.fromhex(self._state["key"]), CUSTOMER_ID_SPACE)
+
+    def _read(self) -> dict:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._state, f)
+        os.replace(tmp, self.path)
+
+    def take(self, name: str, count: int = 1, floor: int = 0) -> int:
+        """
+        Rezerwuje `count` kolejnych wartości licznika
+
+        Args:
+            name (str): Nazwa licznika ("products", "users")
+            count (int): Liczba potrzebnych wartości
+            floor (int): Najmniejsza dopuszczalna wartość (np. największe istniejące ID + 1)
+
+        Returns:
+            int: Pierwsza z zarezerwowanych wartości
+        """
+        with self._lock:
+            if name not in self._next:
+                # Po restarcie zaczynamy od końca ostatniego zarezerwowanego bloku
+                self._next[name] = self._reserved[name] = self._state.get(name, 0)
+            first = max(self._next[name], floor)
+            self._next[name] = first + count
+            if self._next[name] > self._reserved[name]:
+                self._reserved[name] = self._state[name] = self._next[name] + self.block
+                self._write()
+            return first
+
+    def customer_id(self, taken: Callable[[int], bool] = lambda _: False) -> int:
+        """
+        Nadaje nieprzewidywalny numer klienta
+
+        Args:
+            taken (Callable[[int], bool]): Sprawdza, czy numer jest już zajęty (np. przez
+                klienta zarejestrowanego przed wprowadzeniem licznika)
+
+        Returns:
+            int: Numer klienta z zakresu 1..CUSTOMER_ID_SPACE
+
+        Raises:
+            RuntimeError: Jeśli wszystkie numery zostały już wykorzystane
+        """
+        while True:
+            counter = self.take("users")
+            if counter >= CUSTOMER_ID_SPACE:
+                raise RuntimeError("Wyczerpano pulę numerów klientów")
+            customer_id = self._customers(counter) + 1
+            if not taken(customer_id):
+                return customer_id
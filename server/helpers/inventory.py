@@ -0,0 +1,296 @@
+"""
+Rezerwacje stanów magazynowych
+
+InventoryLedger pozwala zarezerwować sztuki produktów (reserve), a potem sprzedać je
+(commit) albo zwolnić (release). Niezatwierdzone rezerwacje wygasają po czasie `ttl`
+
+Dostępność produktu to stan z katalogu minus sztuki zarezerwowane i sprzedane, ale jeszcze
+niezapisane. Te liczniki są podzielone na `stripes` części, każda z własną blokadą (produkt
+trafia do części według ID), więc zamówienia różnych produktów nie czekają na siebie ani na
+blokadę katalogu. Rezerwacja kilku produktów bierze blokady ich części w stałej kolejności
+i sprawdza wszystkie pozycje naraz (wszystko albo nic), więc dwa równoczesne zamówienia
+nie sprzedadzą tej samej sztuki
+
+Sprzedaż trafia do katalogu zbiorczo: co `flush_interval` sekund wszystkie sprzedane sztuki
+są zdejmowane ze stanów jedną operacją (catalog.adjust_quantities) i jednym zapisem do
+backendu. Po awarii serwera tracona jest co najwyżej sprzedaż z ostatniego odstępu
+"""
+
+
+import asyncio
+import heapq
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+
+from helpers.catalog import ProductCatalog
+from helpers.workers import run_read, run_write
+
+RESERVATION_TTL = 15 * 60   # sekundy do wygaśnięcia niezatwierdzonej rezerwacji
+STRIPES = 256               # liczba części liczników (każda z własną blokadą)
+FLUSH_INTERVAL = 0.2        # co ile sekund zapisywać sprzedaż w katalogu
+
+
+@dataclass(slots=True)
+class Reservation:
+    id: str
+    owner: int | None
+    items: dict[int, int]       # ID produktu -> liczba sztuk
+    products: dict[int, dict]   # rekordy z chwili rezerwacji (cena i nazwa do zamówienia)
+    expires_at: float           # time.monotonic()
+
+
+class _Stripe:
+    # Liczniki produktów jednej części; zmieniane tylko pod `lock`
+    __slots__ = ("lock", "reserved", "sold")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reserved: dict[int, int] = {}
+        self.sold: dict[int, int] = {}  # sprzedane, jeszcze niezapisane w katalogu
+
+
+def _add(counts: dict[int, int], product_id: int, amount: int) -> None:
+    value = counts.get(product_id, 0) + amount
+    if value:
+        counts[product_id] = value
+    else:
+        counts.pop(product_id, None)
+
+
+class InventoryLedger:
+    """
+    Rezerwacje i sprzedaż sztuk produktów z katalogu
+
+    Args:
+        catalog (ProductCatalog): Katalog ze stanami magazynowymi
+        ttl (float): Czas (w sekundach) do wygaśnięcia niezatwierdzonej rezerwacji
+        stripes (int): Liczba części liczników z osobnymi blokadami
+        flush_interval (float): Co ile sekund zapisywać sprzedaż w katalogu
+    """
+
+    def __init__(self, catalog: ProductCatalog, ttl: float = RESERVATION_TTL, stripes: int = STRIPES,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.catalog = catalog
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._lock = Lock()  # chroni rejestr rezerwacji i `_retry`
+        self._reservations: dict[str, Reservation] = {}
+        self._expiry: list[tuple[float, str]] = []  # kopiec (czas wygaśnięcia, ID rezerwacji)
+        self._retry: set[int] = set()  # produkty, których zapis się nie udał
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._reservations)
+
+    def _stripe(self, product_id: int) -> _Stripe:
+        return self._stripes[product_id % len(self._stripes)]
+
+    @contextmanager
+    def _locked(self, product_ids):
+        # Blokady części w stałej kolejności, żeby równoczesne rezerwacje się nie zakleszczyły
+        stripes = [self._stripes[i] for i in sorted({pid % len(self._stripes) for pid in product_ids})]
+        for stripe in stripes:
+            stripe.lock.acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                stripe.lock.release()
+
+    def _available(self, product_id: int, record: dict) -> int:
+        # Wywoływać pod blokadą części produktu
+        stripe = self._stripe(product_id)
+        return (int(record['quantity'] or 0) - stripe.reserved.get(product_id, 0)
+                - stripe.sold.get(product_id, 0))
+
+    def available(self, product_id: int) -> int:
+        """Zwraca liczbę sztuk, które można jeszcze zarezerwować"""
+        with self._locked((product_id,)):
+            record = self.catalog.peek(product_id)
+            return max(0, self._available(product_id, record)) if record is not None else 0
+
+    def reserve(self, items: dict[int, int], owner: int | None = None,
+                ttl: float | None = None) -> tuple[Reservation | None, list[dict]]:
+        """
+        Rezerwuje sztuki wszystkich pozycji naraz (wszystko albo nic)
+
+        Args:
+            items (dict[int, int]): ID produktu -> liczba sztuk
+            owner (int | None): ID użytkownika, który może zatwierdzić lub zwolnić rezerwację
+            ttl (float | None): Czas do wygaśnięcia, domyślnie `self.ttl`
+
+        Returns:
+            tuple[Reservation | None, list[dict]]: Rezerwacja albo None i braki w postaci
+                {"id": ..., "requested": ..., "available": ...}
+        """
+        if not items:
+            return None, []
+        with self._locked(items):
+            shortages, products = [], {}
+            for product_id, count in items.items():
+                record = self.catalog.peek(product_id)
+                available = max(0, self._available(product_id, record)) if record is not None else 0
+                # Produktu bez ceny (nieczytelny stary zapis) nie sprzedajemy
+                if record is None or record['price'] is None or count < 1 or available < count:
+                    shortages.append({"id": product_id, "requested": count, "available": available})
+                products[product_id] = record
+            if shortages:
+                return None, shortages
+            for product_id, count in items.items():
+                _add(self._stripe(product_id).reserved, product_id, count)
+
+        reservation = Reservation(secrets.token_urlsafe(12), owner, dict(items), products,
+                                  time.monotonic() + (self.ttl if ttl is None else ttl))
+        with self._lock:
+            self._reservations[reservation.id] = reservation
+            heapq.heappush(self._expiry, (reservation.expires_at, reservation.id))
+        return reservation, []
+
+    def _take(self, reservation_id: str, owner: int | None) -> Reservation | None:
+        # Usuwa rezerwację z rejestru; wygasłą zwalnia i zwraca None
+        with self._lock:
+            reservation = self._reservations.get(reservation_id)
+            if reservation is None or reservation.owner != owner:
+                return None
+            del self._reservations[reservation_id]
+        if reservation.expires_at <= time.monotonic():
+            self._unreserve(reservation)
+            return None
+        return reservation
+
+    def _unreserve(self, reservation: Reservation, sold: bool = False) -> None:
+        for product_id, count in reservation.items.items():
+            stripe = self._stripe(product_id)
+            with stripe.lock:
+                _add(stripe.reserved, product_id, -count)
+                if sold:
+                    _add(stripe.sold, product_id, count)
+
+    def commit(self, reservation_id: str, owner: int | None = None) -> Reservation | None:
+        """
+        Sprzedaje zarezerwowane sztuki (trafią do katalogu przy najbliższym zapisie zbiorczym)
+
+        Args:
+            reservation_id (str): ID rezerwacji
+            owner (int | None): ID użytkownika, który złożył rezerwację
+
+        Returns:
+            Reservation | None: Zatwierdzona rezerwacja albo None, jeśli nie istnieje lub wygasła
+        """
+        reservation = self._take(reservation_id, owner)
+        if reservation is not None:
+            self._unreserve(reservation, sold=True)
+        return reservation
+
+    def release(self, reservation_id: str, owner: int | None = None) -> bool:
+        """
+        Zwalnia zarezerwowane sztuki
+
+        Returns:
+            bool: False, jeśli rezerwacja nie istnieje lub już wygasła
+        """
+        reservation = self._take(reservation_id, owner)
+        if reservation is not None:
+            self._unreserve(reservation)
+        return reservation is not None
+
+    def expire(self) -> int:
+        """
+        Zwalnia wygasłe rezerwacje
+
+        Returns:
+            int: Liczba zwolnionych rezerwacji
+        """
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, reservation_id = heapq.heappop(self._expiry)
+                reservation = self._reservations.pop(reservation_id, None)  # None - już zatwierdzona lub zwolniona
+                if reservation is not None:
+                    expired.append(reservation)
+        for reservation in expired:
+            self._unreserve(reservation)
+        return len(expired)
+
+    def _sold(self) -> dict[int, int]:
+        sold = {}
+        for stripe in self._stripes:
+            with stripe.lock:
+                sold.update(stripe.sold)
+        return sold
+
+    @contextmanager
+    def _flushing(self, batch: dict[int, int]):
+        # Trzymane przez katalog na czas zmiany stanów w pamięci: nowe stany i pomniejszone
+        # liczniki sprzedaży są widoczne dla rezerwacji jednocześnie
+        with self._locked(batch):
+            yield
+            for product_id, count in batch.items():
+                _add(self._stripe(product_id).sold, product_id, -count)
+
+    def flush(self) -> int:
+        """
+        Zdejmuje sprzedane sztuki ze stanów katalogu jednym zapisem
+
+        Returns:
+            int: Liczba zmienionych produktów
+        """
+        batch = self._sold()
+        with self._lock:
+            retry, self._retry = self._retry, set()
+        if not batch and not retry:
+            return 0
+        deltas = {product_id: 0 for product_id in retry}
+        deltas.update({product_id: -count for product_id, count in batch.items()})
+
+        def on_error():
+            with self._lock:
+                self._retry.update(deltas)  # stany w pamięci są już zmienione - zapiszemy je ponownie
+
+        return len(self.catalog.adjust_quantities(deltas, guard=self._flushing(batch), on_error=on_error))
+
+    def start(self) -> None:
+        """Uruchamia okresowy zapis sprzedaży i zwalnianie wygasłych rezerwacji w pętli zdarzeń"""
+        async def run():
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                self.expire()
+                try:
+                    await run_write(self.flush)
+                except Exception:
+                    pass  # produkty trafiły do _retry - ponowimy przy następnym zapisie
+
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(run())
+
+    async def stop(self) -> None:
+        """Zatrzymuje okresowy zapis i zapisuje sprzedaż, która jeszcze nie trafiła do katalogu"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_write(self.flush)
+
+    # Wersje asynchroniczne na puli odczytu: rezerwacje różnych produktów wykonują się
+    # równolegle i nie czekają w kolejce wątku zapisującego
+
+    async def areserve(self, items: dict[int, int], owner: int | None = None,
+                       ttl: float | None = None) -> tuple[Reservation | None, list[dict]]:
+        """Asynchroniczna wersja `reserve`"""
+        return await run_read(self.reserve, items, owner, ttl)
+
+    async def acommit(self, reservation_id: str, owner: int | None = None) -> Reservation | None:
+        """Asynchroniczna wersja `commit`"""
+        return await run_read(self.commit, reservation_id, owner)
+
+    async def arelease(self, reservation_id: str, owner: int | None = None) -> bool:
+        """Asynchroniczna wersja `release`"""
+        return await run_read(self.release, reservation_id, owner)
@@ -0,0 +1,270 @@
+"""
+Metryki serwera w formacie tekstowym Prometheusa (GET /metrics)
+
+Mierzone są: czas obsługi żądań (według metody, szablonu ścieżki i statusu), liczba żądań
+w toku, czas odczytu i zapisu danych w backendzie, czas oczekiwania i pracy w pulach wątków,
+czas serializacji odpowiedzi JSON, liczba otwartych sesji i liczniki zdarzeń (np. resynców /ws/catalog)
+
+Pomiar można wyłączyć zmienną środowiskową METRICS=0 albo w trakcie działania przez
+`metrics.enabled = False` - wtedy middleware i liczniki ograniczają się do sprawdzenia flagi
+"""
+
+
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable
+
+from fastapi.responses import JSONResponse
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class Histogram:
+    """
+    Histogram czasów z etykietami (skumulowane kubełki jak w Prometheusie)
+
+    Args:
+        name (str): Nazwa metryki
+        help (str): Opis metryki
+        labels (tuple[str, ...]): Nazwy etykiet
+        buckets (tuple[float, ...]): Górne granice kubełków w sekundach
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = Lock()
+        self._series: dict[tuple, list] = {}  # etykiety -> [liczności kubełków..., suma, liczba]
+
+    def observe(self, value: float, *labels) -> None:
+        """Zapisuje pomiar dla podanych wartości etykiet"""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        """Zwraca linie formatu tekstowego Prometheusa"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        names = self.labels + ("le",)
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {values[-1]}")
+        return lines
+
+
+class Gauge:
+    """
+    Wartość chwilowa z etykietami albo odczytywana funkcją przy każdym pobraniu metryk
+
+    Args:
+        name (str): Nazwa metryki
+        help (str): Opis metryki
+        labels (tuple[str, ...]): Nazwy etykiet
+        read (Callable[[], float] | None): Funkcja zwracająca wartość (metryka bez etykiet)
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), read: Callable[[], float] | None = None):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.read = read
+        self._lock = Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        """Zwiększa wartość"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        """Zmniejsza wartość"""
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> list[str]:
+        """Zwraca linie formatu tekstowego Prometheusa"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        if self.read is not None:
+            lines.append(f"{self.name} {self.read()}")
+            return lines
+        with self._lock:
+            values = dict(self._values)
+        lines.extend(f"{self.name}{_labels(self.labels, labels)} {value}" for labels, value in sorted(values.items()))
+        return lines
+
+
+class Counter(Gauge):
+    """
+    Licznik, który tylko rośnie (do liczenia zdarzeń, np. przez rate() w Prometheusie)
+
+    Args:
+        name (str): Nazwa metryki (zgodnie z konwencją z końcówką "_total")
+        help (str): Opis metryki
+        labels (tuple[str, ...]): Nazwy etykiet
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        if not labels:
+            self._values[()] = 0  # licznik bez etykiet jest widoczny od startu
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        """Zwiększa wartość (o liczbę nieujemną)"""
+        if amount < 0:
+            raise ValueError("Licznik nie może maleć")
+        super().inc(*labels, amount=amount)
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        raise TypeError("Licznik nie może maleć")
+
+
+class Metrics:
+    """
+    Zbiór metryk serwera
+
+    Args:
+        enabled (bool): Czy zbierać pomiary
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: list[Histogram | Gauge | Counter] = []
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Histogram:
+        """Tworzy i rejestruje histogram"""
+        metric = Histogram(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = (),
+              read: Callable[[], float] | None = None) -> Gauge:
+        """Tworzy i rejestruje wartość chwilową"""
+        metric = Gauge(name, help, labels, read)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        """Tworzy i rejestruje licznik"""
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    @contextmanager
+    def timer(self, histogram: Histogram, *labels):
+        """Mierzy czas wykonania bloku i zapisuje go w histogramie (o ile pomiar jest włączony)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> str:
+        """Zwraca wszystkie metryki w formacie tekstowym Prometheusa"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=os.environ.get("METRICS", "1") != "0")
+
+REQUEST_SECONDS = metrics.histogram("http_request_duration_seconds", "Czas obsługi żądania",
+                                    ("method", "route", "status"))
+REQUESTS_IN_FLIGHT = metrics.gauge("http_requests_in_flight", "Liczba żądań w trakcie obsługi", ("method",))
+STORAGE_SECONDS = metrics.histogram("storage_operation_seconds", "Czas odczytu i zapisu danych w backendzie",
+                                    ("operation", "table"))
+WORKER_SECONDS = metrics.histogram("worker_seconds", "Czas oczekiwania w kolejce i pracy w pulach wątków",
+                                   ("pool", "phase"))
+SERIALIZE_SECONDS = metrics.histogram("response_serialize_seconds", "Czas serializacji odpowiedzi JSON",
+                                      ("route",))
+
+_scope: ContextVar[dict | None] = ContextVar("metrics_scope", default=None)
+
+
+def _route(scope: dict) -> str:
+    # Szablon ścieżki ("/products/{product_id}"), żeby liczba serii nie rosła z każdym ID
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<nieznana>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mierzące czas obsługi żądań i liczbę żądań w toku
+
+    Args:
+        app: Aplikacja ASGI
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _scope.set(scope)
+        REQUESTS_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method, _route(scope), str(status))
+            REQUESTS_IN_FLIGHT.dec(method)
+            _scope.reset(token)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse mierząca czas serializacji treści"""
+
+    def render(self, content) -> bytes:
+        if not metrics.enabled:
+            return super().render(content)
+        start = time.perf_counter()
+        body = super().render(content)
+        scope = _scope.get()
+        SERIALIZE_SECONDS.observe(time.perf_counter() - start, _route(scope) if scope is not None else "<poza żądaniem>")
+        return body
@@ -0,0 +1,172 @@
+"""
+Ceny i schemat tabeli produktów
+
+Ceny są przechowywane jako liczby całkowite w groszach (PRICE_SCALE jednostek na złotówkę),
+ilości jako liczby całkowite, a kategorie jako typ kategoryczny pandas. Starsze dane mają
+ceny w postaci tekstu ("12 zł", "5.99 zł") - są one rozpoznawane i zamieniane na grosze
+
+Jednostka musi wynikać z zapisu, a nie ze zgadywania: liczba całkowita to grosze, a tekst
+z "zł" albo z separatorem dziesiętnym to kwota w złotych (tekst z samych cyfr to grosze).
+Liczby zmiennoprzecinkowe są niejednoznaczne (12.0 to 12 zł czy 12 gr?), więc API ich nie
+przyjmuje, a kolumnę takich cen przelicza tylko migracja (migrate.py --prices). Wyjątkiem jest
+kolumna liczb całkowitych z brakami - pandas wczytuje ją jako float, a to nadal grosze
+"""
+
+
+import numpy as np
+import pandas as pd
+
+PRICE_SCALE = 100
+
+PRODUCT_DTYPES = {
+    "id": "int64",
+    "price": "Int64",  # grosze; brak ceny (nieczytelny stary zapis) to <NA>
+    "quantity": "int64",
+    "category": "category",
+}
+
+
+def parse_price(value) -> int:
+    """
+    Zamienia cenę podaną przez klienta API na grosze
+
+    Args:
+        value: Grosze (int albo tekst z samych cyfr, "599") albo kwota z jednostką ("5.99 zł", "12 zł")
+
+    Returns:
+        int: Cena w groszach
+
+    Raises:
+        ValueError: Jeśli ceny nie da się odczytać, jest ujemna albo jej jednostka jest niejednoznaczna
+            (liczba zmiennoprzecinkowa, tekst z częścią ułamkową bez "zł")
+    """
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"Nieprawidłowa cena: {value!r}")
+    if isinstance(value, (int, np.integer)):
+        grosze = int(value)
+    elif isinstance(value, str) and "zł" in value.lower():
+        grosze = round(float(value.lower().replace("zł", "").replace(",", ".").strip()) * PRICE_SCALE)
+    elif isinstance(value, str) and value.strip().isdigit():
+        grosze = int(value.strip())
+    else:
+        raise ValueError(f"Niejednoznaczna cena: {value!r} - podaj grosze (liczba całkowita) albo kwotę z \"zł\"")
+    if grosze < 0:
+        raise ValueError(f"Cena nie może być ujemna: {value!r}")
+    return grosze
+
+
+def is_grosze_column(prices: pd.Series) -> bool:
+    """
+    Sprawdza, czy kolumna liczb zmiennoprzecinkowych to grosze z brakami (tak pandas wczytuje
+    kolumnę liczb całkowitych z pustymi polami)
+
+    Args:
+        prices (pd.Series): Kolumna liczbowa
+
+    Returns:
+        bool: True, jeśli wszystkie wartości są całkowite i kolumna ma braki (albo jest pusta)
+    """
+    values = prices.dropna().to_numpy(dtype="float64")
+    return bool((values == np.round(values)).all()) and (len(values) < len(prices) or not len(values))
+
+
+def parse_price_series(prices: pd.Series) -> pd.Series:
+    """
+    Zamienia kolumnę cen wczytaną z backendu na grosze
+
+    Args:
+        prices (pd.Series): Kolumna cen (liczby całkowite, tekst albo jedno i drugie)
+
+    Returns:
+        pd.Series: Ceny w groszach (Int64), <NA> tam, gdzie ceny nie da się odczytać
+
+    Raises:
+        ValueError: Jeśli kolumna zawiera liczby zmiennoprzecinkowe, których jednostki nie da się
+            ustalić (trzeba ją przeliczyć przez migrate.py --prices)
+    """
+    if pd.api.types.is_numeric_dtype(prices) and not pd.api.types.is_bool_dtype(prices):
+        if pd.api.types.is_float_dtype(prices) and not is_grosze_column(prices):
+            raise ValueError("Ceny zapisane jako liczby zmiennoprzecinkowe (złote czy grosze?) - "
+                             "przelicz je poleceniem migrate.py --prices")
+        return prices.where(prices >= 0).round().astype("Int64")
+
+    is_text = prices.map(lambda v: isinstance(v, str))
+    numbers = pd.to_numeric(prices.where(~is_text), errors="coerce").astype("float64")
+    fractional = numbers.notna() & (numbers != numbers.round())
+    if fractional.any():
+        raise ValueError("Ceny zapisane jako liczby zmiennoprzecinkowe (złote czy grosze?) - "
+                         "przelicz je poleceniem migrate.py --prices")
+
+    text = prices.where(is_text).astype("string").str.lower().str.strip()
+    in_zloty = text.str.contains("zł|,|\\.", regex=True, na=False)
+    value = pd.to_numeric(text.str.replace("zł", "", regex=False).str.replace(",", ".", regex=False).str.strip(),
+                          errors="coerce").astype("float64")
+    from_text = value.where(~in_zloty, value * PRICE_SCALE)
+    result = numbers.where(~is_text, from_text)
+    result = result.where(result >= 0)
+    return result.round().astype("Int64")
+
+
+def normalize_products(df: pd.DataFrame, strict: bool = False) -> pd.DataFrame:
+    """
+    Doprowadza tabelę produktów do schematu PRODUCT_DTYPES (zamienia też stare ceny tekstowe)
+
+    Args:
+        df (pd.DataFrame): Tabela produktów
+        strict (bool): Jeśli True, nieczytelna cena powoduje błąd zamiast <NA>
+
+    Returns:
+        pd.DataFrame: Tabela z cenami w groszach, całkowitymi ilościami i kategoriami
+
+    Raises:
+        ValueError: W trybie strict, jeśli któraś cena jest nieczytelna, a zawsze, jeśli ceny są
+            liczbami zmiennoprzecinkowymi o niejednoznacznej jednostce
+    """
+    df = df.copy()
+    if "price" in df.columns:
+        prices = parse_price_series(df["price"])
+        if strict:
+            bad = prices.isna() & df["price"].notna()
+            if bad.any():
+                ids = df.loc[bad, "id"].tolist() if "id" in df.columns else df.index[bad].tolist()
+                raise ValueError(f"Nie udało się odczytać cen produktów: {ids}")
+        df["price"] = prices
+    if "quantity" in df.columns:
+        df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(0)
+    if "id" in df.columns:
+        df["id"] = pd.to_numeric(df["id"])
+    return df.astype({col: dtype for col, dtype in PRODUCT_DTYPES.items() if col in df.columns})
+
+
+def price_mask(prices: np.ndarray, min_price: int | None = None, max_price: int | None = None) -> np.ndarray:
+    """
+    Wektorowy filtr zakresu cen
+
+    Args:
+        prices (np.ndarray): Ceny w groszach
+        min_price (int | None): Minimalna cena w groszach
+        max_price (int | None): Maksymalna cena w groszach
+
+    Returns:
+        np.ndarray: Maska logiczna produktów mieszczących się w zakresie
+    """
+    mask = np.ones(len(prices), dtype=bool)
+    if min_price is not None:
+        mask &= prices >= min_price
+    if max_price is not None:
+        mask &= prices <= max_price
+    return mask
+
+
+def order_total(prices, quantities) -> int:
+    """
+    Zwraca wartość zamówienia w groszach
+
+    Args:
+        prices: Ceny pozycji w groszach
+        quantities: Liczby sztuk pozycji
+
+    Returns:
+        int: Suma cena * liczba sztuk
+    """
+    return int(np.dot(np.asarray(prices, dtype=np.int64), np.asarray(quantities, dtype=np.int64)))
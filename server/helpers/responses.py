@@ -0,0 +1,143 @@
+"""
+Gotowe (zakodowane) odpowiedzi katalogu
+
+Odpowiedź GET /products dla danego zestawu parametrów jest kodowana do JSON raz na wersję
+katalogu i trzymana jako bajty razem z wersją skompresowaną gzip, liczoną przy pierwszym
+żądaniu z Accept-Encoding: gzip. Zmiana katalogu (nowa wersja) unieważnia całą pamięć
+
+Tryb NDJSON (application/x-ndjson) wysyła produkty po jednym na linię w porcjach po
+NDJSON_CHUNK, więc serwer nigdy nie trzyma w pamięci całej zakodowanej odpowiedzi, a klient
+może przetwarzać produkty w trakcie pobierania
+"""
+
+
+import gzip
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Iterator
+
+GZIP_MIN_SIZE = 1024     # mniejszych odpowiedzi nie opłaca się kompresować
+GZIP_LEVEL = 6
+NDJSON_CHUNK = 1000      # produktów na porcję strumienia
+MAX_ENTRIES = 64         # zestawów parametrów trzymanych dla jednej wersji katalogu
+
+
+def encode_json(content) -> bytes:
+    """Koduje treść tak samo jak JSONResponse (UTF-8, bez zbędnych spacji)"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """
+    Sprawdza, czy klient przyjmuje odpowiedź gzip
+
+    Args:
+        accept_encoding (str | None): Nagłówek Accept-Encoding
+
+    Returns:
+        bool: True, jeśli gzip jest wymieniony i nie ma q=0
+    """
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip() in ("gzip", "*"):
+            q = params.strip().removeprefix("q=")
+            return not params or q.replace(".", "", 1).isdigit() and float(q) > 0
+    return False
+
+
+class EncodedBody:
+    """
+    Zakodowana odpowiedź z leniwie liczoną wersją gzip
+
+    Args:
+        body (bytes): Treść JSON
+    """
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._gzip: bytes | None = None
+
+    def gzip(self) -> bytes | None:
+        """Zwraca treść skompresowaną gzip (None, jeśli odpowiedź jest za mała na kompresję)"""
+        if len(self.body) < GZIP_MIN_SIZE:
+            return None
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+        return self._gzip
+
+
+class ResponseCache:
+    """
+    Zakodowane odpowiedzi dla bieżącej wersji katalogu
+
+    Args:
+        max_entries (int): Maksymalna liczba zapamiętanych zestawów parametrów
+        encode (Callable[[object], bytes]): Funkcja kodująca treść
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, encode: Callable[[object], bytes] = encode_json):
+        self.max_entries = max_entries
+        self.encode = encode
+        self._lock = Lock()
+        self._version = None
+        self._entries: OrderedDict[tuple, EncodedBody] = OrderedDict()
+
+    def get(self, version, key: tuple, build: Callable[[], tuple[object, object]]) -> tuple[object, EncodedBody]:
+        """
+        Zwraca zakodowaną odpowiedź, budując ją przy pierwszym żądaniu dla danej wersji
+
+        Treść jest zapamiętywana pod wersją zwróconą przez `build`, a nie pod wersją odczytaną
+        przed budowaniem - zmiana katalogu w trakcie budowania nie połączy starej wersji
+        (ETagu) z nową treścią
+
+        Args:
+            version: Bieżąca wersja katalogu (np. ETag), dla której szukamy gotowej odpowiedzi
+            key (tuple): Parametry zapytania
+            build (Callable[[], tuple[object, object]]): Zwraca wersję i treść odpowiedzi
+                odczytane razem (z jednego stanu katalogu)
+
+        Returns:
+            tuple[object, EncodedBody]: Wersja, z której pochodzi treść, i zakodowana odpowiedź
+        """
+        with self._lock:
+            if version == self._version:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return version, entry
+
+        # Kodowanie poza blokadą - równoległe żądania innych stron nie czekają na siebie
+        version, content = build()
+        entry = EncodedBody(self.encode(content))
+        with self._lock:
+            if version != self._version:
+                # Nowsza wersja unieważnia całą pamięć; spóźnione budowanie starszej wersji może ją
+                # nadpisać, ale wpisy zawsze odpowiadają wersji, pod którą są zapisane
+                self._version = version
+                self._entries.clear()
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return version, entry
+
+    def clear(self) -> None:
+        """Usuwa wszystkie zapamiętane odpowiedzi"""
+        with self._lock:
+            self._version = None
+            self._entries.clear()
+
+
+def ndjson_chunks(products: list[dict], chunk: int = NDJSON_CHUNK) -> Iterator[bytes]:
+    """
+    Koduje produkty jako NDJSON w porcjach
+
+    Args:
+        products (list[dict]): Produkty (lista referencji - kodowana jest tylko bieżąca porcja)
+        chunk (int): Liczba produktów w porcji
+
+    Yields:
+        bytes: Kolejne porcje linii JSON zakończonych znakiem nowej linii
+    """
+    for start in range(0, len(products), chunk):
+        yield b"".join(encode_json(p) + b"\n" for p in products[start:start + chunk])
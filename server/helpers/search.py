@@ -0,0 +1,201 @@
+"""
+Wyszukiwanie pełnotekstowe w katalogu
+
+Indeks odwrócony (termin -> {ID produktu: waga}) obejmuje nazwę, opis i kategorię produktu.
+Terminy są sprowadzane do małych liter bez polskich znaków (ł -> l, ó -> o, ż -> z, ...),
+a indeks prefiksów (prefiks -> terminy) pozwala wyszukiwać po początku słowa
+
+Indeks jest aktualizowany przyrostowo przy dodaniu i usunięciu produktu. Dla każdego terminu
+ID produktów są pogrupowane po wadze (różnych wag jest tylko kilka - to sumy FIELD_WEIGHTS),
+a każda grupa jest posortowana rosnąco po ID i aktualizowana przez bisect. Top-k dla jednego
+słowa czyta więc tylko k pierwszych pozycji, bez sortowania całej listy trafień - także przy
+pierwszym zapytaniu o częste słowo
+"""
+
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+# Waga trafienia w poszczególnych polach produktu
+FIELD_WEIGHTS = {"name": 3.0, "category": 2.0, "description": 1.0}
+PREFIX_FACTOR = 0.5      # trafienie samym początkiem słowa liczy się słabiej niż całe słowo
+MIN_PREFIX = 2           # krótsze słowa z zapytania dopasowujemy tylko w całości
+MAX_EXPANSIONS = 50      # ile najczęstszych terminów rozważamy dla jednego prefiksu
+
+_FOLD = str.maketrans({"ł": "l", "Ł": "l"})  # ł nie rozkłada się przez NFKD
+_TOKEN = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """
+    Sprowadza tekst do małych liter bez znaków diakrytycznych ("Żółć" -> "zolc")
+
+    Args:
+        text (str): Tekst
+
+    Returns:
+        str: Tekst znormalizowany
+    """
+    text = unicodedata.normalize("NFKD", str(text).translate(_FOLD).lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text) -> list[str]:
+    """Dzieli tekst na znormalizowane słowa"""
+    if text is None:
+        return []
+    return _TOKEN.findall(fold(text))
+
+
+class SearchIndex:
+    """Indeks odwrócony produktów z wyszukiwaniem po prefiksach i rankingiem"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Usuwa wszystkie produkty z indeksu"""
+        self._postings: dict[str, dict[int, float]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+        self._docs: dict[int, dict[str, float]] = {}
+        self._ranked: dict[str, dict[float, list[int]]] = {}  # termin -> waga -> ID rosnąco
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    @staticmethod
+    def terms(record: dict) -> dict[str, float]:
+        """Zwraca terminy produktu z wagami (suma wag pól, w których występują)"""
+        weights: dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in set(tokenize(record.get(field))):
+                weights[term] = weights.get(term, 0.0) + weight
+        return weights
+
+    def add(self, record: dict) -> None:
+        """
+        Dodaje produkt do indeksu (albo aktualizuje go, jeśli już w nim jest)
+
+        Args:
+            record (dict): Rekord produktu
+        """
+        product_id = int(record['id'])
+        terms = self.terms(record)
+        if self._docs.get(product_id) == terms:
+            return  # zmiana nie dotyczy pól tekstowych (np. ilość po zamówieniu)
+        self.remove(product_id)
+        self._docs[product_id] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                for end in range(MIN_PREFIX, len(term) + 1):
+                    self._prefixes.setdefault(term[:end], set()).add(term)
+            postings[product_id] = weight
+            group = self._ranked.setdefault(term, {}).setdefault(weight, [])
+            if not group or group[-1] < product_id:
+                group.append(product_id)  # zwykle ID nowych produktów rosną
+            else:
+                insort(group, product_id)
+
+    def remove(self, product_id: int) -> None:
+        """Usuwa produkt z indeksu"""
+        terms = self._docs.pop(product_id, None)
+        if terms is None:
+            return
+        for term, weight in terms.items():
+            postings = self._postings[term]
+            del postings[product_id]
+            groups = self._ranked[term]
+            group = groups[weight]
+            del group[bisect_left(group, product_id)]
+            if not group:
+                del groups[weight]
+            if not postings:
+                del self._postings[term]
+                del self._ranked[term]
+                for end in range(MIN_PREFIX, len(term) + 1):
+                    prefix = term[:end]
+                    matching = self._prefixes[prefix]
+                    matching.discard(term)
+                    if not matching:
+                        del self._prefixes[prefix]
+
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        # Terminy pasujące do słowa z zapytania razem z mnożnikiem wagi
+        expansions = []
+        if token in self._postings:
+            expansions.append((token, 1.0))
+        if len(token) >= MIN_PREFIX:
+            longer = [t for t in self._prefixes.get(token, ()) if t != token]
+            if len(longer) > MAX_EXPANSIONS:
+                longer = heapq.nlargest(MAX_EXPANSIONS, longer, key=lambda t: len(self._postings[t]))
+            expansions.extend((t, PREFIX_FACTOR) for t in longer)
+        return expansions
+
+    def _ranking(self, term: str, factor: float):
+        # Pozycje terminu (-wynik, ID) od najlepszej: grupy od najwyższej wagi, w grupie rosnąco po ID
+        groups = self._ranked[term]
+        for weight in sorted(groups, reverse=True):
+            score = -weight * factor
+            for product_id in groups[weight]:
+                yield score, product_id
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        """
+        Wyszukuje produkty zawierające wszystkie słowa zapytania (całe albo ich początek)
+
+        Args:
+            query (str): Zapytanie
+            limit (int): Maksymalna liczba wyników
+
+        Returns:
+            list[tuple[int, float]]: Pary (ID produktu, wynik) od najlepiej dopasowanych
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit <= 0:
+            return []
+        expanded = [self._expand(token) for token in tokens]
+        if any(not terms for terms in expanded):
+            return []
+
+        if len(expanded) == 1:
+            return self._top_single(expanded[0], limit)
+
+        # Kandydatów bierzemy z najrzadszego słowa, pozostałe tylko sprawdzamy
+        expanded.sort(key=lambda terms: sum(len(self._postings[t]) for t, _ in terms))
+        scores: dict[int, float] = {}
+        for term, factor in expanded[0]:
+            for product_id, weight in self._postings[term].items():
+                score = weight * factor
+                if score > scores.get(product_id, 0.0):
+                    scores[product_id] = score
+
+        for terms in expanded[1:]:
+            postings = [(self._postings[t], factor) for t, factor in terms]
+            next_scores = {}
+            for product_id, score in scores.items():
+                best = max((p.get(product_id, 0.0) * factor for p, factor in postings), default=0.0)
+                if best:
+                    next_scores[product_id] = score + best
+            scores = next_scores
+            if not scores:
+                return []
+
+        return heapq.nsmallest(limit, ((pid, s) for pid, s in scores.items()), key=lambda item: (-item[1], item[0]))
+
+    def _top_single(self, terms: list[tuple[str, float]], limit: int) -> list[tuple[int, float]]:
+        # Scalanie posortowanych list terminów - czytamy tylko tyle pozycji, ile trzeba do `limit`
+        streams = [self._ranking(term, factor) for term, factor in terms]
+        results = []
+        seen = set()
+        for neg_score, product_id in heapq.merge(*streams):
+            if product_id in seen:
+                continue  # ten sam produkt z gorszym dopasowaniem innego terminu
+            seen.add(product_id)
+            results.append((product_id, -neg_score))
+            if len(results) == limit:
+                break
+        return results
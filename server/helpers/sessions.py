@@ -0,0 +1,158 @@
+"""
+Magazyn sesji użytkowników
+
+Sesje są indeksowane w obie strony (token -> sesja, login -> token), wygasają po okresie
+bezczynności (TTL) i są usuwane przez okresowe czyszczenie. Gdy magazyn się zapełni,
+usuwana jest najdawniej używana sesja. Każda sesja pamięta, czy użytkownik jest administratorem
+"""
+
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+
+
+@dataclass(slots=True)
+class Session:
+    login: str
+    token: str
+    is_admin: bool
+    last_seen: float
+
+
+class SessionStore:
+    """
+    Sesje z wygasaniem po bezczynności i limitem rozmiaru (LRU)
+
+    Args:
+        ttl (float): Czas bezczynności (w sekundach), po którym sesja wygasa
+        max_size (int): Maksymalna liczba jednoczesnych sesji
+    """
+
+    def __init__(self, ttl: float = 1800, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = Lock()
+        # Kolejność odpowiada ostatniemu użyciu - na początku najdawniej używane sesje
+        self._by_token: OrderedDict[str, Session] = OrderedDict()
+        self._by_login: dict[str, str] = {}
+        self._sweeper: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._by_token)
+
+    def __contains__(self, login: str) -> bool:
+        return self.token_for(login) is not None
+
+    def _expired(self, session: Session, now: float) -> bool:
+        return now - session.last_seen > self.ttl
+
+    def _drop(self, token: str) -> None:
+        session = self._by_token.pop(token, None)
+        if session is not None and self._by_login.get(session.login) == token:
+            del self._by_login[session.login]
+
+    def open(self, login: str, token: str, is_admin: bool = False) -> Session:
+        """
+        Otwiera sesję (poprzednia sesja tego użytkownika jest zamykana)
+
+        Args:
+            login (str): Login użytkownika
+            token (str): Token klienta
+            is_admin (bool): Czy użytkownik jest administratorem
+
+        Returns:
+            Session: Nowa sesja
+        """
+        with self._lock:
+            old = self._by_login.get(login)
+            if old is not None:
+                self._drop(old)
+            self._drop(token)
+
+            session = Session(login, token, is_admin, time.monotonic())
+            self._by_token[token] = session
+            self._by_login[login] = token
+
+            while len(self._by_token) > self.max_size:
+                self._drop(next(iter(self._by_token)))
+            return session
+
+    def get(self, token: str) -> Session | None:
+        """Zwraca aktywną sesję dla tokenu i odświeża jej czas bezczynności"""
+        with self._lock:
+            session = self._by_token.get(token)
+            if session is None:
+                return None
+            now = time.monotonic()
+            if self._expired(session, now):
+                self._drop(token)
+                return None
+            session.last_seen = now
+            self._by_token.move_to_end(token)
+            return session
+
+    def token_for(self, login: str) -> str | None:
+        """Zwraca token aktywnej sesji użytkownika albo None"""
+        with self._lock:
+            token = self._by_login.get(login)
+            if token is None:
+                return None
+            if self._expired(self._by_token[token], time.monotonic()):
+                self._drop(token)
+                return None
+            return token
+
+    def close(self, login: str) -> bool:
+        """
+        Zamyka sesję użytkownika
+
+        Returns:
+            bool: False, jeśli użytkownik nie miał sesji
+        """
+        with self._lock:
+            token = self._by_login.get(login)
+            if token is None:
+                return False
+            self._drop(token)
+            return True
+
+    def sweep(self) -> int:
+        """
+        Usuwa wygasłe sesje
+
+        Returns:
+            int: Liczba usuniętych sesji
+        """
+        with self._lock:
+            now = time.monotonic()
+            expired = []
+            for token, session in self._by_token.items():
+                if not self._expired(session, now):
+                    break  # dalej są już tylko sesje używane później
+                expired.append(token)
+            for token in expired:
+                self._drop(token)
+            return len(expired)
+
+    def start_sweeper(self, interval: float = 60) -> None:
+        """Uruchamia okresowe czyszczenie wygasłych sesji w pętli zdarzeń"""
+        async def run():
+            while True:
+                await asyncio.sleep(interval)
+                self.sweep()
+
+        if self._sweeper is None:
+            self._sweeper = asyncio.get_running_loop().create_task(run())
+
+    async def stop_sweeper(self) -> None:
+        """Zatrzymuje okresowe czyszczenie"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
@@ -0,0 +1,524 @@
+"""
+Warstwa przechowywania danych serwera
+
+Udostępnia wymienne backendy o tym samym interfejsie:
+- FileBackend - dotychczasowe pliki products.csv i customers.xlsx (każda zmiana przepisuje plik)
+- JournaledBackend - pliki CSV/XLSX z dziennikiem zmian (write-ahead journal): zmiany są
+  dopisywane do dziennika i utrwalane grupowo, a w tle scalane z plikami bazy
+- SqliteBackend - wbudowana baza sqlite3 w trybie WAL, w której dodanie lub usunięcie
+  wiersza nie dotyka reszty tabeli
+
+Pliki CSV/XLSX pozostają formatem eksportu (patrz migrate.py)
+"""
+
+
+import json
+import os
+import sqlite3
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Callable
+
+import pandas as pd
+
+from helpers.prices import normalize_products
+
+PRODUCT_COLUMNS = ['id', 'name', 'price', 'quantity', 'description', 'category']
+USER_COLUMNS = ['id', 'name', 'surname', 'age', 'login', 'password', 'admin']
+
+# tabela -> (kolumna klucza, kolumny)
+TABLES = {
+    "products": ("id", PRODUCT_COLUMNS),
+    "users": ("login", USER_COLUMNS),
+}
+
+SQLITE_FILENAME = "zabka.db"
+JOURNAL_FILENAME = "journal.ndjson"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    price INTEGER,
+    quantity INTEGER,
+    description TEXT,
+    category TEXT
+);
+CREATE INDEX IF NOT EXISTS products_name ON products (name);
+CREATE INDEX IF NOT EXISTS products_category ON products (category);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    surname TEXT,
+    age TEXT,
+    login TEXT NOT NULL UNIQUE,
+    password TEXT,
+    admin INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def read_products_file(filepath):
+    try:
+        return normalize_products(pd.read_csv(filepath))
+    except FileNotFoundError:
+        df = pd.DataFrame(columns=PRODUCT_COLUMNS)
+        df.to_csv(filepath, index=False)
+        return df
+
+def read_users_file(filepath):
+    try:
+        return pd.read_excel(filepath)
+    except FileNotFoundError:
+        df = pd.DataFrame(columns=USER_COLUMNS)
+        df.to_excel(filepath, index=False)
+        return df
+
+def write_file(filepath, df: pd.DataFrame, index=True, is_excel=False):
+    df = df.drop_duplicates()
+    if is_excel:
+        df.to_excel(filepath, index=index)
+    else:
+        df.to_csv(filepath, index=index)
+
+
+class StorageBackend:
+    """
+    Interfejs backendu przechowywania danych
+
+    Tabele to "products" i "users" (patrz TABLES)
+    """
+
+    # Czy własne zapisy zmieniają version(): tak dla plików (zmienia się mtime), nie dla backendów,
+    # które same odróżniają swoje zapisy od zmian z zewnątrz
+    own_writes_change_version = True
+
+    def read(self, table: str) -> pd.DataFrame:
+        """Wczytuje całą tabelę"""
+        raise NotImplementedError
+
+    def apply(self, table: str, upserts: list[dict], deletes: list,
+              snapshot: Callable[[], pd.DataFrame]) -> None:
+        """
+        Zapisuje zmiany w tabeli
+
+        Args:
+            table (str): Nazwa tabeli
+            upserts (list[dict]): Rekordy do dodania lub nadpisania (po kluczu tabeli)
+            deletes (list): Wartości klucza rekordów do usunięcia
+            snapshot (Callable[[], pd.DataFrame]): Zwraca całą tabelę po zmianach,
+                dla backendów, które nie potrafią zapisać pojedynczego wiersza
+        """
+        raise NotImplementedError
+
+    def submit(self, table: str, upserts: list[dict], deletes: list,
+               snapshot: Callable[[], pd.DataFrame]) -> Future:
+        """
+        Zleca zapis zmian i zwraca przyszły wynik, spełniany po ich utrwaleniu
+
+        Backendy, które nie grupują zapisów, zapisują od razu (jak `apply`)
+
+        Returns:
+            Future: Wynik zapisu (błąd zapisu jest wyjątkiem przyszłego wyniku)
+        """
+        self.apply(table, upserts, deletes, snapshot)
+        done = Future()
+        done.set_result(None)
+        return done
+
+    def replace(self, table: str, df: pd.DataFrame) -> None:
+        """Nadpisuje całą tabelę"""
+        raise NotImplementedError
+
+    def version(self, table: str):
+        """Zwraca znacznik, który zmienia się, gdy tabelę zmieni ktoś spoza serwera"""
+        raise NotImplementedError
+
+    def start(self) -> None:
+        """Uruchamia wątki pracujące w tle (o ile backend ich używa)"""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FileBackend(StorageBackend):
+    """
+    Backend plikowy: products.csv i customers.xlsx
+
+    Args:
+        database (str): Katalog z plikami bazy
+    """
+
+    def __init__(self, database: str):
+        self.paths = {
+            "products": os.path.join(database, "products.csv"),
+            "users": os.path.join(database, "customers.xlsx"),
+        }
+
+    def read(self, table):
+        if table == "users":
+            return read_users_file(self.paths[table])
+        return read_products_file(self.paths[table])
+
+    def write_temp(self, table: str, df: pd.DataFrame) -> str:
+        """Zapisuje tabelę do pliku tymczasowego obok pliku bazy i zwraca jego ścieżkę"""
+        root, ext = os.path.splitext(self.paths[table])
+        tmp_path = f"{root}.tmp{ext}"
+        write_file(tmp_path, df, index=False, is_excel=table == "users")
+        return tmp_path
+
+    def replace(self, table, df):
+        # Zapis do pliku tymczasowego i podmiana, żeby przerwany zapis nie uszkodził bazy
+        os.replace(self.write_temp(table, df), self.paths[table])
+
+    def apply(self, table, upserts, deletes, snapshot):
+        # Pliku CSV/XLSX nie da się zmienić w miejscu, więc zapisujemy go w całości
+        self.replace(table, snapshot())
+
+    def version(self, table):
+        try:
+            return os.stat(self.paths[table]).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Backend sqlite3 w trybie WAL z indeksami na id, login, name i category
+
+    Args:
+        path (str): Ścieżka do pliku bazy
+    """
+
+    own_writes_change_version = False  # data_version liczy tylko zapisy innych połączeń
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+        self.upgraded = self._upgrade_prices()
+
+    def _upgrade_prices(self) -> int:
+        # Bazy utworzone przed przejściem na grosze mają kolumnę price typu TEXT ("12 zł").
+        # sqlite nie zmienia typu kolumny, więc tabelę odtwarzamy w jednej transakcji
+        columns = {row[1]: row[2] for row in self._conn.execute("PRAGMA table_info(products)")}
+        if columns.get("price", "").upper() == "INTEGER":
+            return 0
+        df = normalize_products(pd.read_sql_query(
+            f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products ORDER BY rowid", self._conn
+        ), strict=True)
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.execute("DROP TABLE products")
+            for statement in SQLITE_SCHEMA.split(";"):
+                if "products" in statement:
+                    self._conn.execute(statement)
+            self._insert("products", df)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return len(df)
+
+    def _insert(self, table: str, df: pd.DataFrame) -> None:
+        df = df.astype(object).where(df.notna(), None)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(df.columns)}) VALUES ({', '.join('?' for _ in df.columns)})",
+            df.itertuples(index=False, name=None),
+        )
+
+    def read(self, table):
+        _, columns = TABLES[table]
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM {table} ORDER BY rowid", self._conn)
+        if table == "users":
+            df["admin"] = df["admin"].astype(bool)
+        else:
+            df = normalize_products(df)
+        return df
+
+    def apply(self, table, upserts, deletes, snapshot):
+        key, columns = TABLES[table]
+        with self._lock, self._conn:
+            if deletes:
+                self._conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", [(v,) for v in deletes])
+            if upserts:
+                placeholders = ", ".join("?" for _ in columns)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                    [tuple(r.get(c) for c in columns) for r in upserts],
+                )
+
+    def replace(self, table, df):
+        _, columns = TABLES[table]
+        df = df.loc[:, [c for c in columns if c in df.columns]]
+        if table == "products":
+            df = normalize_products(df)
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {table}")
+            self._insert(table, df)
+
+    def version(self, table):
+        # data_version zmienia się tylko po zapisach z innych połączeń
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def replay(df: pd.DataFrame, table: str, entries: list[dict]) -> pd.DataFrame:
+    """
+    Nakłada wpisy dziennika na tabelę
+
+    Wpisy są idempotentne (upsert i delete po kluczu), więc ponowne odtworzenie
+    już scalonych wpisów nie zmienia wyniku
+
+    Args:
+        df (pd.DataFrame): Tabela bazowa
+        table (str): Nazwa tabeli
+        entries (list[dict]): Wpisy dziennika w kolejności zapisu
+
+    Returns:
+        pd.DataFrame: Tabela po zmianach
+    """
+    entries = [e for e in entries if e["table"] == table]
+    if not entries:
+        return df
+    key, columns = TABLES[table]
+    df = df.loc[:, [c for c in columns if c in df.columns]]
+    rows = {str(r[key]): r for r in df.astype(object).where(df.notna(), None).to_dict(orient="records")}
+    for entry in entries:
+        for value in entry["deletes"]:
+            rows.pop(str(value), None)
+        for record in entry["upserts"]:
+            rows[str(record[key])] = record
+    df = pd.DataFrame(list(rows.values()), columns=columns)
+    return normalize_products(df) if table == "products" else df
+
+
+class JournaledBackend(StorageBackend):
+    """
+    Pliki CSV/XLSX z dziennikiem zmian (write-ahead journal)
+
+    Zmiana jest dopisywana do dziennika jako jedna linia JSON. Jeden wątek zapisujący zbiera
+    wszystkie oczekujące zmiany i utrwala je jednym fsync (group commit). `submit` tylko
+    kolejkuje wpis i zwraca przyszły wynik spełniany po fsync, więc wywołujący może czekać
+    na dysk już po zwolnieniu swoich blokad i kolejne zmiany dołączają do tej samej grupy. Wątek scalający w tle przepisuje dziennik do plików bazy.
+    Przy starcie dziennik jest odtwarzany na plikach bazy
+
+    Args:
+        inner (FileBackend): Backend plików bazy
+        path (str): Ścieżka do pliku dziennika
+        compact_interval (float): Co ile sekund scalać niepusty dziennik
+        compact_size (int): Rozmiar dziennika (w bajtach), po którym scalamy od razu
+    """
+
+    own_writes_change_version = False  # version() liczy tylko zmiany plików bazy z zewnątrz
+
+    def __init__(self, inner: FileBackend, path: str, compact_interval: float = 30,
+                 compact_size: int = 1 << 20):
+        self.inner = inner
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self.compact_interval = compact_interval
+        self.compact_size = compact_size
+
+        self._queue: Queue = Queue()
+        self._write_lock = Lock()      # plik dziennika
+        self._compact_lock = Lock()    # jedno scalanie naraz
+        self._version_lock = Lock()    # podmiana pliku bazy razem z zapamiętaniem jego wersji
+        self._start_lock = Lock()
+        self._compact_now = Event()
+        self._stopping = Event()
+        self._file = None
+        self._threads: list[Thread] = []
+
+        # Wersje plików bazy, które sami zapisaliśmy - inne mtime oznaczają zmianę z zewnątrz
+        self._known_mtime = {table: self.inner.version(table) for table in TABLES}
+        self._external = {table: 0 for table in TABLES}
+
+    def _entries(self) -> list[dict]:
+        entries = []
+        for path in (self.compacting_path, self.path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            break  # niedokończony zapis sprzed awarii
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def _truncate_torn_tail(self) -> None:
+        # Niedokończony wpis sprzed awarii ucinamy, żeby nowe wpisy zaczynały się od nowej linii
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end != len(data):
+                    f.truncate(end)
+        except FileNotFoundError:
+            pass
+
+    def start(self) -> None:
+        """
+        Uruchamia wątek zapisujący dziennik i wątek scalający
+
+        Serwer wywołuje ją przy starcie, żeby dziennik pozostały po awarii został scalony od razu,
+        a nie dopiero przy pierwszej zmianie; `submit` uruchamia wątki sam, jeśli jeszcze nie działają
+        """
+        with self._start_lock:
+            if self._threads:
+                return
+            self._truncate_torn_tail()
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._threads = [
+                Thread(target=self._writer, name="journal-writer", daemon=True),
+                Thread(target=self._compactor, name="journal-compactor", daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def _writer(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            stop = any(item is None for item in batch)
+            batch = [item for item in batch if item is not None]
+            if batch:
+                error = None
+                with self._write_lock:
+                    try:
+                        for line, _ in batch:
+                            self._file.write(line)
+                        self._file.flush()
+                        os.fsync(self._file.fileno())
+                        size = self._file.tell()
+                    except Exception as e:
+                        error = e
+                for _, done in batch:
+                    if error is None:
+                        done.set_result(None)
+                    else:
+                        done.set_exception(error)
+                if error is None and size >= self.compact_size:
+                    self._compact_now.set()
+            if stop:
+                return
+
+    def _compactor(self) -> None:
+        self._compact_now.set()  # najpierw scalamy to, co zostało z poprzedniego uruchomienia
+        while not self._stopping.is_set():
+            self._compact_now.wait(self.compact_interval)
+            self._compact_now.clear()
+            if self._stopping.is_set():
+                return
+            self.compact()
+
+    def compact(self) -> None:
+        """Scala dziennik z plikami bazy i usuwa scalone wpisy"""
+        with self._compact_lock:
+            with self._write_lock:
+                # Resztę po przerwanym scalaniu kończymy, zanim odłożymy kolejny dziennik
+                if not os.path.exists(self.compacting_path):
+                    if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                        return
+                    if self._file is not None:
+                        self._file.close()
+                    os.replace(self.path, self.compacting_path)
+                    if self._file is not None:
+                        self._file = open(self.path, "a", encoding="utf-8")
+
+            entries = []
+            with open(self.compacting_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+            for table in {e["table"] for e in entries}:
+                self._swap(table, replay(self.inner.read(table), table, entries))
+            os.remove(self.compacting_path)
+
+    def _swap(self, table: str, df: pd.DataFrame) -> None:
+        # Plik zapisujemy bez blokady, a podmieniamy go i zapamiętujemy jego wersję pod blokadą,
+        # którą bierze też version() - inaczej nasz własny zapis wyglądałby na zmianę z zewnątrz
+        tmp_path = self.inner.write_temp(table, df)
+        with self._version_lock:
+            os.replace(tmp_path, self.inner.paths[table])
+            self._known_mtime[table] = self.inner.version(table)
+
+    def read(self, table):
+        return replay(self.inner.read(table), table, self._entries())
+
+    def submit(self, table, upserts, deletes, snapshot):
+        self.start()
+        line = json.dumps({"table": table, "upserts": upserts, "deletes": deletes},
+                          ensure_ascii=False, default=str) + "\n"
+        done = Future()
+        self._queue.put((line, done))
+        return done  # spełniany po fsync grupy, w której znajdzie się nasz wpis
+
+    def apply(self, table, upserts, deletes, snapshot):
+        self.submit(table, upserts, deletes, snapshot).result()
+
+    def replace(self, table, df):
+        self.compact()
+        with self._compact_lock:
+            self._swap(table, df)
+
+    def version(self, table):
+        with self._version_lock:
+            mtime = self.inner.version(table)
+            if mtime != self._known_mtime[table]:
+                self._known_mtime[table] = mtime
+                self._external[table] += 1
+            return self._external[table]
+
+    def close(self):
+        if self._threads:
+            self._stopping.set()
+            self._compact_now.set()
+            self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+        self.compact()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def open_backend(database: str) -> StorageBackend:
+    """
+    Wybiera backend dla katalogu bazy
+
+    Jeśli w katalogu jest plik bazy sqlite (utworzony przez migrate.py), używamy go,
+    w przeciwnym razie pracujemy na plikach CSV/XLSX z dziennikiem zmian
+
+    Args:
+        database (str): Katalog z plikami bazy
+
+    Returns:
+        StorageBackend: Otwarty backend
+    """
+    db_path = os.path.join(database, SQLITE_FILENAME)
+    if os.path.exists(db_path):
+        return SqliteBackend(db_path)
+    return JournaledBackend(FileBackend(database), os.path.join(database, JOURNAL_FILENAME))
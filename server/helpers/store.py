@@ -0,0 +1,168 @@
+"""
+Wspólna logika tabel trzymanych w pamięci
+
+Tabela wczytuje dane z backendu raz, obsługuje odczyty z pamięci, zapisuje zmiany od razu
+(write-through) i wykrywa zmiany wprowadzone poza serwerem po znaczniku wersji backendu
+(mtime pliku albo data_version bazy sqlite)
+
+Każda tabela ma licznik `version`, rosnący przy każdej zmianie danych (także po ponownym
+wczytaniu), z którego korzystają m.in. nagłówki ETag
+
+Zmiana jest najpierw wprowadzana w pamięci (pod krótką blokadą odczytu), a dopiero potem
+utrwalana w backendzie pod osobną blokadą zapisu, więc odczyty nie czekają na dysk. Na samo
+utrwalenie (fsync dziennika) zmiana czeka już po zwolnieniu blokady zapisu, dzięki czemu
+równoczesne zmiany trafiają do jednej grupy zapisu
+"""
+
+
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Callable
+
+import pandas as pd
+
+from helpers.metrics import STORAGE_SECONDS, metrics
+from helpers.storage import StorageBackend, TABLES
+from helpers.workers import run_write, wait_durable
+
+
+def frame_to_records(df: pd.DataFrame) -> list[dict]:
+    """
+    Zamienia DataFrame na listę rekordów gotowych do serializacji JSON
+
+    Pomija kolumny indeksu zapisane przez pandas ("Unnamed: 0") i zamienia NaN na None
+
+    Args:
+        df (pd.DataFrame): Dane wczytane z pliku
+
+    Returns:
+        list[dict]: Lista rekordów
+    """
+    df = df.loc[:, [c for c in df.columns if not str(c).startswith("Unnamed")]]
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")
+
+
+class ResidentTable:
+    """
+    Bazowa klasa tabeli trzymanej w pamięci z zapisem write-through
+
+    Klasy pochodne ustawiają `table` i implementują `_index` oraz `_records`.
+    Zmiany wykonują pod `_writing()`: modyfikują pamięć pod `_lock`, wywołują `_bump`,
+    a następnie `_commit`
+
+    Args:
+        backend (StorageBackend): Backend przechowywania danych
+        check_interval (float): Jak często (w sekundach) sprawdzać wersję danych w backendzie
+    """
+
+    table: str = ""
+
+    def __init__(self, backend: StorageBackend, check_interval: float = 1.0):
+        self.backend = backend
+        self.check_interval = check_interval
+        self.key, self.columns = TABLES[self.table]
+
+        self._lock = RLock()
+        self._write_lock = Lock()
+        self._durable: list[Future] = []  # zapisy zlecone pod `_write_lock`, jeszcze nieutrwalone
+        self._committing = False
+        self._loaded = False
+        self._backend_version = None
+        self._last_check = 0.0
+
+        self.version = 0
+        self.modified_at = time.time()
+
+    def _index(self, records: list[dict]) -> None:
+        """Buduje struktury w pamięci z wczytanych rekordów"""
+        raise NotImplementedError
+
+    def _records(self) -> list[dict]:
+        """Zwraca wszystkie rekordy w kolejności zapisu"""
+        raise NotImplementedError
+
+    def load(self) -> None:
+        """Wczytuje (lub ponownie wczytuje) tabelę z backendu"""
+        with self._lock:
+            with metrics.timer(STORAGE_SECONDS, "read", self.table):
+                frame = self.backend.read(self.table)
+            self._index(frame_to_records(frame))
+            self._backend_version = self.backend.version(self.table)
+            self._last_check = time.monotonic()
+            self._loaded = True
+            self._bump()
+
+    def _refresh(self) -> None:
+        # Dane czytamy tylko przy pierwszym użyciu albo gdy ktoś zmienił je poza serwerem
+        if not self._loaded:
+            self.load()
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval or self._committing:
+            return  # w trakcie zapisu backend jest jeszcze za pamięcią - nie przeładowujemy
+        self._last_check = now
+        if self.backend.version(self.table) != self._backend_version:
+            self.load()
+
+    def _frame(self) -> pd.DataFrame:
+        with self._lock:
+            return pd.DataFrame(self._records(), columns=self.columns)
+
+    @contextmanager
+    def _writing(self):
+        """Blokada zapisu; na utrwalenie zleconych w niej zmian czekamy dopiero po jej zwolnieniu"""
+        with self._write_lock:
+            try:
+                yield
+            finally:
+                durable, self._durable = self._durable, []
+        wait_durable(durable)
+
+    def _commit(self, upserts: list[dict] | None = None, deletes: list | None = None,
+                rollback: Callable[[], None] | None = None) -> None:
+        """
+        Zleca utrwalenie w backendzie zmiany, która jest już w pamięci (wywoływać w `_writing()`)
+
+        Args:
+            upserts (list[dict] | None): Dodane lub zmienione rekordy
+            deletes (list | None): Klucze usuniętych rekordów
+            rollback (Callable[[], None] | None): Cofa zmianę w pamięci, jeśli zapis się nie uda
+        """
+        def undo():
+            with self._lock:
+                if rollback is not None:
+                    rollback()
+                self._bump()
+
+        def done(future: Future):
+            if metrics.enabled:
+                STORAGE_SECONDS.observe(time.perf_counter() - started, "write", self.table)
+            if future.exception() is not None:
+                undo()
+
+        started = time.perf_counter()
+        self._committing = True
+        try:
+            durable = self.backend.submit(self.table, upserts or [], deletes or [], snapshot=self._frame)
+        except Exception:
+            undo()
+            raise
+        finally:
+            with self._lock:
+                if self.backend.own_writes_change_version:
+                    # Nasz zapis zmienił wersję backendu - nie jest to zmiana z zewnątrz
+                    self._backend_version = self.backend.version(self.table)
+                self._committing = False
+        durable.add_done_callback(done)
+        self._durable.append(durable)
+
+    def _bump(self) -> None:
+        self.version += 1
+        self.modified_at = time.time()
+
+    async def aload(self) -> None:
+        """Asynchroniczna wersja `load`"""
+        await run_write(self.load)
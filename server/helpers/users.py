@@ -0,0 +1,152 @@
+"""
+Katalog użytkowników trzymany w pamięci
+
+Zamiast parsować customers.xlsx przy każdym logowaniu i sprawdzaniu uprawnień,
+użytkownicy są trzymani w słowniku login -> rekord, z indeksem po ID i zbiorem administratorów
+"""
+
+
+from helpers.ids import IdAllocator
+from helpers.store import ResidentTable
+from helpers.workers import run_read, run_write
+
+
+class UserDirectory(ResidentTable):
+    """
+    Użytkownicy trzymani w pamięci, indeksowani po loginie i ID
+
+    Args:
+        backend (StorageBackend): Backend przechowywania danych
+        ids (IdAllocator | None): Trwałe liczniki ID (domyślnie licznik tylko w pamięci)
+    """
+
+    table = "users"
+
+    def __init__(self, backend, ids: IdAllocator | None = None, **kwargs):
+        super().__init__(backend, **kwargs)
+        self.ids = ids if ids is not None else IdAllocator()
+
+    def _index(self, records: list[dict]) -> None:
+        self._rows: dict[str, dict] = {}
+        self._by_id: dict[int, str] = {}
+        self._admins: set[str] = set()
+        for r in records:
+            self._insert(r)
+
+    def _insert(self, record: dict) -> None:
+        login = str(record['login'])
+        self._rows[login] = record
+        self._by_id[int(record['id'])] = login
+        if bool(record.get('admin')):
+            self._admins.add(login)
+
+    def _delete(self, login: str) -> dict:
+        record = self._rows.pop(login)
+        self._by_id.pop(int(record['id']), None)
+        self._admins.discard(login)
+        return record
+
+    def _records(self) -> list[dict]:
+        return list(self._rows.values())
+
+    def all(self) -> list[dict]:
+        """Zwraca wszystkich użytkowników"""
+        with self._lock:
+            self._refresh()
+            return list(self._rows.values())
+
+    def get(self, login: str) -> dict | None:
+        """Zwraca użytkownika o podanym loginie albo None"""
+        with self._lock:
+            self._refresh()
+            return self._rows.get(login)
+
+    def get_by_id(self, user_id: int) -> dict | None:
+        """Zwraca użytkownika o podanym ID albo None"""
+        with self._lock:
+            self._refresh()
+            login = self._by_id.get(user_id)
+            return self._rows.get(login) if login is not None else None
+
+    def has_id(self, user_id: int) -> bool:
+        """Sprawdza, czy ID jest już zajęte"""
+        with self._lock:
+            self._refresh()
+            return user_id in self._by_id
+
+    def is_admin(self, login: str) -> bool:
+        """Sprawdza, czy użytkownik ma uprawnienia administratora"""
+        with self._lock:
+            self._refresh()
+            return login in self._admins
+
+    def add(self, user: dict) -> dict:
+        """
+        Dodaje użytkownika i zapisuje zmiany na dysk
+
+        Args:
+            user (dict): Dane użytkownika; bez ID nadawany jest nowy numer klienta
+
+        Returns:
+            dict: Dodany rekord
+
+        Raises:
+            ValueError: Jeśli login lub ID jest już zajęty
+        """
+        with self._writing():
+            with self._lock:
+                self._refresh()
+                record = {k: user.get(k) for k in self.columns}
+                if record['id'] is None:
+                    record['id'] = self.ids.customer_id(taken=self._by_id.__contains__)
+                if str(record['login']) in self._rows or int(record['id']) in self._by_id:
+                    raise ValueError("Użytkownik o podanym loginie lub ID już istnieje")
+                self._insert(record)
+                self._bump()
+
+            self._commit(upserts=[record], rollback=lambda: self._delete(str(record['login'])))
+            return record
+
+    def remove(self, login: str) -> bool:
+        """
+        Usuwa użytkownika o podanym loginie
+
+        Returns:
+            bool: False, jeśli użytkownika nie było
+        """
+        with self._writing():
+            with self._lock:
+                self._refresh()
+                if login not in self._rows:
+                    return False
+                record = self._delete(login)
+                self._bump()
+
+            self._commit(deletes=[login], rollback=lambda: self._insert(record))
+            return True
+
+    # Wersje asynchroniczne: odczyty na puli odczytu, zmiany na wątku zapisującym
+
+    async def aall(self) -> list[dict]:
+        """Asynchroniczna wersja `all`"""
+        return await run_read(self.all)
+
+    async def aget(self, login: str) -> dict | None:
+        """Asynchroniczna wersja `get`"""
+        return await run_read(self.get, login)
+
+    async def ahas_id(self, user_id: int) -> bool:
+        """Asynchroniczna wersja `has_id`"""
+        return await run_read(self.has_id, user_id)
+
+    async def ais_admin(self, login: str) -> bool:
+        """Asynchroniczna wersja `is_admin`"""
+        return await run_read(self.is_admin, login)
+
+    async def aadd(self, user: dict) -> dict:
+        """Asynchroniczna wersja `add`"""
+        return await run_write(self.add, user)
+
+    async def aremove(self, login: str) -> bool:
+        """Asynchroniczna wersja `remove`"""
+        return await run_write(self.remove, login)
@@ -0,0 +1,85 @@
+"""
+Pule wątków dla blokujących operacji na danych
+
+Odczyty działają na ograniczonej puli wątków, a wszystkie zmiany na jednym dedykowanym
+wątku zapisującym, dzięki czemu wykonują się w kolejności zlecenia i nie blokują pętli zdarzeń
+
+Zmiana, która czeka na utrwalenie (np. fsync dziennika), nie zajmuje wątku zapisującego:
+tabela przekazuje przyszły wynik zapisu do wait_durable, a run_write czeka na niego już
+w pętli zdarzeń, więc kolejne zmiany trafiają do tej samej grupy zapisu (group commit)
+
+Przy włączonych metrykach mierzony jest osobno czas oczekiwania zadania w kolejce puli
+i czas jego wykonania
+"""
+
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+
+from helpers.metrics import WORKER_SECONDS, metrics
+
+READ_WORKERS = int(os.environ.get("READ_WORKERS", min(8, (os.cpu_count() or 1) + 4)))
+
+_read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="data-read")
+_write_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="data-write")
+_deferred = threading.local()  # zapisy, na które czeka run_write (tylko na wątku zapisującym)
+
+
+def _timed(pool: str, queued: float, call):
+    started = time.perf_counter()
+    WORKER_SECONDS.observe(started - queued, pool, "wait")
+    try:
+        return call()
+    finally:
+        WORKER_SECONDS.observe(time.perf_counter() - started, pool, "run")
+
+
+async def _run(executor: ThreadPoolExecutor, pool: str, call):
+    if metrics.enabled:
+        call = partial(_timed, pool, time.perf_counter(), call)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def run_read(fn, *args, **kwargs):
+    """Wykonuje blokujący odczyt na puli wątków odczytu"""
+    return await _run(_read_pool, "read", partial(fn, *args, **kwargs))
+
+
+def wait_durable(futures: list[Future]) -> None:
+    """
+    Czeka na utrwalenie zmian (wywoływać po zwolnieniu blokad)
+
+    Na wątku zapisującym nie blokuje - oczekiwanie przejmuje run_write w pętli zdarzeń
+
+    Args:
+        futures (list[Future]): Przyszłe wyniki zapisów w backendzie
+
+    Raises:
+        Exception: Błąd zapisu, jeśli któryś się nie powiódł
+    """
+    pending = getattr(_deferred, "futures", None)
+    if pending is not None:
+        pending.extend(futures)
+        return
+    for future in futures:
+        future.result()
+
+
+def _deferring(call):
+    _deferred.futures = []
+    try:
+        return call(), _deferred.futures
+    finally:
+        _deferred.futures = None
+
+
+async def run_write(fn, *args, **kwargs):
+    """Wykonuje blokującą zmianę na wątku zapisującym (zmiany wykonują się po kolei) i czeka na jej utrwalenie"""
+    result, durable = await _run(_write_pool, "write", partial(_deferring, partial(fn, *args, **kwargs)))
+    for future in durable:
+        await asyncio.wrap_future(future)
+    return result
@@ -7,26 +7,55 @@ Serwer korzysta z FastAPI do obsługi ządań HTTP i Pandas do zarządzania dany
 
 
 import os
-import pandas as pd
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from random import randint
+from fastapi import FastAPI, Query, Request, WebSocket
+from fastapi.responses import Response, StreamingResponse
+from email.utils import formatdate, parsedate_to_datetime
+from pydantic import BaseModel, ValidationError, field_validator
+from contextlib import asynccontextmanager
+from helpers.broadcast import CatalogBroadcaster
+from helpers.catalog import ProductCatalog
+from helpers.users import UserDirectory
+from helpers.carts import CartStore
+from helpers.ids import IdAllocator
+from helpers.inventory import InventoryLedger, Reservation
+from helpers.metrics import SERIALIZE_SECONDS, MetricsMiddleware, TimedJSONResponse as JSONResponse, metrics
+from helpers.responses import ResponseCache, accepts_gzip, encode_json, ndjson_chunks
+from helpers.storage import open_backend
+from helpers.sessions import SessionStore
+from helpers.bulk import BULK_CHUNK, iter_chunks, iter_rows
+from helpers.prices import order_total, parse_price
+from helpers.workers import run_read, run_write
 
 database = os.path.join(os.getcwd(), "DATABASE")
-products_file = os.path.join(database, "products.csv")
-users_file = os.path.join(database, "customers.xlsx")
 
-current_sessions = {}  # Proste zabiezpieczeństw
+SESSION_TTL = float(os.environ.get("SESSION_TTL", 30 * 60))  # sekundy bezczynności
+SESSION_MAX = int(os.environ.get("SESSION_MAX", 10000))
+MAX_PAGE_SIZE = 1000
+
+current_sessions = SessionStore(ttl=SESSION_TTL, max_size=SESSION_MAX)  # Proste zabiezpieczeństw
+metrics.gauge("sessions_active", "Liczba otwartych sesji", read=lambda: len(current_sessions))
 
 
 class Product(BaseModel):
     name: str
-    price: str
+    price: int  # grosze
     quantity: int
     description: str
     category: str
 
+    @field_validator("price", mode="before")
+    @classmethod
+    def parse_legacy_price(cls, value):
+        # Grosze (int) albo kwota z jednostką ("5.99 zł"); liczbę zmiennoprzecinkową odrzucamy (422)
+        return parse_price(value)
+
+class BulkDelete(BaseModel):
+    ids: list[int] = []
+    names: list[str] = []
+
+class CartItems(BaseModel):
+    items: dict[int, int] = {}  # ID produktu -> liczba sztuk
+
 class User(BaseModel):
     login: str
     password: str  # fernet encrypted
@@ -35,62 +64,232 @@ class User(BaseModel):
     age: str | None = None
     token: str
 
-app = FastAPI()
-
-def read_products_file(filepath):
-    try:
-        return pd.read_csv(filepath)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=['id', 'name', 'price', 'quantity', 'description', 'category'])
-        df.to_csv(filepath, index=False)
-        return df
-
-def read_users_file(filepath):
-    try:
-        return pd.read_excel(filepath)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=['id', 'name', 'surname', 'age', 'login', 'password', 'admin'])
-        df.to_excel(filepath, index=False)
-        return df
-
-def write_file(filepath, df: pd.DataFrame, index=True, is_excel=False):
-    df = df.drop_duplicates()
-    if is_excel:
-        df.to_excel(filepath, index=index)
-    else:
-        df.to_csv(filepath, index=index)
+backend = open_backend(database)  # sqlite, jeśli baza została zmigrowana (migrate.py), inaczej CSV/XLSX z dziennikiem
+ids = IdAllocator(os.path.join(database, "ids.json"))
+catalog = ProductCatalog(backend, ids=ids)
+users_directory = UserDirectory(backend, ids=ids)
+carts = CartStore(database)
+
+def encode_catalog(content) -> bytes:
+    with metrics.timer(SERIALIZE_SECONDS, "/products"):
+        return encode_json(content)
+
+catalog_responses = ResponseCache(encode=encode_catalog)  # zakodowane odpowiedzi GET /products
+broadcaster = CatalogBroadcaster(catalog)  # zmiany katalogu dla klientów /ws/catalog
+metrics.gauge("ws_catalog_subscribers", "Liczba klientów połączonych z /ws/catalog", read=lambda: len(broadcaster))
+inventory = InventoryLedger(catalog)  # rezerwacje i sprzedaż sztuk (zapisywane w katalogu zbiorczo)
+metrics.gauge("inventory_reservations", "Liczba aktywnych rezerwacji", read=lambda: len(inventory))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Katalog i użytkowników wczytujemy raz przy starcie, później czytamy ich z pamięci
+    await catalog.aload()
+    await users_directory.aload()
+    backend.start()  # scalanie dziennika pozostałego po awarii rusza od razu, nie przy pierwszym zapisie
+    current_sessions.start_sweeper()
+    broadcaster.start()
+    inventory.start()
+    yield
+    await inventory.stop()  # zapisuje sprzedaż, która jeszcze nie trafiła do katalogu
+    await broadcaster.stop()
+    await current_sessions.stop_sweeper()
+    await run_write(backend.close)  # utrwala i scala dziennik zmian
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 def check_token(performer_token: str, requiresAdmin: bool = False) -> bool:
-    if performer_token not in current_sessions.values():
+    session = current_sessions.get(performer_token)
+    if session is None:
         return False
 
-    if requiresAdmin:
-        users = read_users_file(users_file)
-        login = next((k for k, v in current_sessions.items() if v == performer_token), None)
-        user = users[users["login"] == login]
-
-        if user.empty or not bool(user.iloc[0]["admin"]):
-            return False
+    if requiresAdmin and not session.is_admin:
+        return False
 
     return True
 
+async def session_user(performer_token: str) -> dict | None:
+    """Zwraca rekord zalogowanego użytkownika dla tokenu albo None"""
+    session = current_sessions.get(performer_token)
+    if session is None:
+        return None
+    return await users_directory.aget(session.login)
+
+def catalog_headers(validators: tuple[str, float] | None = None) -> dict[str, str]:
+    """
+    Nagłówki walidacji odpowiedzi katalogu (ETag i Last-Modified)
+
+    Args:
+        validators (tuple[str, float] | None): ETag i czas zmiany wersji, z której pochodzi
+            treść odpowiedzi (z `catalog.snapshot`); bez nich - bieżąca wersja katalogu
+    """
+    etag, modified_at = validators if validators is not None else catalog.validators()
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(modified_at, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+def not_modified(request: Request, headers: dict[str, str]) -> Response | None:
+    """
+    Zwraca odpowiedź 304, jeśli klient ma aktualną wersję katalogu
+
+    Args:
+        request (Request): Żądanie z nagłówkami If-None-Match / If-Modified-Since
+        headers (dict[str, str]): Nagłówki z catalog_headers()
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if headers["ETag"] in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return None
+        if catalog.modified_at <= since:  # bez zaokrąglania - w razie wątpliwości wysyłamy całość
+            return Response(status_code=304, headers=headers)
+    return None
+
+@app.get("/metrics")
+async def get_metrics():
+    if not metrics.enabled:
+        return JSONResponse(content={"error": "Metryki są wyłączone (METRICS=0)"}, status_code=404)
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/products")
-async def get_products():
+async def get_products(
+    request: Request,
+    cursor: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    category: str | None = None,
+    min_price: int | None = Query(None, ge=0),
+    max_price: int | None = Query(None, ge=0),
+    sort: str = "id",
+):
+    """
+    Zwraca produkty z katalogu
+
+    Bez parametru `limit` zwraca cały katalog. Z `limit` zwraca jedną stronę wyników
+    oraz `next_cursor` (do przekazania jako `cursor` po następną stronę) i `total`
+
+    Odpowiedź jest kodowana raz na wersję katalogu i wysyłana skompresowana, jeśli klient
+    przyjmuje gzip. Z nagłówkiem Accept: application/x-ndjson produkty są wysyłane
+    strumieniowo, po jednym w linii (liczba wszystkich wyników w nagłówku X-Total-Count)
+
+    Args:
+        cursor (int): Początek strony
+        limit (int | None): Rozmiar strony
+        category (str | None): Filtr kategorii
+        min_price (int | None): Minimalna cena w groszach
+        max_price (int | None): Maksymalna cena w groszach
+        sort (str): id, name, price lub quantity, z "-" dla sortowania malejącego
+    """
     try:
-        products = read_products_file(products_file)
-        return JSONResponse(content={"products": products.to_dict(orient="records")})
+        current = catalog.validators()
+        headers = catalog_headers(current)
+        cached = not_modified(request, headers)
+        if cached is not None:
+            return cached
+
+        headers["Vary"] = "Accept, Accept-Encoding"
+        args = (category, min_price, max_price, sort, cursor, limit)
+
+        if "application/x-ndjson" in request.headers.get("accept", ""):
+            try:
+                validators, (products, _, total) = await run_read(catalog.snapshot, lambda: catalog.query(*args))
+            except ValueError as e:
+                return JSONResponse(content={"error": str(e)}, status_code=400)
+            headers.update(catalog_headers(validators))  # wersja, z której pochodzą produkty
+            # Porcje są kodowane dopiero przy wysyłaniu (w puli wątków Starlette)
+            return StreamingResponse(ndjson_chunks(products), media_type="application/x-ndjson",
+                                     headers={**headers, "X-Total-Count": str(total)})
+
+        def build():
+            validators, (products, next_cursor, total) = catalog.snapshot(lambda: catalog.query(*args))
+            content = {"products": products}
+            if limit is not None:
+                content.update(next_cursor=next_cursor, total=total)
+            return validators, content
+
+        def encoded() -> tuple[tuple[str, float], bytes, bool]:
+            validators, entry = catalog_responses.get(current, args, build)
+            compressed = entry.gzip() if accepts_gzip(request.headers.get("accept-encoding")) else None
+            return (validators, compressed, True) if compressed is not None else (validators, entry.body, False)
+
+        try:
+            validators, body, compressed = await run_read(encoded)
+        except ValueError as e:
+            return JSONResponse(content={"error": str(e)}, status_code=400)
+        headers.update(catalog_headers(validators))  # ETag wersji, z której zbudowano treść
+        if compressed:
+            headers["Content-Encoding"] = "gzip"
+        return Response(content=body, media_type="application/json", headers=headers)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.get("/products/changes")
+async def product_changes(since: int | None = Query(None, ge=0), epoch: str | None = None):
+    """
+    Zwraca zmiany katalogu od wersji znanej klientowi
+
+    Args:
+        since (int | None): Wersja z poprzedniej odpowiedzi (bez niej - cały katalog)
+        epoch (str | None): Epoka z poprzedniej odpowiedzi (inna po restarcie serwera)
+
+    Returns:
+        Zmienione produkty ("upserts") i ID usuniętych ("deletes") albo cały katalog
+        ("snapshot": true, "products"), jeśli klient został za daleko w tyle
+    """
+    try:
+        return JSONResponse(content=await catalog.achanges(since, epoch))
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.websocket("/ws/catalog")
+async def catalog_events(websocket: WebSocket):
+    """
+    Strumień zmian katalogu (zdarzenia JSON opisane w helpers.broadcast)
+
+    Po połączeniu klient dostaje "hello" z bieżącą wersją, a następnie zdarzenia "changes"
+    ze zmienionymi produktami i ID usuniętych. "resync" oznacza, że klient nie nadążał
+    (albo katalog wczytano ponownie) i powinien pobrać zmiany przez GET /products/changes
+    """
+    await broadcaster.serve(websocket)
+
+@app.get("/products/search")
+async def search_products(q: str, limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    Wyszukuje produkty po nazwie, opisie i kategorii
+
+    Dopasowuje całe słowa i ich początki, bez względu na wielkość liter i polskie znaki
+    ("zolc" znajdzie "Żółć"). Wyniki są uszeregowane od najlepiej dopasowanych
+
+    Args:
+        q (str): Zapytanie
+        limit (int): Maksymalna liczba wyników
+    """
+    try:
+        return JSONResponse(content={"products": await catalog.asearch(q, limit)})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 @app.get("/products/{product_id}")
-async def get_product(product_id: int):
+async def get_product(request: Request, product_id: int):
     try:
-        products = read_products_file(products_file)
+        headers = catalog_headers()
+        cached = not_modified(request, headers)
+        if cached is not None:
+            return cached
 
-        product = products[products['id'] == product_id]
-        if product.empty:
+        product = await catalog.aget(product_id)
+        if product is None:
             return JSONResponse(content={"error": "Product not found"}, status_code=404)
-        return JSONResponse(content={k: str(v) for k, v in product.to_dict(orient="records")[0].items()})
+        return JSONResponse(content=product, headers=headers)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -99,19 +298,8 @@ async def add_product(product: Product, performer_token: str):
     try:
         if not check_token(performer_token, requiresAdmin=True):
             return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
-        products = read_products_file(products_file)
-        new_id = (products['id'].max() + 1) if not products.empty else 1
-        new_product = pd.DataFrame([{
-            'id': new_id,
-            'name': product.name,
-            'price': product.price,
-            'quantity': product.quantity,
-            'description': product.description,
-            'category': product.category
-        }])
-        products = pd.concat([products, new_product], ignore_index=True)
-        write_file(products_file, products)
-        return JSONResponse(content={"message": "Product added successfully"})
+        record = await catalog.aadd(product.model_dump())
+        return JSONResponse(content={"message": "Product added successfully", "product": record})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -120,30 +308,115 @@ async def remove_product(product_id: int | str, performer_token: str):
     try:
         if not check_token(performer_token, requiresAdmin=True):
             return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
-        
-        products = read_products_file(products_file)
+
+        # Ścieżka zawsze przychodzi jako tekst, więc pydantic dopasowuje ją do str - ID rozpoznajemy sami
+        if isinstance(product_id, str) and product_id.isdigit():
+            product_id = int(product_id)
 
         # https://stackoverflow.com/questions/3501382/checking-whether-a-variable-is-an-integer-or-not
         if isinstance(product_id, int):
-            if products[products['id'] == product_id].empty:
-                return JSONResponse(content={"message": "Nie znaleziono produktu"}, status_code=404)
-            products = products[products['id'] != product_id]
+            removed = await catalog.aremove(product_id)
         else:
-            if products[products['name'] == product_id].empty:
-                return JSONResponse(content={"message": "Nie znaleziono produktu"}, status_code=404)
-            products = products[products['name'] != product_id]
+            removed = await catalog.aremove_by_name(product_id)
 
-        write_file(users_file, products)
+        if not removed:
+            return JSONResponse(content={"message": "Nie znaleziono produktu"}, status_code=404)
 
         return JSONResponse(content={"message": "Product removed successfully"}, status_code=200)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+def validate_products(rows: list[tuple[int, dict | None, str | None]]) -> tuple[list[dict], list[dict]]:
+    """
+    Sprawdza wiersze importu modelem Product
+
+    Args:
+        rows (list[tuple[int, dict | None, str | None]]): Porcja wierszy z iter_rows
+
+    Returns:
+        tuple[list[dict], list[dict]]: Poprawne produkty oraz błędy w postaci {"row": ..., "error": ...}
+    """
+    valid = []
+    errors = []
+    for row, data, error in rows:
+        if error is None:
+            try:
+                valid.append(Product.model_validate(data).model_dump())
+                continue
+            except ValidationError as e:
+                error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        errors.append({"row": row, "error": error})
+    return valid, errors
+
+@app.post("/products/bulk")
+async def add_products_bulk(request: Request, performer_token: str, atomic: bool = False):
+    """
+    Masowy import produktów ze strumienia CSV (text/csv) lub NDJSON (application/x-ndjson)
+
+    Wiersze są sprawdzane modelem Product i zapisywane porcjami po BULK_CHUNK - każda porcja
+    jedną operacją, z kolejnymi ID w obrębie porcji. Błędy są zwracane dla każdego wiersza osobno
+
+    W trybie atomic poprawne wiersze czekają na sprawdzenie całego importu i są zapisywane
+    razem (albo wcale), więc tylko w tym trybie pamięć rośnie z liczbą wierszy
+
+    Args:
+        performer_token (str): Token administratora
+        atomic (bool): Jeśli True, żaden wiersz nie zostanie zapisany, gdy którykolwiek ma błąd
+    """
+    try:
+        if not check_token(performer_token, requiresAdmin=True):
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        rows = iter_rows(request.stream(), request.headers.get("content-type", ""))
+        pending = []  # tryb atomic: poprawne wiersze czekają na koniec importu
+        errors = []
+        added, first_id, last_id = 0, None, None
+        async for chunk in iter_chunks(rows, BULK_CHUNK):
+            valid, chunk_errors = await run_read(validate_products, chunk)
+            errors.extend(chunk_errors)
+            if atomic:
+                if not errors:  # po pierwszym błędzie tylko zbieramy kolejne błędy
+                    pending.extend(valid)
+                continue
+            records = await catalog.aadd_many(valid)
+            if records:
+                added += len(records)
+                first_id = records[0]["id"] if first_id is None else first_id
+                last_id = records[-1]["id"]
+
+        if atomic:
+            if errors:
+                return JSONResponse(content={"added": 0, "errors": errors}, status_code=400)
+            records = await catalog.aadd_many(pending)
+            added = len(records)
+            first_id, last_id = (records[0]["id"], records[-1]["id"]) if records else (None, None)
+
+        return JSONResponse(content={"added": added, "first_id": first_id, "last_id": last_id, "errors": errors})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.post("/products/bulk_delete")
+async def remove_products_bulk(request: BulkDelete, performer_token: str):
+    """
+    Masowe usuwanie produktów po liście ID i/lub nazw, zapisywane jedną operacją
+
+    Args:
+        request (BulkDelete): Listy `ids` i `names` produktów do usunięcia
+        performer_token (str): Token administratora
+    """
+    try:
+        if not check_token(performer_token, requiresAdmin=True):
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        removed, not_found = await catalog.aremove_many(ids=request.ids, names=request.names)
+        return JSONResponse(content={"removed": len(removed), "ids": removed, "not_found": not_found})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
 @app.get("/users")
 async def list_users():
     try:
-        users = read_users_file(users_file)
-        return JSONResponse(content={"users": users.to_dict(orient="records")})
+        return JSONResponse(content={"users": await users_directory.aall()})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
@@ -152,33 +425,20 @@ async def register(user: User):
     try:
         if user.login in current_sessions:
             return JSONResponse(content={"error": "Użytkownik o podanym loginie jest już zalogowany"}, status_code=400)
-        
-        users = read_users_file(users_file)
 
-        if not users[users["login"] == user.login].empty:
+        if await users_directory.aget(user.login) is not None:
             return JSONResponse(content={"error": "Użytkownik o podanym login już istnieje w BD"}, status_code=400)
 
-        rid = 1
-        ids= users["id"].to_list()
-        while True:
-            c = randint(1, 9999)
-            if c not in ids:
-                rid = c
-                break
-
-        new_user = pd.DataFrame([{
-            'id': rid,
+        new_user = await users_directory.aadd({  # numer klienta nadaje IdAllocator
             'name': user.name,
             'surname': user.surname,
             'age': user.age,
             'login': user.login,
             'password': user.password,
             'admin': False
-        }])
-        users = pd.concat([users, new_user], ignore_index=True)
-        write_file(users_file, users, is_excel=True)
-        user_id = new_user["id"].iloc[0]
-        open(os.path.join(database, f"{user_id}.txt"), "w").close()
+        })
+        user_id = new_user["id"]
+        await carts.acreate(user_id)  # pusty plik DATABASE/<id>.txt na koszyk klienta
         return JSONResponse(content={"message": "Pomyślnie zarejestrowano użytkownika"})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
@@ -186,28 +446,26 @@ async def register(user: User):
 @app.post("/login")
 async def login(user: User):
     try:
-        users = read_users_file(users_file)
-        target = users[users["login"] == user.login]
+        target = await users_directory.aget(user.login)
 
-        if target.empty:
+        if target is None:
             return JSONResponse(content={"error": "Nie udało się znaleźć użytkownika"}, status_code=400)
-        
-        if target.shape[0] > 1:
-            return JSONResponse(content={"error": "W bazie znajduje się więcej niż 1 użytkownik o podanym loginie"})
 
-        stored_password = str(target.iloc[0]["password"])
+        stored_password = str(target["password"])
         
         if stored_password != user.password:
             return JSONResponse(content={"error": f"Błędne hasło ({stored_password} {type(stored_password)}!={user.password} {type(user.password)})"}, status_code=401)
     
-        current_sessions[user.login] = user.token
+        is_admin = await users_directory.ais_admin(user.login)
+        current_sessions.open(user.login, user.token, is_admin=is_admin)
         return JSONResponse(content={
             "message": "Pomyślnie zalogowano", 
-            "login": str(target.iloc[0]["login"]),
-            "name": str(target.iloc[0]["name"]),
-            "surname": str(target.iloc[0]["surname"]),
-            "age": str(target.iloc[0]["age"]),
+            "login": str(target["login"]),
+            "name": str(target["name"]),
+            "surname": str(target["surname"]),
+            "age": str(target["age"]),
             "token": str(user.token),
+            "is_admin": is_admin,
         })
         
     except Exception as e:
@@ -217,8 +475,7 @@ async def login(user: User):
 async def logout(login: str, performer_token: str):
     if not check_token(performer_token):
         return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
-    if login in current_sessions:
-        del current_sessions[login]
+    if current_sessions.close(login):
         return JSONResponse(content={"message": "Pomyślnie wylogowano"}, status_code=200)
     return JSONResponse(content={"error": "Użytkownik nie jest zalogowany"}, status_code=400)
 
@@ -228,16 +485,182 @@ async def remuser(login: str, performer_token: str):
         if not check_token(performer_token, requiresAdmin=True):
             return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
 
-        users = read_users_file(users_file)
-        if users[users["login"] == login].empty:
+        target = await users_directory.aget(login)
+        if target is None or not await users_directory.aremove(login):
             return JSONResponse(content={"error": "Użytkownik o podanym loginie nie istnieje"}, status_code=404)
+        current_sessions.close(login)
+        await carts.adelete(int(target["id"]))
 
-        users = users[users["login"] != login]
-        write_file(users_file, users, is_excel=True)
         return JSONResponse(content={"message": "Pomyślnie usunięto użytkownika"})
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+@app.get("/cart")
+async def get_cart(performer_token: str):
+    """
+    Zwraca zapisany koszyk zalogowanego klienta razem z danymi produktów
+
+    Produkty, których nie ma już w katalogu, są pomijane i zwracane w `missing`
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        items = []
+        missing = []
+        for product_id, quantity in (await carts.aget(int(user["id"]))).items():
+            product = await catalog.aget(product_id)
+            if product is None:
+                missing.append(product_id)
+            else:
+                items.append({"product": product, "quantity": quantity})
+        return JSONResponse(content={"items": items, "missing": missing})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.put("/cart")
+async def put_cart(cart: CartItems, performer_token: str):
+    """
+    Zastępuje zapisany koszyk zalogowanego klienta
+
+    Args:
+        cart (CartItems): Cały koszyk {ID produktu: liczba sztuk}
+        performer_token (str): Token klienta
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        saved = await carts.aput(int(user["id"]), cart.items)
+        return JSONResponse(content={"items": {str(k): v for k, v in saved.items()}})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+def order_summary(reservation: Reservation) -> dict:
+    """Treść odpowiedzi o złożonym zamówieniu (ceny z chwili rezerwacji)"""
+    products = [reservation.products[product_id] for product_id in reservation.items]
+    quantities = list(reservation.items.values())
+    return {
+        "message": "Zamówienie zostało złożone",
+        "items": [{"id": record["id"], "name": record["name"], "price": record["price"], "quantity": quantity}
+                  for record, quantity in zip(products, quantities)],
+        "total": order_total([record["price"] for record in products], quantities),
+    }
+
+async def order_items(user_id: int, order: CartItems | None) -> dict[int, int]:
+    """Zamawiane pozycje: podane w żądaniu albo zapisany koszyk użytkownika"""
+    return order.items if order is not None and order.items else await carts.aget(user_id)
+
+@app.post("/order")
+async def place_order(performer_token: str, order: CartItems | None = None):
+    """
+    Składa zamówienie: rezerwuje i od razu sprzedaje wszystkie pozycje, a potem opróżnia koszyk
+
+    Jeśli którejkolwiek pozycji brakuje, stan nie jest zmieniany, a odpowiedź 409 zawiera braki
+
+    Args:
+        performer_token (str): Token klienta
+        order (CartItems | None): Zamawiane pozycje, domyślnie zapisany koszyk klienta
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        user_id = int(user["id"])
+        items = await order_items(user_id, order)
+        if not items:
+            return JSONResponse(content={"error": "Koszyk jest pusty"}, status_code=400)
+
+        reservation, shortages = await inventory.areserve(items, owner=user_id)
+        if shortages:
+            return JSONResponse(content={"error": "Niewystarczająca ilość produktów", "shortages": shortages}, status_code=409)
+
+        await inventory.acommit(reservation.id, owner=user_id)
+        await carts.aclear(user_id)
+        return JSONResponse(content=order_summary(reservation))
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.post("/reservations")
+async def reserve_order(performer_token: str, order: CartItems | None = None):
+    """
+    Rezerwuje pozycje zamówienia na czas płatności (rezerwacja wygasa, jeśli nie zostanie zatwierdzona)
+
+    Args:
+        performer_token (str): Token klienta
+        order (CartItems | None): Rezerwowane pozycje, domyślnie zapisany koszyk klienta
+
+    Returns:
+        ID rezerwacji, zarezerwowane pozycje i liczba sekund do wygaśnięcia albo 409 z brakami
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        user_id = int(user["id"])
+        items = await order_items(user_id, order)
+        if not items:
+            return JSONResponse(content={"error": "Koszyk jest pusty"}, status_code=400)
+
+        reservation, shortages = await inventory.areserve(items, owner=user_id)
+        if shortages:
+            return JSONResponse(content={"error": "Niewystarczająca ilość produktów", "shortages": shortages}, status_code=409)
+        return JSONResponse(content={
+            "reservation": reservation.id,
+            "items": {str(k): v for k, v in reservation.items.items()},
+            "expires_in": inventory.ttl,
+        })
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.post("/reservations/{reservation_id}/commit")
+async def commit_reservation(reservation_id: str, performer_token: str):
+    """
+    Składa zamówienie z rezerwacji i opróżnia koszyk
+
+    Args:
+        reservation_id (str): ID z POST /reservations
+        performer_token (str): Token klienta, który złożył rezerwację
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        user_id = int(user["id"])
+        reservation = await inventory.acommit(reservation_id, owner=user_id)
+        if reservation is None:
+            return JSONResponse(content={"error": "Rezerwacja nie istnieje lub wygasła"}, status_code=404)
+
+        await carts.aclear(user_id)
+        return JSONResponse(content=order_summary(reservation))
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+@app.post("/reservations/{reservation_id}/release")
+async def release_reservation(reservation_id: str, performer_token: str):
+    """
+    Zwalnia zarezerwowane sztuki (np. po anulowaniu płatności)
+
+    Args:
+        reservation_id (str): ID z POST /reservations
+        performer_token (str): Token klienta, który złożył rezerwację
+    """
+    try:
+        user = await session_user(performer_token)
+        if user is None:
+            return JSONResponse(content={"error": "Brak uprawnień do wykonania tej operacji"}, status_code=401)
+
+        if not await inventory.arelease(reservation_id, owner=int(user["id"])):
+            return JSONResponse(content={"error": "Rezerwacja nie istnieje lub wygasła"}, status_code=404)
+        return JSONResponse(content={"message": "Rezerwacja została zwolniona"})
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
 @app.get("/check_token/{login}")
 async def check_user_token(performer_token: str, login: str | None = None):
     if not check_token(performer_token):
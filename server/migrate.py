@@ -0,0 +1,132 @@
+"""
+Migracja bazy z plików CSV/XLSX do sqlite i eksport z powrotem
+
+Użycie (w katalogu `server/`):
+    python migrate.py           - importuje DATABASE/products.csv i DATABASE/customers.xlsx do DATABASE/zabka.db
+    python migrate.py --export  - eksportuje tabele z DATABASE/zabka.db do products.csv i customers.xlsx
+    python migrate.py --prices  - zamienia ceny tekstowe ("12 zł") i ułamkowe (5.99) w products.csv i zabka.db na grosze
+
+Po migracji serwer automatycznie korzysta z bazy sqlite (patrz helpers.storage.open_backend)
+"""
+
+
+import os
+import pandas as pd
+from argparse import ArgumentParser
+from helpers.prices import PRICE_SCALE, is_grosze_column, normalize_products
+from helpers.storage import FileBackend, JournaledBackend, SqliteBackend, JOURNAL_FILENAME, SQLITE_FILENAME, TABLES
+
+
+def migrate(database: str) -> dict[str, int]:
+    """
+    Importuje pliki CSV/XLSX do bazy sqlite (istniejące tabele są nadpisywane)
+
+    Niescalone wpisy dziennika zmian są najpierw scalane z plikami
+
+    Args:
+        database (str): Katalog z plikami bazy
+
+    Returns:
+        dict[str, int]: Liczba zaimportowanych wierszy dla każdej tabeli
+    """
+    files = JournaledBackend(FileBackend(database), os.path.join(database, JOURNAL_FILENAME))
+    files.close()
+    db = SqliteBackend(os.path.join(database, SQLITE_FILENAME))
+    try:
+        counts = {}
+        for table in TABLES:
+            df = files.read(table)
+            db.replace(table, df)
+            counts[table] = len(db.read(table))
+        return counts
+    finally:
+        db.close()
+
+
+def export(database: str, target: str | None = None) -> None:
+    """
+    Eksportuje tabele z bazy sqlite do plików CSV/XLSX
+
+    Args:
+        database (str): Katalog z plikiem bazy
+        target (str | None): Katalog docelowy, domyślnie ten sam co baza
+    """
+    db_path = os.path.join(database, SQLITE_FILENAME)
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Nie znaleziono bazy {db_path}")
+    db = SqliteBackend(db_path)
+    files = FileBackend(target or database)
+    try:
+        for table in TABLES:
+            files.replace(table, db.read(table))
+    finally:
+        db.close()
+
+
+def migrate_prices(database: str) -> dict[str, int]:
+    """
+    Zamienia ceny tekstowe ("12 zł", "5.99 zł") i ułamkowe (5.99) na grosze w products.csv i w bazie sqlite
+
+    Niescalone wpisy dziennika zmian są najpierw scalane z plikami. Jeśli którejś ceny nie da się
+    odczytać, nic nie jest zapisywane. Kolumna liczb zmiennoprzecinkowych bez braków i bez części
+    ułamkowych ("12.0", "13.0") jest niejednoznaczna (złote czy grosze?) i też przerywa migrację
+
+    Args:
+        database (str): Katalog z plikami bazy
+
+    Returns:
+        dict[str, int]: Liczba przeliczonych wierszy w każdym pliku (0, jeśli plik już był w groszach)
+
+    Raises:
+        ValueError: Jeśli któraś cena jest nieczytelna albo kolumna cen jest niejednoznaczna
+    """
+    files = JournaledBackend(FileBackend(database), os.path.join(database, JOURNAL_FILENAME))
+    files.close()
+
+    counts = {}
+    csv_path = files.inner.paths["products"]
+    if os.path.exists(csv_path):
+        raw = pd.read_csv(csv_path)
+        raw = raw.loc[:, [c for c in raw.columns if not str(c).startswith("Unnamed")]]
+        legacy = not pd.api.types.is_integer_dtype(raw["price"])
+        prices = raw["price"]
+        if pd.api.types.is_float_dtype(prices) and not is_grosze_column(prices):
+            # Tylko tutaj zgadujemy jednostkę: kwoty z częścią ułamkową (5.99, 12.50) to złote
+            values = prices.dropna()
+            if (values == values.round()).all():
+                raise ValueError("Nie wiadomo, czy ceny w products.csv są w złotych, czy w groszach - "
+                                 "zapisz je jako grosze (599) albo z \"zł\" (5.99 zł)")
+            raw["price"] = (prices * PRICE_SCALE).round().astype("Int64")
+        if legacy:
+            files.inner.replace("products", normalize_products(raw, strict=True))
+        counts["products.csv"] = len(raw) if legacy else 0
+
+    db_path = os.path.join(database, SQLITE_FILENAME)
+    if os.path.exists(db_path):
+        db = SqliteBackend(db_path)  # otwarcie starej bazy przebudowuje tabelę products
+        counts[SQLITE_FILENAME] = db.upgraded
+        db.close()
+    return counts
+
+
+def __main__():
+    parser = ArgumentParser(description="Migracja bazy Frog Store między CSV/XLSX a sqlite")
+    parser.add_argument("--database", default=os.path.join(os.getcwd(), "DATABASE"), help="Katalog bazy")
+    parser.add_argument("--export", action="store_true", help="Eksportuj sqlite do CSV/XLSX")
+    parser.add_argument("--target", default=None, help="Katalog docelowy eksportu")
+    parser.add_argument("--prices", action="store_true", help="Zamień ceny tekstowe na grosze")
+    args = parser.parse_args()
+
+    if args.prices:
+        for name, count in migrate_prices(args.database).items():
+            print(f"{name}: przeliczono {count} cen")
+    elif args.export:
+        export(args.database, args.target)
+        print(f"Wyeksportowano bazę do {args.target or args.database}")
+    else:
+        for table, count in migrate(args.database).items():
+            print(f"{table}: {count} wierszy")
+
+
+if __name__ == "__main__":
+    __main__()
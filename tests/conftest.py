@@ -0,0 +1,31 @@
+"""
+Wspólne fixture'y testów
+
+Testy korzystają z tych samych narzędzi co benchmarki (benchmarks/common.py): syntetycznej bazy
+w katalogu tymczasowym i świeżej instancji server/main.py uruchamianej w tym samym procesie
+"""
+
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "server"))
+
+from common import load_server, make_database  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Katalog roboczy z syntetyczną bazą (DATABASE/); po teście przywracany jest bieżący katalog"""
+    monkeypatch.chdir(tmp_path)
+    return make_database(products=200, users=5, path=str(tmp_path))
+
+
+@pytest.fixture
+def server(workdir):
+    """Świeży moduł main serwera pracujący na bazie z fixture'a `workdir`"""
+    return load_server(workdir)
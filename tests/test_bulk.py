@@ -0,0 +1,69 @@
+"""
+Testy masowego importu (POST /products/bulk): sprawdzanie i zapis porcjami
+"""
+
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from common import login_admin, product_row
+
+CHUNK = 10
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    monkeypatch.setattr(server, "BULK_CHUNK", CHUNK)
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def writes(server, monkeypatch) -> list[int]:
+    """Rozmiary kolejnych zapisów add_many"""
+    sizes = []
+    add_many = server.catalog.add_many
+
+    def counting_add_many(products):
+        sizes.append(len(products))
+        return add_many(products)
+
+    monkeypatch.setattr(server.catalog, "add_many", counting_add_many)
+    return sizes
+
+
+def ndjson(rows: list) -> bytes:
+    return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+def bulk(client, rows: list, **params):
+    token = login_admin(client)
+    return client.post("/products/bulk", params={"performer_token": token, **params}, content=ndjson(rows),
+                       headers={"Content-Type": "application/x-ndjson"})
+
+
+def test_import_is_written_in_chunks(server, client, writes):
+    rows = [product_row(1000 + i) for i in range(25)]
+    rows[12] = {"name": "Bez ceny i ilości"}
+    res = bulk(client, rows)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    assert body["added"] == 24
+    assert [error["row"] for error in body["errors"]] == [13]
+    assert writes == [CHUNK, CHUNK - 1, 5]  # żaden zapis nie obejmuje całego importu
+    assert len(server.catalog.all()) == 200 + 24
+    assert body["last_id"] - body["first_id"] == 23
+
+
+def test_atomic_import_writes_all_or_nothing(server, client, writes):
+    rows = [product_row(1000 + i) for i in range(25)]
+    res = bulk(client, rows[:20] + [{"name": "Bez ceny i ilości"}] + rows[20:], atomic=True)
+    assert res.status_code == 400
+    assert res.json()["added"] == 0 and writes == []
+
+    res = bulk(client, rows, atomic=True)
+    assert res.status_code == 200, res.text
+    assert res.json()["added"] == 25 and writes == [25]
+    assert len(server.catalog.all()) == 200 + 25
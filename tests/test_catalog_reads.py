@@ -0,0 +1,81 @@
+"""
+Testy odczytów katalogu z pamięci: po wczytaniu katalogu odczyty nie czytają plików bazy
+"""
+
+
+import threading
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from common import product_row
+
+
+def no_disk(*args, **kwargs):
+    raise AssertionError("odczyt z dysku")
+
+
+@pytest.fixture
+def client(server, monkeypatch):
+    with TestClient(server.app) as client:  # lifespan wczytuje katalog
+        server.catalog.check_interval = 0  # sprawdzanie wersji przy każdym odczycie (tylko stat pliku)
+        monkeypatch.setattr(server.backend, "read", no_disk)
+        monkeypatch.setattr(server.backend.inner, "read", no_disk)
+        monkeypatch.setattr(pd, "read_csv", no_disk)
+        monkeypatch.setattr(pd, "read_excel", no_disk)
+        yield client
+
+
+def test_products_from_memory(client):
+    res = client.get("/products")
+    assert res.status_code == 200
+    assert len(res.json()["products"]) == 200
+
+    page = client.get("/products", params={"limit": 10, "cursor": 10, "sort": "-price", "category": "Owoce"})
+    assert page.status_code == 200
+    assert len(page.json()["products"]) == 10
+
+    product = client.get("/products/5")
+    assert product.status_code == 200
+    assert product.json()["id"] == 5
+
+
+def test_etag_not_modified(client):
+    res = client.get("/products")
+    etag = res.headers["ETag"]
+    cached = client.get("/products", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+@pytest.mark.parametrize("accept", ["application/json", "application/x-ndjson"])
+def test_etag_matches_body_when_catalog_changes(server, monkeypatch, accept):
+    query = server.catalog.query
+    writer = threading.Thread(target=server.catalog.add, args=(product_row(1000),))
+
+    def query_during_write(*args, **kwargs):
+        # Zmiana katalogu między odczytem wersji a zbudowaniem treści
+        if writer.ident is None:
+            writer.start()
+            writer.join(0.05)
+        return query(*args, **kwargs)
+
+    with TestClient(server.app) as client:  # zapisy trafiają do plików bazy - bez fixture `client`
+        before = client.get("/products").headers["ETag"]
+        monkeypatch.setattr(server.catalog, "query", query_during_write)
+        res = client.get("/products", params={"sort": "-id"}, headers={"Accept": accept})  # nie z pamięci odpowiedzi
+        writer.join()
+        count = len(res.json()["products"]) if accept == "application/json" else len(res.text.splitlines())
+        assert (res.headers["ETag"] == before) == (count == 200)
+
+        # ETag z odpowiedzi daje 304 tylko wtedy, gdy klient ma już bieżącą treść
+        cached = client.get("/products", params={"sort": "-id"},
+                            headers={"If-None-Match": res.headers["ETag"], "Accept": accept})
+        assert cached.status_code == (304 if count == 201 else 200)
+
+
+def test_ndjson_from_memory(client):
+    res = client.get("/products", headers={"Accept": "application/x-ndjson"})
+    assert res.status_code == 200
+    assert len(res.text.splitlines()) == 200
@@ -0,0 +1,81 @@
+"""
+Testy rezerwacji stanów magazynowych (helpers.inventory.InventoryLedger)
+"""
+
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+BUYERS = 16
+STOCK = 20
+
+
+@pytest.fixture
+def ledger(server):
+    from helpers.inventory import InventoryLedger
+
+    server.catalog.load()
+    server.catalog.adjust_quantities({1: STOCK - server.catalog.get(1)["quantity"],
+                                      2: STOCK - server.catalog.get(2)["quantity"]})
+    return InventoryLedger(server.catalog, stripes=4)
+
+
+def test_concurrent_orders_never_oversell(server, ledger):
+    sold = []
+    start = threading.Barrier(BUYERS)
+
+    def buyer(n):
+        start.wait()
+        for _ in range(10):
+            reservation, shortages = ledger.reserve({1: 1, 2: 1}, owner=n)
+            if reservation is not None and ledger.commit(reservation.id, owner=n) is not None:
+                sold.append(reservation.id)
+            ledger.flush()
+
+    with ThreadPoolExecutor(max_workers=BUYERS) as pool:
+        list(pool.map(buyer, range(BUYERS)))
+    ledger.flush()
+
+    assert len(sold) == STOCK
+    assert ledger.available(1) == ledger.available(2) == 0
+    assert server.catalog.peek(1)["quantity"] == server.catalog.peek(2)["quantity"] == 0
+    server.catalog.load()  # stan zapisany w backendzie
+    assert server.catalog.peek(1)["quantity"] == 0
+
+
+def test_reservation_is_all_or_nothing(ledger):
+    reservation, shortages = ledger.reserve({1: 5, 2: STOCK + 1})
+    assert reservation is None
+    assert shortages == [{"id": 2, "requested": STOCK + 1, "available": STOCK}]
+    assert ledger.available(1) == STOCK
+
+
+def test_release_and_expiry_return_stock(ledger):
+    kept, _ = ledger.reserve({1: 5}, owner=1)
+    assert ledger.available(1) == STOCK - 5
+    assert not ledger.release(kept.id, owner=2)  # cudza rezerwacja
+    assert ledger.release(kept.id, owner=1)
+    assert ledger.available(1) == STOCK
+
+    abandoned, _ = ledger.reserve({1: 5}, ttl=0.01)
+    time.sleep(0.02)
+    assert ledger.expire() == 1
+    assert ledger.commit(abandoned.id) is None
+    assert ledger.available(1) == STOCK
+    assert len(ledger) == 0
+
+
+def test_sale_is_flushed_in_one_write(server, ledger):
+    for _ in range(3):
+        reservation, _ = ledger.reserve({1: 2})
+        ledger.commit(reservation.id)
+    assert server.catalog.peek(1)["quantity"] == STOCK  # sprzedaż czeka na zapis zbiorczy
+    assert ledger.available(1) == STOCK - 6
+    version = server.catalog.version
+    assert ledger.flush() == 1
+    assert server.catalog.version == version + 1
+    assert server.catalog.peek(1)["quantity"] == STOCK - 6
+    assert ledger.available(1) == STOCK - 6
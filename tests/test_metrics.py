@@ -0,0 +1,32 @@
+"""
+Testy metryk serwera (GET /metrics)
+"""
+
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_resyncs_are_a_counter(server):
+    from helpers.broadcast import RESYNCS
+
+    with TestClient(server.app) as client:
+        text = client.get("/metrics").text
+        assert "# TYPE ws_catalog_resyncs_total counter" in text
+        assert "ws_catalog_resyncs_total 0" in text.splitlines()
+
+        RESYNCS.inc()
+        assert "ws_catalog_resyncs_total 1" in client.get("/metrics").text.splitlines()
+
+
+def test_counter_never_decreases():
+    from helpers.metrics import Counter
+
+    counter = Counter("events_total", "Zdarzenia", ("kind",))
+    counter.inc("a", amount=2)
+    with pytest.raises(ValueError):
+        counter.inc("a", amount=-1)
+    with pytest.raises(TypeError):
+        counter.dec("a")
+    assert counter.render() == ["# HELP events_total Zdarzenia", "# TYPE events_total counter",
+                                'events_total{kind="a"} 2']
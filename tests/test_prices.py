@@ -0,0 +1,99 @@
+"""
+Testy odczytu cen (helpers.prices) i migracji cen (migrate.py --prices)
+"""
+
+
+import os
+
+import pandas as pd
+import pytest
+
+from helpers.prices import normalize_products, parse_price, parse_price_series
+
+
+@pytest.mark.parametrize("value, grosze", [
+    (599, 599),
+    ("599", 599),
+    ("5,99 zł", 599),
+    ("5.99 zł", 599),
+    ("12 zł", 1200),
+])
+def test_parse_price(value, grosze):
+    assert parse_price(value) == grosze
+
+
+@pytest.mark.parametrize("value", [None, True, -1, "-5 zł", "abc", "5.99", 5.99, 12.0, float("nan")])
+def test_parse_price_rejects(value):
+    with pytest.raises(ValueError):
+        parse_price(value)
+
+
+def test_text_column():
+    prices = parse_price_series(pd.Series(["12 zł", "5,99", "599", None, "abc"]))
+    assert prices.tolist() == [1200, 599, 599, pd.NA, pd.NA]
+
+
+def test_float_column_with_gaps_is_grosze():
+    prices = parse_price_series(pd.Series([599, None, 1250], dtype="float64"))
+    assert prices.tolist() == [599, pd.NA, 1250]
+
+
+@pytest.mark.parametrize("prices", ["5.99,12.50", "12.0,13.0", "5.99,"])
+def test_float_csv_prices_need_migration(tmp_path, prices):
+    path = tmp_path / "products.csv"
+    path.write_text("id,price\n" + "".join(f"{i},{p}\n" for i, p in enumerate(prices.split(","))), encoding="utf-8")
+    with pytest.raises(ValueError, match="migrate.py --prices"):
+        normalize_products(pd.read_csv(path))
+
+
+def _write_products(database, prices: str):
+    os.makedirs(database, exist_ok=True)
+    with open(os.path.join(database, "products.csv"), "w", encoding="utf-8") as f:
+        f.write("id,name,price,quantity,description,category\n")
+        for i, price in enumerate(prices.split(","), start=1):
+            f.write(f"{i},Produkt {i},{price},1,Opis,Owoce\n")
+
+
+def test_migrate_float_prices(tmp_path):
+    import migrate
+
+    database = str(tmp_path / "DATABASE")
+    _write_products(database, "5.99,12.50")
+    assert migrate.migrate_prices(database) == {"products.csv": 2}
+    df = pd.read_csv(os.path.join(database, "products.csv"))
+    assert df["price"].tolist() == [599, 1250]
+
+
+def test_migrate_ambiguous_float_prices(tmp_path):
+    import migrate
+
+    database = str(tmp_path / "DATABASE")
+    _write_products(database, "12.0,13.0")
+    with pytest.raises(ValueError):
+        migrate.migrate_prices(database)
+    df = pd.read_csv(os.path.join(database, "products.csv"))
+    assert df["price"].tolist() == [12.0, 13.0]  # nic nie zostało zapisane
+
+
+def test_migrate_float_prices_with_gaps(tmp_path):
+    import migrate
+
+    database = str(tmp_path / "DATABASE")
+    _write_products(database, "5.99,")
+    migrate.migrate_prices(database)
+    df = pd.read_csv(os.path.join(database, "products.csv"))
+    assert df["price"].tolist()[0] == 599
+
+
+def test_api_rejects_float_price(server):
+    from fastapi.testclient import TestClient
+
+    from common import login_admin, product_row
+
+    with TestClient(server.app) as client:
+        token = login_admin(client)
+        for price in (12.0, 12.5):
+            res = client.post("/add_product", params={"performer_token": token}, json={**product_row(1), "price": price})
+            assert res.status_code == 422
+        res = client.post("/add_product", params={"performer_token": token}, json={**product_row(1), "price": "12,50 zł"})
+        assert res.json()["product"]["price"] == 1250
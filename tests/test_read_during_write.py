@@ -0,0 +1,49 @@
+"""
+Testy odczytów w trakcie zapisu: odczyty nie czekają na blokadę zapisu ani na wątek zapisujący
+"""
+
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+
+from common import login_admin, percentile, product_row
+
+READS = 200
+MAX_P99 = 0.25  # sekundy; zablokowany zapis trwa do końca odczytów
+
+
+def test_reads_while_write_is_blocked(server, monkeypatch):
+    held = threading.Event()
+    release = threading.Event()
+    submit = server.backend.submit
+
+    def blocked_submit(*args, **kwargs):
+        held.set()
+        assert release.wait(10), "zapis nie został zwolniony"
+        return submit(*args, **kwargs)
+
+    with TestClient(server.app) as client, ThreadPoolExecutor(max_workers=8) as pool:
+        token = login_admin(client)
+        monkeypatch.setattr(server.backend, "submit", blocked_submit)
+
+        write = pool.submit(client.post, "/add_product", params={"performer_token": token}, json=product_row(1000))
+        assert held.wait(5)  # zapis trzyma blokadę zapisu katalogu i wątek zapisujący
+
+        def read(i):
+            start = time.perf_counter()
+            res = client.get(f"/products/{i % 200 + 1}") if i % 4 else client.get("/products", params={"limit": 50})
+            assert res.status_code == 200, res.text
+            return time.perf_counter() - start
+
+        try:
+            latencies = list(pool.map(read, range(READS)))
+            assert not write.done()  # wszystkie odczyty skończyły się w trakcie zapisu
+            assert percentile(latencies, 99) < MAX_P99
+            # Zmiana jest już w pamięci, choć jeszcze nie trafiła do backendu
+            assert len(client.get("/products").json()["products"]) == 201
+        finally:
+            release.set()
+        assert write.result(timeout=10).status_code == 200
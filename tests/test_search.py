@@ -0,0 +1,67 @@
+"""
+Testy indeksu wyszukiwania (helpers.search.SearchIndex)
+"""
+
+
+import random
+
+from helpers.search import FIELD_WEIGHTS, SearchIndex, fold
+
+WORDS = ["jabłko", "jabłecznik", "gruszka", "sok", "sos", "żółty", "zielony", "chleb", "chrupki", "mleko"]
+CATEGORIES = ["Owoce", "Napoje", "Pieczywo", "Nabiał"]
+
+
+def product(rng: random.Random, product_id: int) -> dict:
+    return {
+        "id": product_id,
+        "name": " ".join(rng.sample(WORDS, 2)),
+        "description": " ".join(rng.sample(WORDS, 3)),
+        "category": rng.choice(CATEGORIES),
+    }
+
+
+def brute_force(products: dict[int, dict], word: str, limit: int) -> list[tuple[int, float]]:
+    # Ranking jednego słowa bez indeksu: całe słowo z pełną wagą, sam początek z połową
+    scores = {}
+    for product_id, record in products.items():
+        best = 0.0
+        terms = SearchIndex.terms(record)
+        for term, weight in terms.items():
+            if term == word:
+                best = max(best, weight)
+            elif term.startswith(word) and len(word) >= 2:
+                best = max(best, weight * 0.5)
+        if best:
+            scores[product_id] = best
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def test_top_k_matches_full_ranking():
+    rng = random.Random(7)
+    index = SearchIndex()
+    products = {}
+    for product_id in rng.sample(range(1, 2001), 1500):  # ID w losowej kolejności
+        products[product_id] = product(rng, product_id)
+        index.add(products[product_id])
+    for product_id in rng.sample(sorted(products), 300):
+        index.remove(product_id)
+        del products[product_id]
+    for product_id in rng.sample(sorted(products), 300):  # zmiana opisu przenosi produkt między wagami
+        products[product_id] = product(rng, product_id)
+        index.add(products[product_id])
+
+    for word in ["jabłko", "jab", "sok", "so", "owoce", "zolty", "chleb"]:
+        for limit in (1, 5, 20, 2000):
+            assert index.search(word, limit) == brute_force(products, fold(word), limit), (word, limit)
+
+
+def test_ranking_by_field():
+    index = SearchIndex()
+    index.add({"id": 1, "name": "Sok", "description": "", "category": "Napoje"})
+    index.add({"id": 2, "name": "Woda", "description": "nie sok", "category": "Napoje"})
+    index.add({"id": 3, "name": "Sok sok", "description": "sok", "category": "Napoje"})
+    assert index.search("sok") == [(3, FIELD_WEIGHTS["name"] + FIELD_WEIGHTS["description"]),
+                                   (1, FIELD_WEIGHTS["name"]), (2, FIELD_WEIGHTS["description"])]
+    index.remove(3)
+    assert [pid for pid, _ in index.search("napoje sok")] == [1, 2]
+    assert index.search("brak") == []
@@ -0,0 +1,180 @@
+"""
+Testy dziennika zmian (JournaledBackend): grupowanie fsync i scalanie z plikami bazy
+"""
+
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from common import login_admin, product_row
+
+WRITES = 50
+
+
+def count_fsyncs(monkeypatch) -> list:
+    """Podmienia os.fsync dziennika na wolniejszy (2 ms) i zwraca listę jego wywołań"""
+    storage = sys.modules["helpers.storage"]  # moduł świeżo zaimportowany przez load_server
+    calls = []
+    fsync = os.fsync
+
+    def slow_fsync(fd):
+        calls.append(fd)
+        time.sleep(0.002)
+        fsync(fd)
+
+    monkeypatch.setattr(storage.os, "fsync", slow_fsync)
+    return calls
+
+
+def broken_fsync(fd):
+    raise OSError("dysk pełny")
+
+
+def test_concurrent_http_writes_share_fsync(server, monkeypatch):
+    calls = count_fsyncs(monkeypatch)
+    with TestClient(server.app) as client:
+        token = login_admin(client)
+        calls.clear()
+
+        def add(i):
+            res = client.post("/add_product", params={"performer_token": token}, json=product_row(1000 + i))
+            assert res.status_code == 200, res.text
+
+        with ThreadPoolExecutor(max_workers=WRITES) as pool:
+            list(pool.map(add, range(WRITES)))
+    assert len(server.catalog.all()) == 200 + WRITES
+    assert len(calls) < WRITES / 2  # zmiany dołączają do wspólnych grup zapisu
+
+
+def test_concurrent_thread_writes_share_fsync(server, monkeypatch):
+    server.catalog.load()
+    calls = count_fsyncs(monkeypatch)
+    start = threading.Barrier(WRITES)
+
+    def add(i):
+        start.wait()
+        server.catalog.add(product_row(1000 + i))
+
+    with ThreadPoolExecutor(max_workers=WRITES) as pool:
+        list(pool.map(add, range(WRITES)))
+    assert len(calls) < WRITES / 2
+
+
+def test_changes_are_durable(server):
+    server.catalog.load()
+    record = server.catalog.add(product_row(1000))
+    journal = server.backend.path
+    with open(journal, encoding="utf-8") as f:
+        assert any(f'"id": {record["id"]}' in line for line in f)
+    server.backend.close()
+    assert os.path.getsize(server.backend.inner.paths["products"]) > 0
+    assert record["id"] in set(server.backend.read("products")["id"])
+
+
+def test_failed_fsync_rolls_back(server, monkeypatch):
+    server.catalog.load()
+    before = server.catalog.version
+    monkeypatch.setattr(sys.modules["helpers.storage"].os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        server.catalog.add(product_row(1000))
+    assert len(server.catalog.all()) == 200
+    assert server.catalog.version > before  # odczyty widzą cofnięcie jako nową wersję
+
+
+def test_failed_flush_is_retried(server, monkeypatch):
+    from helpers.inventory import InventoryLedger
+
+    server.catalog.load()
+    ledger = InventoryLedger(server.catalog)
+    reservation, _ = ledger.reserve({1: 2})
+    ledger.commit(reservation.id)
+    stock = server.catalog.peek(1)["quantity"]
+
+    storage = sys.modules["helpers.storage"]
+    fsync = storage.os.fsync
+    monkeypatch.setattr(storage.os, "fsync", broken_fsync)
+    with pytest.raises(OSError):
+        ledger.flush()
+    assert server.catalog.peek(1)["quantity"] == stock - 2  # sprzedaż została w pamięci
+
+    monkeypatch.setattr(storage.os, "fsync", fsync)
+    assert ledger.flush() == 1  # ponowny zapis produktu
+    server.backend.close()
+    assert server.backend.read("products").set_index("id").loc[1, "quantity"] == stock - 2
+
+
+def test_compaction_is_not_an_external_change(server, monkeypatch):
+    server.catalog.load()
+    server.catalog.add(product_row(1000))
+    backend = server.backend
+    before = backend.version("products")
+
+    # version() wywołane tuż po podmianie pliku, zanim scalanie zapamięta jego nową wersję
+    storage = sys.modules["helpers.storage"]
+    replace = os.replace
+    seen = []
+    reader = threading.Thread(target=lambda: seen.append(backend.version("products")))
+
+    def racing_replace(src, dst):
+        replace(src, dst)
+        if dst == backend.inner.paths["products"]:
+            reader.start()
+            reader.join(0.05)
+
+    monkeypatch.setattr(storage.os, "replace", racing_replace)
+    backend.compact()
+    reader.join()
+    assert seen == [before]
+    assert backend.version("products") == before
+
+
+def test_external_edit_during_commit_is_reloaded(server, monkeypatch):
+    server.catalog.load()
+    backend = server.backend
+    path = backend.inner.paths["products"]
+    submit = backend.submit
+
+    def submit_with_external_edit(*args, **kwargs):
+        # Ktoś poprawia plik bazy w trakcie naszego zapisu
+        df = pd.read_csv(path)
+        df.loc[df["id"] == 5, "name"] = "Zmieniony z zewnątrz"
+        df.to_csv(path, index=False)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        return submit(*args, **kwargs)
+
+    monkeypatch.setattr(backend, "submit", submit_with_external_edit)
+    record = server.catalog.add(product_row(1000))
+    monkeypatch.setattr(backend, "submit", submit)
+
+    server.catalog._last_check = 0.0  # następny odczyt sprawdza wersję backendu
+    assert server.catalog.get(5)["name"] == "Zmieniony z zewnątrz"
+    assert server.catalog.get(record["id"]) is not None  # nasz wpis z dziennika też jest
+
+
+def test_leftover_journal_is_compacted_at_startup(workdir):
+    from common import load_server
+
+    # Wpis dziennika pozostały po awarii, zanim serwer zdążył go scalić
+    journal = os.path.join(workdir, "DATABASE", "journal.ndjson")
+    record = {"id": 5000, **product_row(5000)}
+    with open(journal, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"table": "products", "upserts": [record], "deletes": []}) + "\n")
+
+    server = load_server(workdir)
+    with TestClient(server.app) as client:
+        assert client.get("/products/5000").status_code == 200
+        compacting = server.backend.compacting_path
+        deadline = time.monotonic() + 5
+        while (os.path.getsize(journal) or os.path.exists(compacting)) and time.monotonic() < deadline:
+            time.sleep(0.01)  # bez żadnego zapisu
+        assert os.path.getsize(journal) == 0 and not os.path.exists(compacting)
+        assert 5000 in set(pd.read_csv(server.backend.inner.paths["products"])["id"])